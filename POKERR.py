@@ -13,22 +13,47 @@ import pygame
 import random
 import sys
 import math
-import json
 import os
-from datetime import datetime
-from enum import Enum
-from itertools import combinations
+import sqlite3
+from collections import OrderedDict
+from itertools import repeat
 
-# ---------- Configuración ----------
-pygame.init()
-pygame.mixer.init()
+import numpy as np
+
+from evaluador import NOMBRES_RANKING
+from estrategia import cargar_tabla_estrategia
+from cliente import ClienteMesa, VistaMesa
+from motor import EstadoJuego, Jugador, JugadorSesion
+from cartas import SUITS, valor_str, codigo_carta, palo_carta, valor_carta
+from historial import EscritorHistorial
+from perfilador import CUBOS_MS, PerfiladorFrames
+import traza
+from usuarios import AlmacenSQLite, ahora, migrar_json
 
+# ---------- Configuración ----------
 WIDTH, HEIGHT = 1400, 800
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Texas Hold'em - Edición Premium Oro")
-clock = pygame.time.Clock()
 FPS = 60
 
+# La ventana, el reloj y las fuentes se crean en inicializar_pygame(), de modo
+# que importar este módulo no abre ninguna ventana
+screen = None
+clock = None
+
+# Decisiones de IA fuera del hilo de render (pool de procesos del servidor local)
+IA_ASINCRONA = True
+PROCESOS_IA = 2
+PRESUPUESTO_DECISION_MS = 300
+
+# Servidor externo "host:puerto" (ver servidor.py); sin él se arranca uno local
+SERVIDOR = os.environ.get("POKER_SERVIDOR")
+
+# Perfilador de frames: F3 muestra u oculta el panel, F4 exporta los tiempos (CSV o JSON)
+PERFIL_ACTIVO = os.environ.get("POKER_PERFIL", "0") not in ("", "0")
+PERFIL_ARCHIVO = os.environ.get("POKER_PERFIL_ARCHIVO", "perfil_frames.csv")
+
+# Traza de las manos y los frames en formato de Chrome (chrome://tracing o Perfetto), al salir
+TRAZA_ARCHIVO = os.environ.get("POKER_TRAZA")
+
 # Tema Premium Oro y Negro
 COLORES = {
     "ORO_PRINCIPAL": (212, 175, 55),
@@ -46,74 +71,56 @@ COLORES = {
     "TRANSPARENTE": (0, 0, 0, 0)
 }
 
-# Base de datos de usuarios
+# Base de datos de usuarios (el JSON antiguo se migra la primera vez)
 USUARIOS_FILE = "usuarios_poker.json"
+USUARIOS_DB = "usuarios_poker.db"
 
-def cargar_usuarios():
-    """Cargar usuarios desde archivo JSON"""
-    try:
-        if os.path.exists(USUARIOS_FILE):
-            with open(USUARIOS_FILE, 'r') as f:
-                return json.load(f)
-    except:
-        pass
-    return {}
+# Historial binario de las manos jugadas (ver historial.py)
+HISTORIAL_FILE = "historial_manos.bin"
 
-def guardar_usuarios(usuarios):
-    """Guardar usuarios en archivo JSON"""
-    try:
-        with open(USUARIOS_FILE, 'w') as f:
-            json.dump(usuarios, f, indent=2)
-        return True
-    except:
-        return False
+_almacen = None
+
+def obtener_almacen():
+    """Almacén de usuarios compartido (se abre la primera vez que se usa)"""
+    global _almacen
+    if _almacen is None:
+        if not os.path.exists(USUARIOS_DB) and os.path.exists(USUARIOS_FILE):
+            try:
+                migrados = migrar_json(USUARIOS_FILE, USUARIOS_DB)
+                print(f"{migrados} usuarios migrados de {USUARIOS_FILE} a {USUARIOS_DB}")
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"No se pudo migrar {USUARIOS_FILE}: {e}")
+        _almacen = AlmacenSQLite(USUARIOS_DB)
+    return _almacen
 
 def registrar_usuario(nombre, password):
     """Registrar nuevo usuario"""
-    usuarios = cargar_usuarios()
+    almacen = obtener_almacen()
     
-    if nombre in usuarios:
+    if not almacen.crear(nombre, password):
         return False, "El usuario ya existe"
     
-    usuarios[nombre] = {
-        "password": password,
-        "fichas": 5000,
-        "partidas_jugadas": 0,
-        "partidas_ganadas": 0,
-        "fecha_registro": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "ultima_conexion": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    
-    if guardar_usuarios(usuarios):
+    # El alta se escribe en el momento, sin esperar al siguiente lote
+    if almacen.guardar():
         return True, "Usuario registrado exitosamente"
     else:
         return False, "Error al guardar usuario"
 
 def login_usuario(nombre, password):
-    """Iniciar sesión de usuario"""
-    usuarios = cargar_usuarios()
+    """Iniciar sesión de usuario; devuelve (SesionUsuario o None, mensaje)"""
+    sesion = obtener_almacen().abrir_sesion(nombre)
     
-    if nombre not in usuarios:
-        return False, "Usuario no encontrado"
+    if sesion is None:
+        return None, "Usuario no encontrado"
     
-    if usuarios[nombre]["password"] != password:
-        return False, "Contraseña incorrecta"
+    if sesion.datos["password"] != password:
+        return None, "Contraseña incorrecta"
     
     # Actualizar última conexión
-    usuarios[nombre]["ultima_conexion"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    guardar_usuarios(usuarios)
-    
-    return True, "Login exitoso"
-
-def actualizar_estadisticas_usuario(nombre, ganador=False):
-    """Actualizar estadísticas del usuario"""
-    usuarios = cargar_usuarios()
+    sesion.actualizar(ultima_conexion=ahora())
+    sesion.sincronizar()
     
-    if nombre in usuarios:
-        usuarios[nombre]["partidas_jugadas"] += 1
-        if ganador:
-            usuarios[nombre]["partidas_ganadas"] += 1
-        guardar_usuarios(usuarios)
+    return sesion, "Login exitoso"
 
 # Fuentes premium
 def obtener_fuente(tamaño, bold=False, italic=False):
@@ -128,116 +135,264 @@ def obtener_fuente(tamaño, bold=False, italic=False):
     except:
         return pygame.font.Font(None, tamaño)
 
-fuente_pequena = obtener_fuente(18)
-fuente_media = obtener_fuente(24)
-fuente_grande = obtener_fuente(36, bold=True)
-fuente_titulo = obtener_fuente(48, bold=True)
-fuente_muy_grande = obtener_fuente(72, bold=True)
-fuente_elegante = obtener_fuente(28, italic=True)
-
-# Estados del juego
-class EstadoJuego(Enum):
-    PREFLOP = 0
-    FLOP = 1
-    TURN = 2
-    RIVER = 3
-    SHOWDOWN = 4
-    FINAL = 5
-
-# Rangos de mano
-class RankingMano(Enum):
-    CARTA_ALTA = 0
-    PAR = 1
-    DOBLE_PAR = 2
-    TRIO = 3
-    ESCALERA = 4
-    COLOR = 5
-    FULL_HOUSE = 6
-    POKER = 7
-    ESCALERA_COLOR = 8
-    ESCALERA_REAL = 9
+fuente_pequena = None
+fuente_media = None
+fuente_grande = None
+fuente_titulo = None
+fuente_muy_grande = None
+fuente_elegante = None
+
+def inicializar_pygame():
+    """Abrir la ventana del juego y cargar las fuentes"""
+    global screen, clock
+    global fuente_pequena, fuente_media, fuente_grande, fuente_titulo, fuente_muy_grande, fuente_elegante
+    pygame.init()
+    pygame.mixer.init()
+
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Texas Hold'em - Edición Premium Oro")
+    clock = pygame.time.Clock()
+
+    fuente_pequena = obtener_fuente(18)
+    fuente_media = obtener_fuente(24)
+    fuente_grande = obtener_fuente(36, bold=True)
+    fuente_titulo = obtener_fuente(48, bold=True)
+    fuente_muy_grande = obtener_fuente(72, bold=True)
+    fuente_elegante = obtener_fuente(28, italic=True)
+
+# ---------- Caché de textos ----------
+class CacheTextos:
+    """Textos ya renderizados por (fuente, texto, color), con expulsión LRU"""
+
+    def __init__(self, capacidad=512):
+        self.capacidad = capacidad
+        self.superficies = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def render(self, fuente, texto, color):
+        """Como fuente.render(texto, True, color); no modificar la superficie devuelta"""
+        clave = (fuente, texto, color)
+        superficie = self.superficies.get(clave)
+        if superficie is not None:
+            self.superficies.move_to_end(clave)
+            self.aciertos += 1
+            return superficie
+
+        self.fallos += 1
+        superficie = self.superficies[clave] = fuente.render(texto, True, color)
+        if len(self.superficies) > self.capacidad:
+            self.superficies.popitem(last=False)
+        return superficie
+
+    def resumen(self):
+        total = self.aciertos + self.fallos
+        porcentaje = 100.0 * self.aciertos / total if total else 0.0
+        return f"Caché de textos: {self.aciertos:,} aciertos, {self.fallos:,} fallos ({porcentaje:.1f}% aciertos)"
+
+textos = CacheTextos()
 
 # ---------- Sistema de Partículas Premium ----------
-particulas = []
-
-class Particula:
-    def __init__(self, x, y, tipo="oro", color=None):
-        self.x = x
-        self.y = y
-        self.tipo = tipo
-        self.life = random.uniform(80, 160)
-        self.size = random.randint(3, 8)
-        self.rotation = random.uniform(0, 360)
-        self.rotation_speed = random.uniform(-5, 5)
-        
+# Máximo de partículas vivas a la vez; las que no caben se descartan
+MAX_PARTICULAS = 600
+
+# Variantes precalculadas de cada tipo de partícula
+COLORES_PARTICULA_ORO = [
+    COLORES["ORO_PRINCIPAL"],
+    COLORES["ORO_SECUNDARIO"], 
+    COLORES["ORO_CLARO"],
+    (255, 223, 0)
+]
+ALPHAS_BRILLO = list(range(100, 201, 10))
+CUBOS_ROTACION = 16  # El diamante se repite cada 90 grados
+
+TIPOS_PARTICULA = ["oro", "brillo_oro", "diamante"]
+TAMANOS_PARTICULA = {"oro": (3, 8), "brillo_oro": (2, 4), "diamante": (3, 8)}
+
+def pintar_particula(sprite, tipo, variante, tamano, rotacion):
+    """Dibujar una partícula en su hueco del atlas (mismo trazo que el original)"""
+    if tipo == "oro":
+        pygame.draw.circle(sprite, variante, (tamano, tamano), tamano)
+        pygame.draw.circle(sprite, COLORES["ORO_CLARO"], (tamano, tamano), tamano, 1)
+    elif tipo == "brillo_oro":
+        # Partícula circular con brillo
+        pygame.draw.circle(sprite, (255, 255, 200, variante), (tamano, tamano), tamano)
+    else:
+        # Partícula con forma de diamante
+        points = []
+        for i in range(4):
+            angle = math.radians(rotacion + i * 90)
+            px = tamano + math.cos(angle) * tamano
+            py = tamano + math.sin(angle) * tamano
+            points.append((px, py))
+        pygame.draw.polygon(sprite, (200, 230, 255, 200), points)
+
+class SistemaParticulas:
+    """Pool de partículas en arrays, con actualización vectorizada y sprites en atlas"""
+
+    def __init__(self, capacidad=MAX_PARTICULAS):
+        self.capacidad = capacidad
+        # Estructura de arrays: una posición por hueco del pool
+        self.x = np.zeros(capacidad, dtype=np.float32)
+        self.y = np.zeros(capacidad, dtype=np.float32)
+        self.vx = np.zeros(capacidad, dtype=np.float32)
+        self.vy = np.zeros(capacidad, dtype=np.float32)
+        self.gravedad = np.zeros(capacidad, dtype=np.float32)
+        self.vida = np.zeros(capacidad, dtype=np.float32)
+        self.rotacion = np.zeros(capacidad, dtype=np.float32)
+        self.vel_rotacion = np.zeros(capacidad, dtype=np.float32)
+        self.tamano = np.zeros(capacidad, dtype=np.int32)
+        self.tipo = np.zeros(capacidad, dtype=np.int8)
+        self.sprite = np.zeros(capacidad, dtype=np.int32)
+        self.vivas = np.zeros(capacidad, dtype=bool)
+        self.cantidad = 0
+        self.descartadas = 0
+        self.rng = np.random.default_rng()
+        # Atlas por tipo, creados al primer dibujo
+        self.colores_oro = list(COLORES_PARTICULA_ORO)
+        self.atlas = None
+
+    def __len__(self):
+        return self.cantidad
+
+    def variantes(self, tipo):
         if tipo == "oro":
-            self.color = color or random.choice([
-                COLORES["ORO_PRINCIPAL"],
-                COLORES["ORO_SECUNDARIO"], 
-                COLORES["ORO_CLARO"],
-                (255, 223, 0)
-            ])
-            self.vx = random.uniform(-2, 2)
-            self.vy = random.uniform(-6, -3)
-            self.gravity = 0.15
-        elif tipo == "brillo_oro":
-            self.color = (255, 255, 200)
-            self.alpha = random.randint(100, 200)
-            self.vx = random.uniform(-0.5, 0.5)
-            self.vy = random.uniform(-0.5, 0.5)
-            self.gravity = 0.02
-            self.size = random.randint(2, 4)
-        elif tipo == "diamante":
-            self.color = (200, 230, 255)
-            self.alpha = 200
-            self.vx = random.uniform(-1, 1)
-            self.vy = random.uniform(-4, -2)
-            self.gravity = 0.1
-        
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += self.gravity
-        self.life -= 1
-        self.rotation += self.rotation_speed
-        return self.life > 0
-        
-    def draw(self, surface):
-        if self.tipo in ["brillo_oro", "diamante"]:
-            # Crear superficie para partículas con alpha
-            part_surf = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            if self.tipo == "diamante":
-                # Partícula con forma de diamante
-                points = []
-                for i in range(4):
-                    angle = math.radians(self.rotation + i * 90)
-                    px = self.size + math.cos(angle) * self.size
-                    py = self.size + math.sin(angle) * self.size
-                    points.append((px, py))
-                pygame.draw.polygon(part_surf, (*self.color, self.alpha), points)
+            return self.colores_oro
+        if tipo == "brillo_oro":
+            return ALPHAS_BRILLO
+        return [None]
+
+    def cubos(self, tipo):
+        return CUBOS_ROTACION if tipo == "diamante" else 1
+
+    def indice_sprite(self, tipo, variante, tamano):
+        """Primer sprite de (variante, tamaño); el cubo de rotación se suma al dibujar"""
+        minimo, maximo = TAMANOS_PARTICULA[tipo]
+        return (variante * (maximo - minimo + 1) + (tamano - minimo)) * self.cubos(tipo)
+
+    def construir_atlas(self):
+        """Prerenderizar todas las variantes, tamaños y rotaciones en una superficie por tipo"""
+        self.atlas = []
+        for tipo in TIPOS_PARTICULA:
+            minimo, maximo = TAMANOS_PARTICULA[tipo]
+            cubos = self.cubos(tipo)
+            huecos = []
+            for variante in self.variantes(tipo):
+                for tamano in range(minimo, maximo + 1):
+                    lado = tamano * 2 + 1 if tipo == "oro" else tamano * 2
+                    for cubo in range(cubos):
+                        huecos.append((variante, tamano, cubo * 90.0 / cubos, lado))
+
+            atlas = pygame.Surface((sum(h[3] for h in huecos), maximo * 2 + 1), pygame.SRCALPHA)
+            areas = []
+            x = 0
+            for variante, tamano, rotacion, lado in huecos:
+                area = (x, 0, lado, lado)
+                pintar_particula(atlas.subsurface(area), tipo, variante, tamano, rotacion)
+                areas.append(area)
+                x += lado
+            self.atlas.append((atlas, np.array(areas, dtype=np.int32)))
+
+    def crear(self, x, y, cantidad=50, tipo="oro", color=None):
+        """Ocupar hasta 'cantidad' huecos libres del pool"""
+        t = TIPOS_PARTICULA.index(tipo)
+        huecos = np.flatnonzero(~self.vivas)[:cantidad]
+        self.descartadas += cantidad - len(huecos)
+        n = len(huecos)
+        if n == 0:
+            return
+        rng = self.rng
+        minimo, maximo = TAMANOS_PARTICULA[tipo]
+
+        self.x[huecos] = x
+        self.y[huecos] = y
+        self.vida[huecos] = rng.uniform(80, 160, n)
+        self.rotacion[huecos] = rng.uniform(0, 360, n)
+        self.vel_rotacion[huecos] = rng.uniform(-5, 5, n)
+        self.tamano[huecos] = tamano = rng.integers(minimo, maximo + 1, n)
+        self.tipo[huecos] = t
+
+        if tipo == "oro":
+            if color is not None:
+                if color not in self.colores_oro:
+                    self.colores_oro.append(color)
+                    self.atlas = None
+                variante = np.full(n, self.colores_oro.index(color))
             else:
-                # Partícula circular con brillo
-                pygame.draw.circle(part_surf, (*self.color, self.alpha), 
-                                 (self.size, self.size), self.size)
-            
-            surface.blit(part_surf, (int(self.x - self.size), int(self.y - self.size)))
+                variante = rng.integers(0, len(COLORES_PARTICULA_ORO), n)
+            self.vx[huecos] = rng.uniform(-2, 2, n)
+            self.vy[huecos] = rng.uniform(-6, -3, n)
+            self.gravedad[huecos] = 0.15
+        elif tipo == "brillo_oro":
+            variante = rng.integers(0, len(ALPHAS_BRILLO), n)
+            self.vx[huecos] = rng.uniform(-0.5, 0.5, n)
+            self.vy[huecos] = rng.uniform(-0.5, 0.5, n)
+            self.gravedad[huecos] = 0.02
         else:
-            # Partículas normales sin transparencia
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.size)
-            if self.tipo == "oro":
-                pygame.draw.circle(surface, COLORES["ORO_CLARO"], (int(self.x), int(self.y)), self.size, 1)
+            variante = np.zeros(n, dtype=np.int32)
+            self.vx[huecos] = rng.uniform(-1, 1, n)
+            self.vy[huecos] = rng.uniform(-4, -2, n)
+            self.gravedad[huecos] = 0.1
 
-def crear_particulas(x, y, cantidad=50, tipo="oro", color=None):
-    for _ in range(cantidad):
-        particulas.append(Particula(x, y, tipo, color))
+        self.sprite[huecos] = self.indice_sprite(tipo, variante, tamano)
+        self.vivas[huecos] = True
+        self.cantidad += n
 
-# ---------- Utilidades Premium ----------
-SUITS = ['♥', '♦', '♣', '♠']
-VAL_STR = {11: 'J', 12: 'Q', 13: 'K', 14: 'A'}
+    def actualizar(self):
+        """Avanzar un frame todas las partículas a la vez"""
+        if not self.cantidad:
+            return
+        np.add(self.x, self.vx, out=self.x)
+        np.add(self.y, self.vy, out=self.y)
+        np.add(self.vy, self.gravedad, out=self.vy)
+        np.subtract(self.vida, 1, out=self.vida)
+        np.add(self.rotacion, self.vel_rotacion, out=self.rotacion)
+        np.greater(self.vida, 0, out=self.vivas)
+        self.cantidad = int(np.count_nonzero(self.vivas))
+
+    def rects(self):
+        """Zonas de pantalla que ocupan las partículas vivas"""
+        if not self.cantidad:
+            return []
+        vivas = np.flatnonzero(self.vivas)
+        tamano = self.tamano[vivas]
+        izquierda = self.x[vivas].astype(np.int32) - tamano - 1
+        arriba = self.y[vivas].astype(np.int32) - tamano - 1
+        lado = tamano * 2 + 3
+        return [pygame.Rect(r) for r in zip(izquierda.tolist(), arriba.tolist(), lado.tolist(), lado.tolist())]
+
+    def dibujar(self, surface):
+        """Un blit por partícula desde el atlas de su tipo"""
+        if not self.cantidad:
+            return
+        if self.atlas is None:
+            self.construir_atlas()
+        vivas = np.flatnonzero(self.vivas)
+        tipos = self.tipo[vivas]
+        for t, (atlas, areas) in enumerate(self.atlas):
+            indices = vivas[tipos == t]
+            if not len(indices):
+                continue
+            tamano = self.tamano[indices]
+            sprite = self.sprite[indices]
+            if TIPOS_PARTICULA[t] == "oro":
+                x = self.x[indices].astype(np.int32) - tamano
+                y = self.y[indices].astype(np.int32) - tamano
+            else:
+                x = (self.x[indices] - tamano).astype(np.int32)
+                y = (self.y[indices] - tamano).astype(np.int32)
+                if TIPOS_PARTICULA[t] == "diamante":
+                    cubo = ((self.rotacion[indices] % 90.0) * (CUBOS_ROTACION / 90.0)).astype(np.int32)
+                    sprite = sprite + np.minimum(cubo, CUBOS_ROTACION - 1)
+            surface.blits(zip(repeat(atlas), zip(x.tolist(), y.tolist()), areas[sprite].tolist()),
+                          doreturn=False)
 
-def valor_str(v):
-    return VAL_STR.get(v, str(v))
+particulas = SistemaParticulas()
 
+def crear_particulas(x, y, cantidad=50, tipo="oro", color=None):
+    particulas.crear(x, y, cantidad, tipo, color)
+
+# ---------- Utilidades Premium ----------
 def crear_degradado_vertical(width, height, color_top, color_bottom):
     """Crear superficie con degradado vertical"""
     surface = pygame.Surface((width, height))
@@ -282,7 +437,7 @@ def dibujar_boton_premium(surface, rect, texto, hover=False, disabled=False):
     
     # Texto del botón
     color_texto = COLORES["NEGRO_LUJO"] if not disabled else COLORES["PLATA_OSCURO"]
-    texto_surf = fuente_media.render(texto, True, color_texto)
+    texto_surf = textos.render(fuente_media, texto, color_texto)
     texto_rect = texto_surf.get_rect(center=rect.center)
     surface.blit(texto_surf, texto_rect)
     
@@ -290,9 +445,11 @@ def dibujar_boton_premium(surface, rect, texto, hover=False, disabled=False):
 
 # ---------- Clases del Juego Premium ----------
 class Carta:
+    """Vista de dibujo de un código de carta del motor"""
     def __init__(self, palo, valor):
         self.palo = palo
         self.valor = valor
+        self.codigo = codigo_carta(palo, valor)
         self.angulo = 0
         self.escala = 1.0
         self.alpha = 255
@@ -315,446 +472,236 @@ class Carta:
         else:  # Plateado para cartas menores
             return COLORES["PLATA"]
 
+    def pintar_cara(self, w, h):
+        """Superficie de la cara de la carta, sin efectos"""
+        carta_surf = pygame.Surface((w, h), pygame.SRCALPHA)
+
+        # Fondo con textura premium
+        fondo_color = self.fondo_carta()
+        pygame.draw.rect(carta_surf, fondo_color, carta_surf.get_rect(), border_radius=10)
+
+        # Patrón de lujo en el fondo
+        for i in range(0, w, 8):
+            for j in range(0, h, 8):
+                if (i + j) % 16 == 0:
+                    pygame.draw.circle(carta_surf, (255, 255, 255, 30), (i, j), 1)
+
+        # Borde exterior negro
+        pygame.draw.rect(carta_surf, COLORES["NEGRO_CARTA"], carta_surf.get_rect(), 2, border_radius=10)
+
+        # Borde interior dorado/plateado
+        borde_color = COLORES["ORO_SECUNDARIO"] if self.valor >= 12 else COLORES["PLATA_OSCURO"]
+        pygame.draw.rect(carta_surf, borde_color, (3, 3, w-6, h-6), 2, border_radius=8)
+
+        # Valor superior
+        txt_color = self.color_carta()
+        valor_txt = fuente_media.render(str(self), True, txt_color)
+        carta_surf.blit(valor_txt, (10, 8))
+
+        # Símbolo del palo en el centro (más grande y elegante)
+        simbolo = fuente_grande.render(SUITS[self.palo], True, txt_color)
+        carta_surf.blit(simbolo, (w//2 - simbolo.get_width()//2, h//2 - simbolo.get_height()//2))
+
+        # Valor inferior (invertido)
+        valor_inv = pygame.transform.rotate(valor_txt, 180)
+        carta_surf.blit(valor_inv, (w - valor_inv.get_width() - 10, h - valor_inv.get_height() - 8))
+        return carta_surf
+
     def dibujar_premium(self, surface, x, y, w=78, h=110, boca_arriba=True):
-        # Sombra premium
-        sombra_surf = pygame.Surface((w + 8, h + 8), pygame.SRCALPHA)
-        pygame.draw.rect(sombra_surf, (0, 0, 0, 120), sombra_surf.get_rect(), border_radius=12)
-        surface.blit(sombra_surf, (x - 4, y - 4))
+        # Sombra y carta salen de la caché; por frame solo quedan los blits
+        surface.blit(sombra_carta(w, h), (x - 4, y - 4))
+        carta_surf = superficie_carta(self, w, h, boca_arriba)
+        copiada = False
 
-        # Superficie de la carta
-        carta_surf = pygame.Surface((w, h), pygame.SRCALPHA)
-        
-        if boca_arriba:
-            # Fondo con textura premium
-            fondo_color = self.fondo_carta()
-            pygame.draw.rect(carta_surf, fondo_color, carta_surf.get_rect(), border_radius=10)
-            
-            # Patrón de lujo en el fondo
-            for i in range(0, w, 8):
-                for j in range(0, h, 8):
-                    if (i + j) % 16 == 0:
-                        pygame.draw.circle(carta_surf, (255, 255, 255, 30), (i, j), 1)
-            
-            # Borde exterior negro
-            pygame.draw.rect(carta_surf, COLORES["NEGRO_CARTA"], carta_surf.get_rect(), 2, border_radius=10)
-            
-            # Borde interior dorado/plateado
-            borde_color = COLORES["ORO_SECUNDARIO"] if self.valor >= 12 else COLORES["PLATA_OSCURO"]
-            pygame.draw.rect(carta_surf, borde_color, (3, 3, w-6, h-6), 2, border_radius=8)
-            
-            # Valor superior
-            txt_color = self.color_carta()
-            valor_txt = fuente_media.render(str(self), True, txt_color)
-            carta_surf.blit(valor_txt, (10, 8))
-            
-            # Símbolo del palo en el centro (más grande y elegante)
-            simbolo = fuente_grande.render(SUITS[self.palo], True, txt_color)
-            carta_surf.blit(simbolo, (w//2 - simbolo.get_width()//2, h//2 - simbolo.get_height()//2))
-            
-            # Valor inferior (invertido)
-            valor_inv = fuente_media.render(str(self), True, txt_color)
-            valor_inv = pygame.transform.rotate(valor_inv, 180)
-            carta_surf.blit(valor_inv, (w - valor_inv.get_width() - 10, h - valor_inv.get_height() - 8))
-            
-            # Efecto de brillo si está activo
-            if self.brillo > 0:
-                brillo_surf = pygame.Surface((w, h), pygame.SRCALPHA)
-                pygame.draw.rect(brillo_surf, (255, 255, 200, self.brillo), brillo_surf.get_rect(), border_radius=10)
-                carta_surf.blit(brillo_surf, (0, 0))
-                
-        else:
-            # Dorso de carta premium - Diseño de casino de lujo
-            pygame.draw.rect(carta_surf, COLORES["NEGRO_LUJO"], carta_surf.get_rect(), border_radius=10)
-            
-            # Borde dorado en el dorso
-            pygame.draw.rect(carta_surf, COLORES["ORO_PRINCIPAL"], carta_surf.get_rect(), 3, border_radius=10)
-            
-            # Patrón geométrico de lujo
-            centro_x, centro_y = w//2, h//2
-            radio = min(w, h) // 3
-            
-            # Diseño central
-            for i in range(8):
-                angulo = math.radians(i * 45)
-                x1 = centro_x + math.cos(angulo) * radio * 0.3
-                y1 = centro_y + math.sin(angulo) * radio * 0.3
-                x2 = centro_x + math.cos(angulo) * radio
-                y2 = centro_y + math.sin(angulo) * radio
-                pygame.draw.line(carta_surf, COLORES["ORO_SECUNDARIO"], (x1, y1), (x2, y2), 2)
-            
-            # Círculo central
-            pygame.draw.circle(carta_surf, COLORES["ORO_PRINCIPAL"], (centro_x, centro_y), radio//3, 2)
-            
-            # Texto "PREMIUM"
-            premium_txt = fuente_pequena.render("PREMIUM", True, COLORES["ORO_CLARO"])
-            carta_surf.blit(premium_txt, (centro_x - premium_txt.get_width()//2, centro_y - premium_txt.get_height()//2))
+        # Efecto de brillo si está activo
+        if boca_arriba and self.brillo > 0:
+            carta_surf = carta_surf.copy()
+            copiada = True
+            brillo_surf = capa_brillo(w, h)
+            brillo_surf.set_alpha(self.brillo)
+            carta_surf.blit(brillo_surf, (0, 0))
 
         # Aplicar rotación si es necesario
         if self.angulo != 0:
             carta_surf = pygame.transform.rotate(carta_surf, self.angulo)
-            
-        # Aplicar transparencia
+            copiada = True
+
+        # Aplicar transparencia (sobre una copia para no alterar la caché)
         if self.alpha < 255:
+            if not copiada:
+                carta_surf = carta_surf.copy()
             carta_surf.set_alpha(self.alpha)
-            
+
         surface.blit(carta_surf, (x, y))
 
-class Jugador:
-    def __init__(self, nombre, es_ia=False, fichas=2000, personalidad="normal", es_usuario=False):
-        self.nombre = nombre
-        self.es_ia = es_ia
-        self.es_usuario = es_usuario
-        self.fichas = fichas
-        self.mano = []
-        self.apuesta_actual = 0
-        self.en_juego = True
-        self.ha_hecho_all_in = False
-        self.ha_pasado = False
-        self.mano_final = None
-        self.ranking_mano = None
-        self.personalidad = personalidad
-        self.avatar_color = self.generar_color_premium()
-        self.ultima_accion = ""
-        self.tiempo_decision = 0
-        self.efecto_brillo = 0
-
-    def generar_color_premium(self):
-        """Colores de avatar premium"""
-        if self.es_usuario:
-            return COLORES["ORO_PRINCIPAL"]
-        elif "Ana" in self.nombre:
-            return (180, 80, 120)  # Rosa oscuro premium
-        elif "Luis" in self.nombre:
-            return (80, 160, 120)  # Verde esmeralda
-        elif "Mia" in self.nombre:
-            return (160, 100, 200)  # Púrpura real
-        else:
-            return (random.randint(120, 180), random.randint(120, 180), random.randint(120, 180))
-
-    def recibir_carta(self, carta):
-        self.mano.append(carta)
-
-    def hacer_apuesta(self, cantidad):
-        cantidad = max(0, int(cantidad))
-        if cantidad >= self.fichas:
-            cantidad = self.fichas
-            self.ha_hecho_all_in = True
-        self.fichas -= cantidad
-        self.apuesta_actual += cantidad
-        return cantidad
-
-    def reset_apuesta(self):
-        self.apuesta_actual = 0
-        self.ha_pasado = False
-
-    def puede_jugar(self):
-        return self.en_juego and not self.ha_hecho_all_in and self.fichas > 0
-
-    # IA mejorada
-    def tomar_decision_ia(self, apuesta_requerida, bote_actual, cartas_comunitarias, ronda, apuesta_minima, jugadores_en_vida):
-        if not self.puede_jugar():
-            return "fold", 0
-            
-        # Calcular fuerza de mano simple
-        fuerza = self.calcular_fuerza_mano(cartas_comunitarias)
-        
-        # Modificar fuerza según personalidad
-        if self.personalidad == "agresiva":
-            fuerza *= 1.3
-        elif self.personalidad == "conservadora":
-            fuerza *= 0.7
-        elif self.personalidad == "impredecible":
-            fuerza *= random.uniform(0.5, 1.5)
-        
-        # Tomar decisión basada en fuerza
-        if fuerza < 0.3:
-            self.ultima_accion = "fold"
-            return "fold", 0
-        elif fuerza < 0.6:
-            self.ultima_accion = "call"
-            return "call", apuesta_requerida
-        elif fuerza < 0.9:
-            raise_amt = min(self.fichas, apuesta_minima * 2)
-            self.ultima_accion = f"raise {raise_amt}"
-            return "raise", raise_amt
-        else:
-            self.ultima_accion = "all in"
-            return "raise", self.fichas
-
-    def calcular_fuerza_mano(self, cartas_comunitarias):
-        """Calcular fuerza aproximada de la mano"""
-        if len(cartas_comunitarias) == 0:
-            # Pre-flop: basado en valor de cartas
-            valores = sorted([c.valor for c in self.mano], reverse=True)
-            base = valores[0] / 14.0 * 0.6 + valores[1] / 14.0 * 0.4
-            
-            # Bonus por pareja o cartas altas
-            if valores[0] == valores[1]:
-                base += 0.3  # Par
-            elif valores[0] >= 12 or valores[1] >= 12:
-                base += 0.2  # Cartas altas
-                
-            return min(1.0, base)
-        else:
-            # Post-flop: evaluación más simple
-            return random.uniform(0.2, 0.9)
-
-# ---------- Clase Principal del Juego Premium ----------
-class PokerGame:
-    def __init__(self, jugador_usuario=None):
-        if jugador_usuario:
-            self.jugadores = [
-                jugador_usuario,
-                Jugador("IA - Ana", es_ia=True, fichas=2500, personalidad="agresiva"),
-                Jugador("IA - Luis", es_ia=True, fichas=2500, personalidad="conservadora"),
-                Jugador("IA - Mia", es_ia=True, fichas=2500, personalidad="impredecible")
-            ]
-        else:
-            self.jugadores = [
-                Jugador("Tú", es_ia=False, fichas=3000, es_usuario=True),
-                Jugador("IA - Ana", es_ia=True, fichas=2500, personalidad="agresiva"),
-                Jugador("IA - Luis", es_ia=True, fichas=2500, personalidad="conservadora"),
-                Jugador("IA - Mia", es_ia=True, fichas=2500, personalidad="impredecible")
-            ]
-            
-        self.mazo = []
-        self.cartas_comunitarias = []
-        self.bote = 0
-        self.apuesta_minima = 50
-        self.dealer_index = 0
-        self.jugador_actual_index = 1
-        self.estado = EstadoJuego.PREFLOP
-        self.ronda_terminada = False
-        self.ganador = None
-        self.animaciones = []
-        self.efecto_brillo_mesa = 0
-        self.juego_activo = False
-        self.crear_mazo()
-
-    def crear_mazo(self):
-        self.mazo = [Carta(p, v) for p in range(4) for v in range(2,15)]
-
-    def barajar(self):
-        random.shuffle(self.mazo)
-
-    def repartir_cartas(self):
-        for j in self.jugadores:
-            j.mano = []
-        for _ in range(2):
-            for j in self.jugadores:
-                if len(self.mazo) > 0:
-                    j.recibir_carta(self.mazo.pop())
-
-    def repartir_cartas_comunitarias(self):
-        if self.estado == EstadoJuego.FLOP and len(self.cartas_comunitarias) == 0:
-            if len(self.mazo) > 0: 
-                self.mazo.pop()  # Quemar carta
-            for _ in range(3):
-                if len(self.mazo) > 0:
-                    carta = self.mazo.pop()
-                    self.cartas_comunitarias.append(carta)
-                    crear_particulas(WIDTH//2, HEIGHT//2, 30, "oro")
-                    
-        elif self.estado == EstadoJuego.TURN and len(self.cartas_comunitarias) == 3:
-            if len(self.mazo) > 0: 
-                self.mazo.pop()  # Quemar carta
-            if len(self.mazo) > 0:
-                carta = self.mazo.pop()
-                self.cartas_comunitarias.append(carta)
-                crear_particulas(WIDTH//2, HEIGHT//2, 20, "oro")
-                
-        elif self.estado == EstadoJuego.RIVER and len(self.cartas_comunitarias) == 4:
-            if len(self.mazo) > 0: 
-                self.mazo.pop()  # Quemar carta
-            if len(self.mazo) > 0:
-                carta = self.mazo.pop()
-                self.cartas_comunitarias.append(carta)
-                crear_particulas(WIDTH//2, HEIGHT//2, 20, "oro")
-
-    def iniciar_nueva_mano(self):
-        try:
-            self.crear_mazo()
-            self.barajar()
-            self.cartas_comunitarias = []
-            self.bote = 0
-            self.estado = EstadoJuego.PREFLOP
-            self.ronda_terminada = False
-            self.ganador = None
-            self.juego_activo = True
-            
-            # Reset jugadores
-            for j in self.jugadores:
-                j.reset_apuesta()
-                j.mano = []
-                j.en_juego = True
-                j.ha_hecho_all_in = False
-                j.mano_final = None
-                j.ranking_mano = None
-                j.ultima_accion = ""
-            
-            # Repartir cartas
-            self.repartir_cartas()
-            
-            # Aplicar blinds
-            small = self.apuesta_minima // 2
-            big = self.apuesta_minima
-            
-            # Encontrar jugadores válidos para blinds
-            jugadores_validos = [i for i, j in enumerate(self.jugadores) if j.fichas > 0]
-            if len(jugadores_validos) < 2:
-                return False
-                
-            self.dealer_index = jugadores_validos[0]
-            sb_idx = jugadores_validos[1]
-            bb_idx = jugadores_validos[2 % len(jugadores_validos)] if len(jugadores_validos) > 2 else jugadores_validos[0]
-            
-            # Aplicar small blind y big blind
-            if sb_idx < len(self.jugadores):
-                self.jugadores[sb_idx].hacer_apuesta(small)
-            if bb_idx < len(self.jugadores):
-                self.jugadores[bb_idx].hacer_apuesta(big)
-                
-            self.bote = small + big
-            
-            # Encontrar siguiente jugador después del big blind
-            self.jugador_actual_index = self.encontrar_siguiente_jugador_index(bb_idx)
-            if self.jugador_actual_index is None:
-                self.jugador_actual_index = self.encontrar_siguiente_jugador_index(0)
-            
-            crear_particulas(WIDTH//2, HEIGHT//2, 40, "oro")
-            return True
-            
-        except Exception as e:
-            print(f"Error al iniciar nueva mano: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-
-    def encontrar_siguiente_jugador_index(self, desde):
-        n = len(self.jugadores)
-        for i in range(1, n+1):
-            idx = (desde + i) % n
-            if idx < len(self.jugadores):
-                j = self.jugadores[idx]
-                if j.en_juego and (not j.ha_hecho_all_in) and j.fichas > 0:
-                    return idx
-        return None
-
-    def verificar_fin_ronda(self):
-        jugadores_activos = [j for j in self.jugadores if j.en_juego and j.fichas > 0]
-        if len(jugadores_activos) <= 1:
-            self.ronda_terminada = True
-            return
-            
-        apuesta_max = max(j.apuesta_actual for j in jugadores_activos)
-        for j in jugadores_activos:
-            if not j.ha_hecho_all_in and j.apuesta_actual != apuesta_max:
-                self.ronda_terminada = False
-                return
-                
-        self.ronda_terminada = True
-
-    def siguiente_estado(self):
-        if self.estado == EstadoJuego.PREFLOP:
-            self.estado = EstadoJuego.FLOP
-        elif self.estado == EstadoJuego.FLOP:
-            self.estado = EstadoJuego.TURN
-        elif self.estado == EstadoJuego.TURN:
-            self.estado = EstadoJuego.RIVER
-        elif self.estado == EstadoJuego.RIVER:
-            self.estado = EstadoJuego.SHOWDOWN
-            self.determinar_ganador()
-        elif self.estado == EstadoJuego.SHOWDOWN:
-            self.estado = EstadoJuego.FINAL
-            
-        crear_particulas(WIDTH//2, HEIGHT//2, 60, "oro")
-        
-        for j in self.jugadores:
-            j.reset_apuesta()
-        self.ronda_terminada = False
-        
-        # Encontrar siguiente jugador activo
-        jugadores_activos = [i for i, j in enumerate(self.jugadores) if j.en_juego and j.fichas > 0]
-        if jugadores_activos:
-            self.jugador_actual_index = jugadores_activos[0]
-
-    def determinar_ganador(self):
-        jugadores_activos = [j for j in self.jugadores if j.en_juego]
-        if len(jugadores_activos) == 1:
-            self.ganador = jugadores_activos[0]
-            self.ganador.fichas += self.bote
-            crear_particulas(WIDTH//2, HEIGHT//2, 150, "oro")
-            crear_particulas(WIDTH//2, HEIGHT//2, 50, "diamante")
-            
-            # Actualizar estadísticas si es usuario
-            if hasattr(self.ganador, 'es_usuario') and self.ganador.es_usuario:
-                usuarios = cargar_usuarios()
-                if self.ganador.nombre in usuarios:
-                    usuarios[self.ganador.nombre]["fichas"] = self.ganador.fichas
-                    guardar_usuarios(usuarios)
-            
-            self.bote = 0
-            return
-            
-        # Para simplificar, el ganador es el primer jugador activo
-        if jugadores_activos:
-            self.ganador = jugadores_activos[0]
-            self.ganador.fichas += self.bote
-            crear_particulas(WIDTH//2, HEIGHT//2, 200, "oro")
-            crear_particulas(WIDTH//2, HEIGHT//2, 80, "diamante")
-            
-            # Actualizar estadísticas si es usuario
-            if hasattr(self.ganador, 'es_usuario') and self.ganador.es_usuario:
-                usuarios = cargar_usuarios()
-                if self.ganador.nombre in usuarios:
-                    usuarios[self.ganador.nombre]["fichas"] = self.ganador.fichas
-                    guardar_usuarios(usuarios)
-        
-        self.bote = 0
+# ---------- Caché de superficies de carta ----------
+# Caras y dorsos ya dibujados, por (palo, valor, w, h, boca_arriba), con
+# expulsión LRU. Con los dos tamaños de la mesa caben las 52 caras de cada uno.
+MAX_SUPERFICIES_CARTA = 128
+_superficies_carta = OrderedDict()
+_sombras_carta = {}
+_capas_brillo = {}
+
+def pintar_dorso(w, h):
+    """Dorso de carta premium - Diseño de casino de lujo"""
+    carta_surf = pygame.Surface((w, h), pygame.SRCALPHA)
+    pygame.draw.rect(carta_surf, COLORES["NEGRO_LUJO"], carta_surf.get_rect(), border_radius=10)
+
+    # Borde dorado en el dorso
+    pygame.draw.rect(carta_surf, COLORES["ORO_PRINCIPAL"], carta_surf.get_rect(), 3, border_radius=10)
+
+    # Patrón geométrico de lujo
+    centro_x, centro_y = w//2, h//2
+    radio = min(w, h) // 3
+
+    # Diseño central
+    for i in range(8):
+        angulo = math.radians(i * 45)
+        x1 = centro_x + math.cos(angulo) * radio * 0.3
+        y1 = centro_y + math.sin(angulo) * radio * 0.3
+        x2 = centro_x + math.cos(angulo) * radio
+        y2 = centro_y + math.sin(angulo) * radio
+        pygame.draw.line(carta_surf, COLORES["ORO_SECUNDARIO"], (x1, y1), (x2, y2), 2)
+
+    # Círculo central
+    pygame.draw.circle(carta_surf, COLORES["ORO_PRINCIPAL"], (centro_x, centro_y), radio//3, 2)
+
+    # Texto "PREMIUM"
+    premium_txt = fuente_pequena.render("PREMIUM", True, COLORES["ORO_CLARO"])
+    carta_surf.blit(premium_txt, (centro_x - premium_txt.get_width()//2, centro_y - premium_txt.get_height()//2))
+    return carta_surf
+
+def superficie_carta(carta, w, h, boca_arriba):
+    """Cara o dorso cacheado; no modificar la superficie devuelta"""
+    # Todos los dorsos son iguales: comparten entrada
+    clave = (carta.palo, carta.valor, w, h, True) if boca_arriba else (None, None, w, h, False)
+    carta_surf = _superficies_carta.get(clave)
+    if carta_surf is not None:
+        _superficies_carta.move_to_end(clave)
+        return carta_surf
+
+    carta_surf = carta.pintar_cara(w, h) if boca_arriba else pintar_dorso(w, h)
+    _superficies_carta[clave] = carta_surf
+    if len(_superficies_carta) > MAX_SUPERFICIES_CARTA:
+        _superficies_carta.popitem(last=False)
+    return carta_surf
+
+def sombra_carta(w, h):
+    """Sombra premium cacheada por tamaño"""
+    sombra_surf = _sombras_carta.get((w, h))
+    if sombra_surf is None:
+        sombra_surf = pygame.Surface((w + 8, h + 8), pygame.SRCALPHA)
+        pygame.draw.rect(sombra_surf, (0, 0, 0, 120), sombra_surf.get_rect(), border_radius=12)
+        _sombras_carta[(w, h)] = sombra_surf
+    return sombra_surf
+
+def capa_brillo(w, h):
+    """Capa de brillo opaca; la intensidad se aplica con set_alpha"""
+    brillo_surf = _capas_brillo.get((w, h))
+    if brillo_surf is None:
+        brillo_surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        pygame.draw.rect(brillo_surf, (255, 255, 200, 255), brillo_surf.get_rect(), border_radius=10)
+        _capas_brillo[(w, h)] = brillo_surf
+    return brillo_surf
+
+# Una vista por código, creada la primera vez que se dibuja la carta
+_vistas_carta = {}
+
+def vista_carta(codigo):
+    """Carta dibujable para un código entero del motor"""
+    vista = _vistas_carta.get(codigo)
+    if vista is None:
+        vista = _vistas_carta[codigo] = Carta(palo_carta(codigo), valor_carta(codigo))
+    return vista
+
+class VistaPartida(VistaMesa):
+    """Mesa recibida del servidor con partículas y guardado de fichas del usuario"""
+
+    def efecto(self, cantidad, tipo="oro"):
+        crear_particulas(WIDTH//2, HEIGHT//2, cantidad, tipo)
+
+    def registrar_resultado(self):
+        # Una vez por mano: estadísticas y fichas del usuario (se escriben por lotes)
+        j = self.mi_jugador()
+        if isinstance(j, JugadorSesion):
+            j.sesion.registrar_mano(j in self.ganadores)
+            j.sesion.sincronizar()
+
+def crear_cliente(historial):
+    """Cliente del servidor externo, o de uno local con las IA en el pool de procesos"""
+    if SERVIDOR:
+        host, puerto = SERVIDOR.rsplit(":", 1)
+        return ClienteMesa((host, int(puerto)))
+    # La interfaz espera al usuario: sin pausa ni límite de tiempo entre manos y turnos
+    # Los perfiles de juego de cada jugador se guardan con los usuarios entre sesiones
+    return ClienteMesa(pausa=None, tiempo_turno=None, procesos_ia=PROCESOS_IA if IA_ASINCRONA else 0,
+                       presupuesto_ia_ms=PRESUPUESTO_DECISION_MS, historial=historial,
+                       perfiles=obtener_almacen())
 
 # ---------- Renderizado UI Premium ----------
-def dibujar_mesa_premium(surface, juego):
+# ---------- Capas de fondo estáticas ----------
+# Fondos que no cambian entre frames, pintados una vez por resolución
+_capas_fondo = {}
+
+def capa_fondo(nombre, pintar):
+    """Capa estática 'nombre' a la resolución actual; pintar(w, h) solo se llama la primera vez"""
+    clave = (nombre, WIDTH, HEIGHT)
+    capa = _capas_fondo.get(clave)
+    if capa is None:
+        capa = pintar(WIDTH, HEIGHT)
+        # Mismo formato que la ventana para que el blit sea una copia directa
+        if pygame.display.get_surface() is not None:
+            capa = capa.convert()
+        _capas_fondo[clave] = capa
+    return capa
+
+def pintar_fondo_liso(w, h):
+    """Fondo negro de lujo del menú y del login"""
+    capa = pygame.Surface((w, h))
+    capa.fill(COLORES["NEGRO_LUJO"])
+    return capa
+
+def pintar_fondo_mesa(w, h):
+    """Terciopelo, sombra, mesa ovalada con su diseño y logo"""
+    capa = pygame.Surface((w, h))
+
     # Fondo con textura de terciopelo negro
-    for y in range(HEIGHT):
+    for y in range(h):
         color = (
             max(0, COLORES["NEGRO_LUJO"][0] + (y // 100)),
             max(0, COLORES["NEGRO_LUJO"][1] + (y // 120)),
             max(0, COLORES["NEGRO_LUJO"][2] + (y // 140))
         )
-        pygame.draw.line(surface, color, (0, y), (WIDTH, y))
-    
-    # Efecto de brillo pulsante en la mesa
-    if juego and juego.juego_activo:
-        juego.efecto_brillo_mesa = (juego.efecto_brillo_mesa + 0.02) % (2 * math.pi)
-    
+        pygame.draw.line(capa, color, (0, y), (w, y))
+
     # Mesa ovalada premium
-    tabla_ancho = int(WIDTH * 0.88)
-    tabla_alto = int(HEIGHT * 0.65)
-    tabla_x = (WIDTH - tabla_ancho) // 2
-    tabla_y = (HEIGHT - tabla_alto) // 2
-    
+    tabla_ancho = int(w * 0.88)
+    tabla_alto = int(h * 0.65)
+    tabla_x = (w - tabla_ancho) // 2
+    tabla_y = (h - tabla_alto) // 2
+
     # Sombra de lujo
     sombra_surf = pygame.Surface((tabla_ancho + 30, tabla_alto + 30), pygame.SRCALPHA)
     for i in range(15, 0, -2):
         alpha = 100 - i * 6
         pygame.draw.ellipse(sombra_surf, (0, 0, 0, alpha), 
                           (15-i, 15-i, tabla_ancho+2*i, tabla_alto+2*i))
-    surface.blit(sombra_surf, (tabla_x-15, tabla_y-15))
-    
+    capa.blit(sombra_surf, (tabla_x-15, tabla_y-15))
+
     # Mesa principal con degradado
     tabla = crear_degradado_vertical(tabla_ancho, tabla_alto, COLORES["NEGRO_SUAVE"], COLORES["NEGRO_LUJO"])
-    
+
     # Patrón de diseño premium en la mesa
     centro_x, centro_y = tabla_ancho // 2, tabla_alto // 2
     radio_max = min(tabla_ancho, tabla_alto) // 2 - 20
-    
+
     # Diseño circular concéntrico dorado
     for i in range(1, 6):
         radio = radio_max - i * 25
         if radio > 0:
             pygame.draw.ellipse(tabla, COLORES["ORO_PRINCIPAL"], 
                               (centro_x - radio, centro_y - radio, radio*2, radio*2), 3)
-    
+
     # Líneas radiales doradas
     for i in range(8):
         angulo = math.radians(i * 45)
@@ -763,30 +710,43 @@ def dibujar_mesa_premium(surface, juego):
         x2 = centro_x + math.cos(angulo) * (radio_max - 10)
         y2 = centro_y + math.sin(angulo) * (radio_max - 10)
         pygame.draw.line(tabla, COLORES["ORO_SECUNDARIO"], (x1, y1), (x2, y2), 2)
-    
+
     # Borde exterior de lujo
     pygame.draw.ellipse(tabla, COLORES["ORO_PRINCIPAL"], tabla.get_rect(), 8)
     pygame.draw.ellipse(tabla, COLORES["ORO_CLARO"], (4, 4, tabla_ancho-8, tabla_alto-8), 4)
-    
-    surface.blit(tabla, (tabla_x, tabla_y))
-    
+
+    capa.blit(tabla, (tabla_x, tabla_y))
+
     # Logo premium centrado
     logo_texto = fuente_titulo.render("CASINO PREMIUM", True, COLORES["ORO_CLARO"])
-    surface.blit(logo_texto, (WIDTH//2 - logo_texto.get_width()//2, HEIGHT//2 - logo_texto.get_height()//2))
-    
+    capa.blit(logo_texto, (w//2 - logo_texto.get_width()//2, h//2 - logo_texto.get_height()//2))
+
     logo_subtexto = fuente_elegante.render("Texas Hold'em Edition", True, COLORES["PLATA"])
-    surface.blit(logo_subtexto, (WIDTH//2 - logo_subtexto.get_width()//2, HEIGHT//2 + 40))
+    capa.blit(logo_subtexto, (w//2 - logo_subtexto.get_width()//2, h//2 + 40))
+    return capa
 
-def dibujar_jugadores_premium(surface, juego):
-    if not juego or not juego.jugadores:
-        return
-        
-    posiciones = [
+def dibujar_mesa_premium(surface, juego):
+    # Todo lo estático de la mesa en un solo blit
+    surface.blit(capa_fondo("mesa", pintar_fondo_mesa), (0, 0))
+
+    # Efecto de brillo pulsante en la mesa
+    if juego and juego.juego_activo:
+        juego.efecto_brillo_mesa = (juego.efecto_brillo_mesa + 0.02) % (2 * math.pi)
+
+def posiciones_jugadores():
+    """Centro del avatar de cada asiento"""
+    return [
         (WIDTH//2, int(HEIGHT*0.78)),      # bottom - player
         (int(WIDTH*0.84), int(HEIGHT*0.48)), # right
         (WIDTH//2, int(HEIGHT*0.18)),      # top
         (int(WIDTH*0.16), int(HEIGHT*0.48))  # left
     ]
+
+def dibujar_jugadores_premium(surface, juego):
+    if not juego or not juego.jugadores:
+        return
+        
+    posiciones = posiciones_jugadores()
     
     for i, j in enumerate(juego.jugadores):
         if i >= len(posiciones):
@@ -831,16 +791,16 @@ def dibujar_jugadores_premium(surface, juego):
         
         # Nombre del jugador
         color_nombre = COLORES["BLANCO_PREMIUM"] if j.en_juego else COLORES["PLATA_OSCURO"]
-        nombre = fuente_pequena.render(j.nombre, True, color_nombre)
+        nombre = textos.render(fuente_pequena, j.nombre, color_nombre)
         surface.blit(nombre, (x - nombre.get_width()//2, y + avatar_radio + 25))
         
         # Fichas
-        fichas = fuente_pequena.render(f"${j.fichas:,}", True, COLORES["ORO_CLARO"])
+        fichas = textos.render(fuente_pequena, f"${j.fichas:,}", COLORES["ORO_CLARO"])
         surface.blit(fichas, (x - fichas.get_width()//2, y + avatar_radio + 45))
         
         # Apuesta actual
         if j.apuesta_actual > 0:
-            apuesta = fuente_pequena.render(f"Apuesta: ${j.apuesta_actual}", True, COLORES["BLANCO_PREMIUM"])
+            apuesta = textos.render(fuente_pequena, f"Apuesta: ${j.apuesta_actual}", COLORES["BLANCO_PREMIUM"])
             surface.blit(apuesta, (x - apuesta.get_width()//2, y + avatar_radio + 65))
         
         # Botón dealer
@@ -848,7 +808,7 @@ def dibujar_jugadores_premium(surface, juego):
             dealer_rect = pygame.Rect(x - 25, y - avatar_radio - 30, 50, 24)
             pygame.draw.rect(surface, COLORES["ORO_PRINCIPAL"], dealer_rect, border_radius=12)
             pygame.draw.rect(surface, COLORES["ORO_CLARO"], dealer_rect, 2, border_radius=12)
-            dealer_text = fuente_pequena.render("D", True, COLORES["NEGRO_LUJO"])
+            dealer_text = textos.render(fuente_pequena, "D", COLORES["NEGRO_LUJO"])
             surface.blit(dealer_text, (dealer_rect.centerx - dealer_text.get_width()//2, 
                                      dealer_rect.centery - dealer_text.get_height()//2))
         
@@ -857,31 +817,31 @@ def dibujar_jugadores_premium(surface, juego):
             allin_rect = pygame.Rect(x - 40, y - avatar_radio - 60, 80, 24)
             pygame.draw.rect(surface, (180, 40, 40), allin_rect, border_radius=12)
             pygame.draw.rect(surface, COLORES["ORO_CLARO"], allin_rect, 2, border_radius=12)
-            allin_text = fuente_pequena.render("ALL IN", True, COLORES["BLANCO_PREMIUM"])
+            allin_text = textos.render(fuente_pequena, "ALL IN", COLORES["BLANCO_PREMIUM"])
             surface.blit(allin_text, (allin_rect.centerx - allin_text.get_width()//2, 
                                     allin_rect.centery - allin_text.get_height()//2))
         elif not j.en_juego:
             fold_rect = pygame.Rect(x - 35, y - avatar_radio - 60, 70, 24)
             pygame.draw.rect(surface, (80, 80, 80), fold_rect, border_radius=12)
-            fold_text = fuente_pequena.render("FOLD", True, COLORES["BLANCO_PREMIUM"])
+            fold_text = textos.render(fuente_pequena, "FOLD", COLORES["BLANCO_PREMIUM"])
             surface.blit(fold_text, (fold_rect.centerx - fold_text.get_width()//2, 
                                    fold_rect.centery - fold_text.get_height()//2))
         
         # Cartas del jugador
-        boca_arriba = (not j.es_ia) or (juego.estado == EstadoJuego.SHOWDOWN) or (i == 0)
+        boca_arriba = juego.visibles[i]
         for idx, carta in enumerate(j.mano):
             if idx < 2:  # Solo mostrar 2 cartas
                 carta_x = x - 50 + idx * 60
                 carta_y = y + avatar_radio + 110
-                carta.dibujar_premium(surface, carta_x, carta_y, w=72, h=100, boca_arriba=boca_arriba)
+                vista_carta(carta).dibujar_premium(surface, carta_x, carta_y, w=72, h=100, boca_arriba=boca_arriba)
         
         # Última acción de IA
-        if j.es_ia and j.ultima_accion and juego.estado != EstadoJuego.SHOWDOWN and juego.juego_activo:
+        if j.es_ia and j.ultima_accion and juego.estado not in (EstadoJuego.SHOWDOWN, EstadoJuego.FINAL) and juego.juego_activo:
             accion_rect = pygame.Rect(x - 60, y - avatar_radio - 90, 120, 24)
             accion_surf = pygame.Surface((120, 24), pygame.SRCALPHA)
             pygame.draw.rect(accion_surf, (40, 40, 40, 200), accion_surf.get_rect(), border_radius=8)
             surface.blit(accion_surf, accion_rect)
-            accion_text = fuente_pequena.render(j.ultima_accion, True, COLORES["ORO_CLARO"])
+            accion_text = textos.render(fuente_pequena, j.ultima_accion, COLORES["ORO_CLARO"])
             surface.blit(accion_text, (accion_rect.centerx - accion_text.get_width()//2, 
                                      accion_rect.centery - accion_text.get_height()//2))
 
@@ -907,16 +867,16 @@ def dibujar_comunitarias_premium(surface, juego):
     # Cartas comunitarias
     for i in range(5):
         if i < len(juego.cartas_comunitarias):
-            juego.cartas_comunitarias[i].dibujar_premium(surface, x0 + i * 120, y0, w=100, h=140, boca_arriba=True)
+            vista_carta(juego.cartas_comunitarias[i]).dibujar_premium(surface, x0 + i * 120, y0, w=100, h=140, boca_arriba=True)
         else:
             # Placeholder para cartas no reveladas
             if juego.estado.value > i:
-                carta_placeholder = Carta(0, 2)
+                carta_placeholder = vista_carta(codigo_carta(0, 2))
                 carta_placeholder.dibujar_premium(surface, x0 + i * 120, y0, w=100, h=140, boca_arriba=False)
     
     # Bote
     bote_text = f"BOTE: ${juego.bote:,}"
-    bote_surf = fuente_grande.render(bote_text, True, COLORES["ORO_CLARO"])
+    bote_surf = textos.render(fuente_grande, bote_text, COLORES["ORO_CLARO"])
     surface.blit(bote_surf, (WIDTH//2 - bote_surf.get_width()//2, y0 - 80))
     
     # Estado de la ronda
@@ -928,21 +888,42 @@ def dibujar_comunitarias_premium(surface, juego):
         EstadoJuego.SHOWDOWN: "SHOWDOWN", 
         EstadoJuego.FINAL: "MANO FINALIZADA"
     }
-    estado_text = fuente_media.render(estados[juego.estado], True, COLORES["ORO_SECUNDARIO"])
+    estado_text = textos.render(fuente_media, estados[juego.estado], COLORES["ORO_SECUNDARIO"])
     surface.blit(estado_text, (WIDTH//2 - estado_text.get_width()//2, 30))
 
+def rects_controles():
+    """Panel de controles y botones FOLD, CALL, RAISE y ALL IN"""
+    panel_ancho = 600
+    panel_alto = 140
+    panel_rect = pygame.Rect(WIDTH//2 - panel_ancho//2, HEIGHT - panel_alto - 20, panel_ancho, panel_alto)
+    
+    # Botones de acción
+    btn_ancho = 130
+    btn_alto = 50
+    espacio = 20
+    botones = tuple(pygame.Rect(panel_rect.x + espacio*(k+1) + btn_ancho*k, panel_rect.y + 60, btn_ancho, btn_alto)
+                    for k in range(4))
+    return panel_rect, botones
+
+def controles_visibles(juego):
+    """¿Es el turno del jugador humano?"""
+    if not juego or not juego.juego_activo:
+        return False
+    # El servidor solo envía acciones a quien tiene el turno
+    return bool(juego.acciones_validas())
+
+def rect_nueva_mano():
+    return pygame.Rect(WIDTH//2-140, HEIGHT//2+80, 280, 60)
+
 def dibujar_controles_premium(surface, juego):
-    if not juego or not juego.juego_activo or juego.jugador_actual_index >= len(juego.jugadores):
+    if not controles_visibles(juego):
         return None, None, None, None
         
     jugador = juego.jugadores[juego.jugador_actual_index]
-    if jugador.es_ia or juego.estado in (EstadoJuego.SHOWDOWN, EstadoJuego.FINAL):
-        return None, None, None, None
     
     # Panel de controles premium
-    panel_ancho = 600
-    panel_alto = 140
-    panel_rect = pygame.Rect(WIDTH//2 - panel_ancho//2, HEIGHT - panel_alto - 20, panel_ancho, panel_alto)
+    panel_rect, (fold_r, call_r, raise_r, allin_r) = rects_controles()
+    panel_ancho, panel_alto = panel_rect.size
     
     # Fondo del panel
     panel_surf = pygame.Surface((panel_ancho, panel_alto), pygame.SRCALPHA)
@@ -952,88 +933,71 @@ def dibujar_controles_premium(surface, juego):
     surface.blit(panel_surf, panel_rect)
     
     # Título del panel
-    titulo = fuente_media.render("TU TURNO", True, COLORES["ORO_CLARO"])
+    titulo = textos.render(fuente_media, "TU TURNO", COLORES["ORO_CLARO"])
     surface.blit(titulo, (panel_rect.centerx - titulo.get_width()//2, panel_rect.y + 15))
     
-    # Botones de acción
-    btn_ancho = 130
-    btn_alto = 50
-    espacio = 20
-    
-    fold_r = pygame.Rect(panel_rect.x + espacio, panel_rect.y + 60, btn_ancho, btn_alto)
-    call_r = pygame.Rect(panel_rect.x + espacio*2 + btn_ancho, panel_rect.y + 60, btn_ancho, btn_alto)
-    raise_r = pygame.Rect(panel_rect.x + espacio*3 + btn_ancho*2, panel_rect.y + 60, btn_ancho, btn_alto)
-    allin_r = pygame.Rect(panel_rect.x + espacio*4 + btn_ancho*3, panel_rect.y + 60, btn_ancho, btn_alto)
-    
     mouse_pos = pygame.mouse.get_pos()
     
     # Dibujar botones
     dibujar_boton_premium(surface, fold_r, "FOLD", fold_r.collidepoint(mouse_pos))
     
-    necesidad = max(0, juego.apuesta_minima - jugador.apuesta_actual)
-    dibujar_boton_premium(surface, call_r, f"CALL ${necesidad}", call_r.collidepoint(mouse_pos))
+    necesidad = juego.cantidad_para_igualar(jugador)
+    dibujar_boton_premium(surface, call_r, f"CALL ${necesidad}" if necesidad else "CHECK", call_r.collidepoint(mouse_pos))
     
     dibujar_boton_premium(surface, raise_r, "RAISE", raise_r.collidepoint(mouse_pos))
     dibujar_boton_premium(surface, allin_r, "ALL IN", allin_r.collidepoint(mouse_pos))
     
     # Información de apuesta
-    info_text = fuente_pequena.render(f"Apuesta mínima: ${juego.apuesta_minima}", True, COLORES["PLATA"])
+    info_text = textos.render(fuente_pequena, f"Apuesta mínima: ${juego.apuesta_minima}", COLORES["PLATA"])
     surface.blit(info_text, (panel_rect.x + 20, panel_rect.y + 115))
     
     return fold_r, call_r, raise_r, allin_r
 
-def dibujar_menu_principal_premium(surface, usuario_actual=None):
+def rects_menu(sesion=None):
+    """Botones JUGAR y CERRAR SESIÓN (None sin usuario)"""
+    boton_jugar = pygame.Rect(WIDTH//2 - 150, 350, 300, 80)
+    boton_logout = pygame.Rect(WIDTH//2 - 150, 450, 300, 60) if sesion else None
+    return boton_jugar, boton_logout
+
+def dibujar_menu_principal_premium(surface, sesion=None):
     # Fondo con textura de terciopelo negro
-    for y in range(HEIGHT):
-        base_color = COLORES["NEGRO_LUJO"]
-        color = (
-            max(0, min(255, base_color[0])),
-            max(0, min(255, base_color[1])),
-            max(0, min(255, base_color[2]))
-        )
-        pygame.draw.line(surface, color, (0, y), (WIDTH, y))
+    surface.blit(capa_fondo("liso", pintar_fondo_liso), (0, 0))
     
     # Título principal
     titulo_texto = "TEXAS HOLD'EM"
-    titulo_surf = fuente_muy_grande.render(titulo_texto, True, COLORES["ORO_CLARO"])
+    titulo_surf = textos.render(fuente_muy_grande, titulo_texto, COLORES["ORO_CLARO"])
     titulo_rect = titulo_surf.get_rect(center=(WIDTH//2, 120))
     surface.blit(titulo_surf, titulo_rect)
     
     # Subtítulo
-    subtitulo = fuente_titulo.render("EDICIÓN PREMIUM ORO", True, COLORES["ORO_SECUNDARIO"])
+    subtitulo = textos.render(fuente_titulo, "EDICIÓN PREMIUM ORO", COLORES["ORO_SECUNDARIO"])
     surface.blit(subtitulo, (WIDTH//2 - subtitulo.get_width()//2, 200))
     
     # Información del usuario si está logueado
-    if usuario_actual:
+    if sesion:
         usuario_panel = pygame.Rect(WIDTH//2 - 200, 250, 400, 80)
         usuario_surf = pygame.Surface((400, 80), pygame.SRCALPHA)
         pygame.draw.rect(usuario_surf, (30, 30, 30, 200), usuario_surf.get_rect(), border_radius=15)
         pygame.draw.rect(usuario_surf, COLORES["ORO_PRINCIPAL"], usuario_surf.get_rect(), 3, border_radius=15)
         surface.blit(usuario_surf, usuario_panel)
         
-        usuario_text = fuente_media.render(f"Bienvenido, {usuario_actual}", True, COLORES["ORO_CLARO"])
+        usuario_text = textos.render(fuente_media, f"Bienvenido, {sesion.nombre}", COLORES["ORO_CLARO"])
         surface.blit(usuario_text, (WIDTH//2 - usuario_text.get_width()//2, 270))
         
-        usuarios = cargar_usuarios()
-        if usuario_actual in usuarios:
-            fichas = usuarios[usuario_actual]["fichas"]
-            fichas_text = fuente_pequena.render(f"Fichas: ${fichas:,}", True, COLORES["PLATA"])
-            surface.blit(fichas_text, (WIDTH//2 - fichas_text.get_width()//2, 300))
+        fichas_text = textos.render(fuente_pequena, f"Fichas: ${sesion.fichas:,}", COLORES["PLATA"])
+        surface.blit(fichas_text, (WIDTH//2 - fichas_text.get_width()//2, 300))
     
     # Botón jugar premium
-    boton_jugar = pygame.Rect(WIDTH//2 - 150, 350, 300, 80)
+    boton_jugar, boton_logout = rects_menu(sesion)
     mouse_pos = pygame.mouse.get_pos()
     hover_jugar = boton_jugar.collidepoint(mouse_pos)
     
     dibujar_boton_premium(surface, boton_jugar, "JUGAR", hover_jugar)
     
     # Botón cerrar sesión si hay usuario
-    if usuario_actual:
-        boton_logout = pygame.Rect(WIDTH//2 - 150, 450, 300, 60)
+    if boton_logout:
         hover_logout = boton_logout.collidepoint(mouse_pos)
         dibujar_boton_premium(surface, boton_logout, "CERRAR SESIÓN", hover_logout)
-    else:
-        boton_logout = None
     
     # Panel de bienvenida
     panel_wel = pygame.Rect(WIDTH//2 - 250, 520, 500, 150)
@@ -1043,7 +1007,7 @@ def dibujar_menu_principal_premium(surface, usuario_actual=None):
     surface.blit(panel_surf, panel_wel)
     
     # Texto de bienvenida
-    bienvenida = fuente_media.render("Bienvenido al Casino Premium", True, COLORES["ORO_CLARO"])
+    bienvenida = textos.render(fuente_media, "Bienvenido al Casino Premium", COLORES["ORO_CLARO"])
     surface.blit(bienvenida, (panel_wel.centerx - bienvenida.get_width()//2, panel_wel.y + 15))
     
     instrucciones = [
@@ -1055,30 +1019,31 @@ def dibujar_menu_principal_premium(surface, usuario_actual=None):
     ]
     
     for i, linea in enumerate(instrucciones):
-        texto = fuente_pequena.render(linea, True, COLORES["PLATA"])
+        texto = textos.render(fuente_pequena, linea, COLORES["PLATA"])
         surface.blit(texto, (panel_wel.x + 30, panel_wel.y + 45 + i * 22))
     
     # Footer
-    footer = fuente_pequena.render("© 2024 Casino Premium - Todos los derechos reservados", 
-                                 True, COLORES["PLATA_OSCURO"])
+    footer = textos.render(fuente_pequena, "© 2024 Casino Premium - Todos los derechos reservados", 
+                           COLORES["PLATA_OSCURO"])
     surface.blit(footer, (WIDTH//2 - footer.get_width()//2, HEIGHT - 40))
     
     return boton_jugar, boton_logout
 
+def rects_login():
+    """Campos de usuario y contraseña y botones ENTRAR y REGISTRAR"""
+    usuario_rect = pygame.Rect(WIDTH//2 - 150, 300, 300, 50)
+    password_rect = pygame.Rect(WIDTH//2 - 150, 380, 300, 50)
+    login_btn = pygame.Rect(WIDTH//2 - 140, 460, 130, 50)
+    registrar_btn = pygame.Rect(WIDTH//2 + 10, 460, 130, 50)
+    return usuario_rect, password_rect, login_btn, registrar_btn
+
 def dibujar_login_premium(surface):
     # Fondo con textura de terciopelo negro
-    for y in range(HEIGHT):
-        base_color = COLORES["NEGRO_LUJO"]
-        color = (
-            max(0, min(255, base_color[0])),
-            max(0, min(255, base_color[1])),
-            max(0, min(255, base_color[2]))
-        )
-        pygame.draw.line(surface, color, (0, y), (WIDTH, y))
+    surface.blit(capa_fondo("liso", pintar_fondo_liso), (0, 0))
     
     # Título principal
     titulo_texto = "CASINO PREMIUM"
-    titulo_surf = fuente_titulo.render(titulo_texto, True, COLORES["ORO_CLARO"])
+    titulo_surf = textos.render(fuente_titulo, titulo_texto, COLORES["ORO_CLARO"])
     titulo_rect = titulo_surf.get_rect(center=(WIDTH//2, 120))
     surface.blit(titulo_surf, titulo_rect)
     
@@ -1090,16 +1055,11 @@ def dibujar_login_premium(surface):
     surface.blit(panel_surf, panel_login)
     
     # Título del panel
-    login_titulo = fuente_grande.render("INICIAR SESIÓN", True, COLORES["ORO_CLARO"])
+    login_titulo = textos.render(fuente_grande, "INICIAR SESIÓN", COLORES["ORO_CLARO"])
     surface.blit(login_titulo, (WIDTH//2 - login_titulo.get_width()//2, 230))
     
-    # Campos de entrada
-    usuario_rect = pygame.Rect(WIDTH//2 - 150, 300, 300, 50)
-    password_rect = pygame.Rect(WIDTH//2 - 150, 380, 300, 50)
-    
-    # Botones
-    login_btn = pygame.Rect(WIDTH//2 - 140, 460, 130, 50)
-    registrar_btn = pygame.Rect(WIDTH//2 + 10, 460, 130, 50)
+    # Campos de entrada y botones
+    usuario_rect, password_rect, login_btn, registrar_btn = rects_login()
     
     mouse_pos = pygame.mouse.get_pos()
     
@@ -1111,10 +1071,10 @@ def dibujar_login_premium(surface):
     pygame.draw.rect(surface, COLORES["ORO_SECUNDARIO"], password_rect, 2, border_radius=8)
     
     # Etiquetas
-    usuario_label = fuente_media.render("Usuario:", True, COLORES["PLATA"])
+    usuario_label = textos.render(fuente_media, "Usuario:", COLORES["PLATA"])
     surface.blit(usuario_label, (usuario_rect.x, usuario_rect.y - 30))
     
-    password_label = fuente_media.render("Contraseña:", True, COLORES["PLATA"])
+    password_label = textos.render(fuente_media, "Contraseña:", COLORES["PLATA"])
     surface.blit(password_label, (password_rect.x, password_rect.y - 30))
     
     # Botones
@@ -1122,18 +1082,173 @@ def dibujar_login_premium(surface):
     dibujar_boton_premium(surface, registrar_btn, "REGISTRAR", registrar_btn.collidepoint(mouse_pos))
     
     # Footer
-    footer = fuente_pequena.render("© 2024 Casino Premium - Sistema de Autenticación", 
-                                 True, COLORES["PLATA_OSCURO"])
+    footer = textos.render(fuente_pequena, "© 2024 Casino Premium - Sistema de Autenticación", 
+                           COLORES["PLATA_OSCURO"])
     surface.blit(footer, (WIDTH//2 - footer.get_width()//2, HEIGHT - 40))
     
     return usuario_rect, password_rect, login_btn, registrar_btn
 
+# ---------- Regiones sucias ----------
+# Eventos tras los que se redibuja la pantalla entera (pueden cambiar casi todo)
+EVENTOS_REDIBUJO = {pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.VIDEOEXPOSE,
+                    pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED}
+
+class RegionesSucias:
+    """Qué zonas de la pantalla cambiaron desde el último frame presentado"""
+
+    def __init__(self):
+        self.firmas = {}
+        self.rects = []
+        self.dinamicos = []
+        self.completa = True
+        self.frames_dibujados = 0
+        self.frames_omitidos = 0
+
+    def invalidar(self):
+        """Redibujar y enviar la pantalla entera en el próximo frame"""
+        self.completa = True
+
+    def marcar(self, nombre, rect, firma):
+        """Región fija: sucia si su contenido (firma) o su posición cambiaron"""
+        rect = pygame.Rect(rect)
+        anterior = self.firmas.get(nombre)
+        if anterior is None or anterior[1] != firma or anterior[0] != rect:
+            self.rects.append(rect)
+            if anterior is not None and anterior[0] != rect:
+                self.rects.append(anterior[0])
+            self.firmas[nombre] = (rect, firma)
+
+    def marcar_dinamicos(self, rects):
+        """Elementos que se mueven cada frame: se limpia dónde estaban y se pinta dónde están"""
+        self.rects.extend(self.dinamicos)
+        self.rects.extend(rects)
+        self.dinamicos = rects
+
+    def pendiente(self):
+        """¿Hay algo que dibujar en este frame?"""
+        if self.completa or self.rects:
+            return True
+        self.frames_omitidos += 1
+        return False
+
+    def recorte(self):
+        """Rectángulo que abarca todo lo que hay que redibujar"""
+        pantalla = pygame.Rect(0, 0, WIDTH, HEIGHT)
+        if self.completa:
+            return pantalla
+        return self.rects[0].unionall(self.rects[1:]).clip(pantalla)
+
+    def presentar(self):
+        """Enviar a la ventana solo las zonas sucias"""
+        if self.completa:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.rects)
+        self.completa = False
+        self.rects = []
+        self.frames_dibujados += 1
+
+def marcar_regiones_login(regiones, usuario_texto, password_texto, campo_activo, mensaje_login):
+    usuario_rect, password_rect, login_btn, registrar_btn = rects_login()
+    mouse_pos = pygame.mouse.get_pos()
+    regiones.marcar("usuario", usuario_rect, (usuario_texto, campo_activo == "usuario"))
+    regiones.marcar("password", password_rect, (len(password_texto), campo_activo == "password"))
+    regiones.marcar("entrar", login_btn, login_btn.collidepoint(mouse_pos))
+    regiones.marcar("registrar", registrar_btn, registrar_btn.collidepoint(mouse_pos))
+    regiones.marcar("mensaje", (0, 520, WIDTH, 40), mensaje_login)
+
+def marcar_regiones_menu(regiones, sesion):
+    mouse_pos = pygame.mouse.get_pos()
+    for nombre, boton in zip(("jugar", "logout"), rects_menu(sesion)):
+        if boton:
+            regiones.marcar(nombre, boton, boton.collidepoint(mouse_pos))
+
+def marcar_regiones_mesa(regiones, juego):
+    mouse_pos = pygame.mouse.get_pos()
+    for i, (x, y) in enumerate(posiciones_jugadores()):
+        if i < len(juego.jugadores):
+            j = juego.jugadores[i]
+            firma = (j.nombre, j.en_juego, j.fichas, j.apuesta_actual, j.ha_hecho_all_in, tuple(j.mano),
+                     j.ultima_accion, i == juego.jugador_actual_index, i == juego.dealer_index)
+        else:
+            firma = None
+        # Avatar, etiquetas de estado y acción, panel y cartas
+        regiones.marcar(f"jugador{i}", (x - 95, y - 145, 190, 410), (firma, juego.estado, juego.juego_activo))
+
+    y0 = HEIGHT//2 - 70
+    regiones.marcar("tablero", (WIDTH//2 - 270, y0 - 30, 660, 160),
+                    (tuple(juego.cartas_comunitarias), juego.estado))
+    regiones.marcar("bote", (WIDTH//2 - 330, y0 - 80, 660, 50), juego.bote)
+    regiones.marcar("ronda", (WIDTH//2 - 200, 30, 400, 40), juego.estado)
+
+    ganador = juego.ganador
+    regiones.marcar("ganador", (0, HEIGHT//2 - 150, WIDTH, 200),
+                    (ganador.nombre, ganador.ranking_mano, juego.bote) if ganador else None)
+
+    panel_rect, botones = rects_controles()
+    if controles_visibles(juego):
+        jugador = juego.jugadores[juego.jugador_actual_index]
+        firma = (juego.apuesta_minima, jugador.apuesta_actual, tuple(b.collidepoint(mouse_pos) for b in botones))
+    else:
+        firma = None
+    regiones.marcar("controles", panel_rect, firma)
+
+    btn_nueva = rect_nueva_mano()
+    regiones.marcar("nueva_mano", btn_nueva,
+                    btn_nueva.collidepoint(mouse_pos) if juego.estado == EstadoJuego.FINAL else None)
+
+# ---------- Panel del perfilador ----------
+def rect_perfil():
+    return pygame.Rect(10, 10, 280, 150)
+
+def dibujar_perfil(surface, perfil):
+    """FPS, histograma de tiempos de frame y etapa más lenta de los últimos frames"""
+    panel = rect_perfil()
+    panel_surf = pygame.Surface(panel.size, pygame.SRCALPHA)
+    pygame.draw.rect(panel_surf, (0, 0, 0, 200), panel_surf.get_rect(), border_radius=8)
+    pygame.draw.rect(panel_surf, COLORES["ORO_OSCURO"], panel_surf.get_rect(), 1, border_radius=8)
+    surface.blit(panel_surf, panel)
+
+    tiempos = sorted(perfil.tiempos_ms())
+    p99 = tiempos[min(len(tiempos) - 1, int(0.99 * len(tiempos)))] if tiempos else 0.0
+    linea = f"{perfil.fps():5.1f} FPS  p99 {p99:5.1f} ms"
+    surface.blit(textos.render(fuente_pequena, linea, COLORES["ORO_CLARO"]), (panel.x + 10, panel.y + 6))
+
+    # Histograma: una barra por cubo de duración, en rojo las que pasan de 60 FPS
+    cuentas = perfil.histograma()
+    alto_max = 60
+    ancho = (panel.width - 20) // len(cuentas)
+    base = panel.y + 95
+    mayor = max(cuentas) or 1
+    for k, cuenta in enumerate(cuentas):
+        alto = cuenta * alto_max // mayor
+        lento = k > 0 and CUBOS_MS[k - 1] >= 1000.0 / FPS
+        color = COLORES["ROJO_LUJO"] if lento else COLORES["ORO_PRINCIPAL"]
+        pygame.draw.rect(surface, color, (panel.x + 10 + k * ancho, base - alto, ancho - 2, alto))
+    etiqueta = textos.render(fuente_pequena, f"0 - {CUBOS_MS[-1]:.0f}+ ms", COLORES["PLATA_OSCURO"])
+    surface.blit(etiqueta, (panel.x + 10, base + 2))
+
+    lenta = perfil.etapa_mas_lenta()
+    texto = f"Más lenta: {lenta[0]} {lenta[1]:.2f} ms" if lenta else "Midiendo..."
+    surface.blit(textos.render(fuente_pequena, texto, COLORES["BLANCO_PREMIUM"]), (panel.x + 10, panel.y + 122))
+
+def exportar_perfil(perfil):
+    try:
+        frames = perfil.exportar(PERFIL_ARCHIVO)
+        print(f"Perfil de {frames:,} frames guardado en {PERFIL_ARCHIVO}")
+    except OSError as e:
+        print(f"No se pudo guardar el perfil: {e}")
+
 # ---------- Loop Principal Premium ----------
 def main():
-    global particulas
+    if TRAZA_ARCHIVO:
+        traza.activar()
+    inicializar_pygame()
+    # Estrategias de la IA mapeadas en memoria desde el arranque (sin parsear nada)
+    cargar_tabla_estrategia()
     
     estado_aplicacion = "login"
-    usuario_actual = None
+    sesion = None  # Perfil del usuario conectado, en memoria mientras dura la sesión
     juego = None
     running = True
     click_cooldown = 0
@@ -1145,12 +1260,27 @@ def main():
     mensaje_login = ""
     mensaje_tiempo = 0
     
+    # Solo se redibuja y envía lo que cambió; sin cambios no hay frame
+    regiones = RegionesSucias()
+    estado_dibujado = None
+    
+    historial = EscritorHistorial(HISTORIAL_FILE)
+    
+    # Las mesas se juegan en el servidor; la interfaz solo envía acciones y dibuja el estado
+    cliente = crear_cliente(historial)
+    
+    # Tiempos por etapa de cada frame (ver perfilador.py)
+    perfil = PerfiladorFrames(activo=PERFIL_ACTIVO)
+    
     # Efectos de partículas iniciales
     for _ in range(100):
         crear_particulas(random.randint(0, WIDTH), random.randint(0, HEIGHT), 1, "oro")
     
     while running:
+        perfil.empezar_frame()
         dt = clock.tick(FPS)
+        inicio_frame = traza.ahora()
+        perfil.marca("espera")
         if click_cooldown > 0:
             click_cooldown -= 1
             
@@ -1160,21 +1290,32 @@ def main():
             mensaje_login = ""
         
         # Actualizar partículas
-        particulas = [p for p in particulas if p.update()]
+        particulas.actualizar()
+        perfil.marca("particulas")
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             
+            if event.type in EVENTOS_REDIBUJO:
+                regiones.invalidar()
+            
             if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    perfil.alternar()
+                elif event.key == pygame.K_F4:
+                    exportar_perfil(perfil)
+                
                 if event.key == pygame.K_ESCAPE:
                     if estado_aplicacion == "jugando":
                         estado_aplicacion = "menu"
-                        if juego:
-                            juego.juego_activo = False
+                        cliente.salir()
+                        juego = None
                     elif estado_aplicacion == "menu":
                         estado_aplicacion = "login"
-                        usuario_actual = None
+                        if sesion:
+                            sesion.sincronizar()
+                        sesion = None
                     elif estado_aplicacion == "login":
                         running = False
                 
@@ -1184,9 +1325,8 @@ def main():
                         campo_activo = "password" if campo_activo == "usuario" else "usuario"
                     elif event.key == pygame.K_RETURN:
                         # Intentar login automáticamente
-                        success, msg = login_usuario(usuario_texto, password_texto)
-                        if success:
-                            usuario_actual = usuario_texto
+                        sesion, msg = login_usuario(usuario_texto, password_texto)
+                        if sesion:
                             estado_aplicacion = "menu"
                             mensaje_login = ""
                             crear_particulas(WIDTH//2, HEIGHT//2, 100, "oro")
@@ -1211,16 +1351,15 @@ def main():
                 mouse = pygame.mouse.get_pos()
                 
                 if estado_aplicacion == "login":
-                    usuario_rect, password_rect, login_btn, registrar_btn = dibujar_login_premium(screen)
+                    usuario_rect, password_rect, login_btn, registrar_btn = rects_login()
                     
                     if usuario_rect.collidepoint(mouse):
                         campo_activo = "usuario"
                     elif password_rect.collidepoint(mouse):
                         campo_activo = "password"
                     elif login_btn.collidepoint(mouse):
-                        success, msg = login_usuario(usuario_texto, password_texto)
-                        if success:
-                            usuario_actual = usuario_texto
+                        sesion, msg = login_usuario(usuario_texto, password_texto)
+                        if sesion:
                             estado_aplicacion = "menu"
                             mensaje_login = ""
                             crear_particulas(mouse[0], mouse[1], 100, "oro")
@@ -1240,131 +1379,110 @@ def main():
                             mensaje_tiempo = 180
                 
                 elif estado_aplicacion == "menu":
-                    boton_jugar, boton_logout = dibujar_menu_principal_premium(screen, usuario_actual)
+                    boton_jugar, boton_logout = rects_menu(sesion)
                     
                     if boton_jugar and boton_jugar.collidepoint(mouse):
-                        # Crear jugador usuario
-                        if usuario_actual:
-                            usuarios = cargar_usuarios()
-                            fichas_iniciales = usuarios[usuario_actual]["fichas"] if usuario_actual in usuarios else 3000
-                            jugador_usuario = Jugador(usuario_actual, es_ia=False, fichas=fichas_iniciales, es_usuario=True)
-                            juego = PokerGame(jugador_usuario)
+                        # Crear jugador usuario y sentarlo en una mesa propia contra 3 IA
+                        if sesion:
+                            usuario = JugadorSesion(sesion)
                         else:
-                            juego = PokerGame()
-                            
-                        if juego.iniciar_nueva_mano():
+                            usuario = Jugador("Tú", es_ia=False, fichas=3000, es_usuario=True)
+                        try:
+                            cliente.unirse(usuario.nombre, usuario.fichas, ia=3)
+                            juego = VistaPartida(usuario)
                             estado_aplicacion = "jugando"
                             click_cooldown = 20
                             crear_particulas(mouse[0], mouse[1], 50, "oro")
-                        else:
-                            # Si no se pudo iniciar la mano, mostrar mensaje de error
+                        except (OSError, TimeoutError) as e:
+                            # Si no se pudo conectar, mostrar mensaje de error
+                            print(f"No se pudo conectar con el servidor: {e}")
                             mensaje_login = "Error al iniciar la partida"
                             mensaje_tiempo = 120
                     
                     if boton_logout and boton_logout.collidepoint(mouse):
-                        usuario_actual = None
+                        sesion.sincronizar()
+                        sesion = None
                         estado_aplicacion = "login"
                         usuario_texto = ""
                         password_texto = ""
                         click_cooldown = 10
                 
                 elif estado_aplicacion == "jugando" and juego and juego.juego_activo:
-                    fold_r, call_r, raise_r, allin_r = dibujar_controles_premium(screen, juego)
+                    fold_r, call_r, raise_r, allin_r = (rects_controles()[1] if controles_visibles(juego)
+                                                        else (None, None, None, None))
                     
                     if fold_r and fold_r.collidepoint(mouse):
-                        juego.jugadores[juego.jugador_actual_index].en_juego = False
-                        next_idx = juego.encontrar_siguiente_jugador_index(juego.jugador_actual_index)
-                        juego.jugador_actual_index = next_idx if next_idx is not None else juego.jugador_actual_index
+                        cliente.accion("fold")
                         click_cooldown = 10
                         crear_particulas(mouse[0], mouse[1], 20, "brillo_oro")
                         
                     elif call_r and call_r.collidepoint(mouse):
-                        j = juego.jugadores[juego.jugador_actual_index]
-                        necesidad = max(0, juego.apuesta_minima - j.apuesta_actual)
-                        apuesta = j.hacer_apuesta(necesidad)
-                        juego.bote += apuesta
-                        next_idx = juego.encontrar_siguiente_jugador_index(juego.jugador_actual_index)
-                        juego.jugador_actual_index = next_idx if next_idx is not None else juego.jugador_actual_index
+                        cliente.accion("check" if "check" in juego.acciones_validas() else "call")
                         click_cooldown = 10
                         crear_particulas(mouse[0], mouse[1], 30, "oro")
                         
                     elif raise_r and raise_r.collidepoint(mouse):
-                        j = juego.jugadores[juego.jugador_actual_index]
-                        incremento = min(j.fichas, max(juego.apuesta_minima*2, int(juego.apuesta_minima*1.5)))
-                        apuesta = j.hacer_apuesta(incremento)
-                        juego.bote += apuesta
-                        juego.apuesta_minima = j.apuesta_actual
-                        next_idx = juego.encontrar_siguiente_jugador_index(juego.jugador_actual_index)
-                        juego.jugador_actual_index = next_idx if next_idx is not None else juego.jugador_actual_index
+                        cliente.accion("raise")
                         click_cooldown = 10
                         crear_particulas(mouse[0], mouse[1], 40, "oro")
                         
                     elif allin_r and allin_r.collidepoint(mouse):
-                        j = juego.jugadores[juego.jugador_actual_index]
-                        apuesta = j.hacer_apuesta(j.fichas)
-                        juego.bote += apuesta
-                        next_idx = juego.encontrar_siguiente_jugador_index(juego.jugador_actual_index)
-                        juego.jugador_actual_index = next_idx if next_idx is not None else juego.jugador_actual_index
+                        cliente.accion("all_in")
                         click_cooldown = 10
                         crear_particulas(mouse[0], mouse[1], 60, "oro")
                 
                 if estado_aplicacion == "jugando" and juego and juego.estado == EstadoJuego.FINAL:
-                    btn_nueva = pygame.Rect(WIDTH//2-140, HEIGHT//2+80, 280, 60)
+                    btn_nueva = rect_nueva_mano()
                     if btn_nueva.collidepoint(mouse):
-                        if juego.iniciar_nueva_mano():
-                            click_cooldown = 12
-                            crear_particulas(mouse[0], mouse[1], 40, "oro")
+                        cliente.nueva_mano()
+                        click_cooldown = 12
+                        crear_particulas(mouse[0], mouse[1], 40, "oro")
         
-        # Lógica del juego
-        if estado_aplicacion == "jugando" and juego and juego.juego_activo:
-            # Decisiones de IA
-            if (juego.jugador_actual_index < len(juego.jugadores) and
-                juego.jugadores[juego.jugador_actual_index].es_ia and 
-                juego.estado not in (EstadoJuego.SHOWDOWN, EstadoJuego.FINAL)):
-                
-                current = juego.jugadores[juego.jugador_actual_index]
-                apuesta_req = max(0, juego.apuesta_minima - current.apuesta_actual)
-                jugadores_activos = len([x for x in juego.jugadores if x.en_juego])
-                
-                decision, cantidad = current.tomar_decision_ia(apuesta_req, juego.bote, 
-                                                             juego.cartas_comunitarias, juego.estado, 
-                                                             juego.apuesta_minima, jugadores_activos)
-                
-                if decision == "fold":
-                    current.en_juego = False
-                    crear_particulas(WIDTH//2, HEIGHT//2, 20, "brillo_oro")
-                elif decision == "call":
-                    apuesta = current.hacer_apuesta(cantidad)
-                    juego.bote += apuesta
-                    crear_particulas(WIDTH//2, HEIGHT//2, 25, "oro")
-                elif decision == "raise":
-                    apuesta = current.hacer_apuesta(cantidad)
-                    juego.bote += apuesta
-                    juego.apuesta_minima = current.apuesta_actual
-                    crear_particulas(WIDTH//2, HEIGHT//2, 35, "oro")
-                
-                nxt = juego.encontrar_siguiente_jugador_index(juego.jugador_actual_index)
-                juego.jugador_actual_index = nxt if nxt is not None else juego.jugador_actual_index
-            
-            # Verificar fin de ronda
-            juego.verificar_fin_ronda()
-            if juego.ronda_terminada and juego.estado not in (EstadoJuego.SHOWDOWN, EstadoJuego.FINAL):
-                juego.repartir_cartas_comunitarias()
-                juego.siguiente_estado()
+        perfil.marca("eventos")
+        
+        # Estados de la mesa que llegaron del servidor (la IA decide allí)
+        if estado_aplicacion == "jugando" and juego:
+            for mensaje in cliente.mensajes():
+                if mensaje["t"] == "estado":
+                    traza.instante("estado recibido", "red", mano=mensaje["mano"], calle=mensaje["e"])
+                    juego.actualizar(mensaje)
+                elif mensaje["t"] == "error":
+                    print(f"Servidor: {mensaje['msg']}")
+        perfil.marca("red")
         
-        # Renderizado
+        # Regiones que cambiaron desde el último frame
+        if estado_aplicacion != estado_dibujado:
+            regiones.invalidar()
+            estado_dibujado = estado_aplicacion
+        if estado_aplicacion == "login":
+            marcar_regiones_login(regiones, usuario_texto, password_texto, campo_activo, mensaje_login)
+        elif estado_aplicacion == "menu":
+            marcar_regiones_menu(regiones, sesion)
+        elif estado_aplicacion == "jugando" and juego:
+            marcar_regiones_mesa(regiones, juego)
+        regiones.marcar_dinamicos(particulas.rects())
+        # El panel del perfilador cambia en cada frame mientras está activo
+        regiones.marcar("perfil", rect_perfil(), perfil.inicio if perfil.activo else None)
+        perfil.marca("regiones")
+        
+        if not regiones.pendiente():
+            continue
+        
+        # Renderizado (recortado a las zonas sucias)
+        screen.set_clip(regiones.recorte())
         screen.fill(COLORES["NEGRO_LUJO"])
+        perfil.marca("limpiar")
         
         if estado_aplicacion == "login":
             usuario_rect, password_rect, login_btn, registrar_btn = dibujar_login_premium(screen)
             
             # Dibujar texto de los campos
-            usuario_surf = fuente_media.render(usuario_texto, True, COLORES["BLANCO_PREMIUM"])
+            usuario_surf = textos.render(fuente_media, usuario_texto, COLORES["BLANCO_PREMIUM"])
             screen.blit(usuario_surf, (usuario_rect.x + 10, usuario_rect.y + 10))
             
             # Mostrar contraseña con asteriscos
             password_display = "*" * len(password_texto)
-            password_surf = fuente_media.render(password_display, True, COLORES["BLANCO_PREMIUM"])
+            password_surf = textos.render(fuente_media, password_display, COLORES["BLANCO_PREMIUM"])
             screen.blit(password_surf, (password_rect.x + 10, password_rect.y + 10))
             
             # Indicador de campo activo
@@ -1375,18 +1493,24 @@ def main():
             
             # Mostrar mensaje de login
             if mensaje_login:
-                mensaje_surf = fuente_pequena.render(mensaje_login, True, COLORES["ROJO_LUJO"])
+                mensaje_surf = textos.render(fuente_pequena, mensaje_login, COLORES["ROJO_LUJO"])
                 screen.blit(mensaje_surf, (WIDTH//2 - mensaje_surf.get_width()//2, 530))
+            perfil.marca("login")
                 
         elif estado_aplicacion == "menu":
-            dibujar_menu_principal_premium(screen, usuario_actual)
+            dibujar_menu_principal_premium(screen, sesion)
+            perfil.marca("menu")
             
         elif estado_aplicacion == "jugando" and juego:
             dibujar_mesa_premium(screen, juego)
+            perfil.marca("mesa")
             dibujar_comunitarias_premium(screen, juego)
+            perfil.marca("comunitarias")
             dibujar_jugadores_premium(screen, juego)
+            perfil.marca("jugadores")
             
             dibujar_controles_premium(screen, juego)
+            perfil.marca("controles")
             
             if juego.ganador:
                 # Panel de ganador premium
@@ -1397,27 +1521,50 @@ def main():
                 pygame.draw.rect(panel_surf, COLORES["ORO_CLARO"], (2, 2, 596, 196), 3, border_radius=18)
                 screen.blit(panel_surf, panel_ganador)
                 
-                ganador_texto = fuente_titulo.render(f"¡{juego.ganador.nombre} GANA!", True, COLORES["ORO_CLARO"])
+                ganador_texto = textos.render(fuente_titulo, f"¡{juego.ganador.nombre} GANA!", COLORES["ORO_CLARO"])
                 screen.blit(ganador_texto, (WIDTH//2 - ganador_texto.get_width()//2, HEIGHT//2 - 120))
                 
-                premio_texto = fuente_media.render(f"Premio: ${juego.bote:,}", True, COLORES["ORO_SECUNDARIO"])
+                premio_texto = textos.render(fuente_media, f"Premio: ${juego.bote:,}", COLORES["ORO_SECUNDARIO"])
                 screen.blit(premio_texto, (WIDTH//2 - premio_texto.get_width()//2, HEIGHT//2 - 60))
                 
-                # Actualizar estadísticas si el ganador es usuario
-                if juego.ganador.es_usuario:
-                    actualizar_estadisticas_usuario(juego.ganador.nombre, ganador=True)
+                # Jugada ganadora (solo si hubo showdown)
+                if juego.ganador.ranking_mano is not None:
+                    jugada_texto = textos.render(fuente_media, NOMBRES_RANKING[juego.ganador.ranking_mano], COLORES["PLATA"])
+                    screen.blit(jugada_texto, (WIDTH//2 - jugada_texto.get_width()//2, HEIGHT//2 - 25))
             
             if juego.estado == EstadoJuego.FINAL:
-                btn_nueva = pygame.Rect(WIDTH//2-140, HEIGHT//2+80, 280, 60)
+                btn_nueva = rect_nueva_mano()
                 mouse_pos = pygame.mouse.get_pos()
                 dibujar_boton_premium(screen, btn_nueva, "NUEVA MANO", btn_nueva.collidepoint(mouse_pos))
+            perfil.marca("ganador")
         
         # Dibujar partículas
-        for particula in particulas:
-            particula.draw(screen)
+        particulas.dibujar(screen)
+        perfil.marca("dibujo_particulas")
         
-        pygame.display.flip()
-    
+        if perfil.activo:
+            dibujar_perfil(screen, perfil)
+            perfil.marca("perfil")
+        
+        screen.set_clip(None)
+        regiones.presentar()
+        perfil.marca("presentar")
+        if traza.activa():
+            traza.completo("frame", inicio_frame, traza.ahora() - inicio_frame, "interfaz")
+    
+    if perfil.frames:
+        exportar_perfil(perfil)
+    cliente.cerrar()
+    print(textos.resumen())
+    if sesion:
+        sesion.sincronizar()
+    historial.cerrar()
+    obtener_almacen().cerrar()
+    if TRAZA_ARCHIVO:
+        try:
+            print(f"Traza: {traza.guardar(TRAZA_ARCHIVO):,} eventos en {TRAZA_ARCHIVO}")
+        except OSError as e:
+            print(f"No se pudo guardar la traza: {e}")
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,397 @@
+"""
+Benchmarks de rendimiento del motor de poker y del render.
+
+Mide evaluación, equidad (también entre rangos), reparto de manos, decisiones de IA, showdown,
+historial, almacén de usuarios y el tiempo por llamada de las funciones de
+dibujo de la mesa. El render usa el driver "dummy" de SDL, así que funciona
+en servidores sin pantalla. Con --json se guardan todos los resultados para
+comparar ejecuciones (por ejemplo antes y después de actualizar Python o
+pygame).
+
+Ejecutar: python benchmark.py [--manos N] [--historial N] [--usuarios 10000 100000 1000000]
+                              [--frames N | --sin-render] [--json resultados.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+import cartas
+import evaluador
+import equidad
+import historial
+import rangos
+import repeticion
+import simulador
+import usuarios
+from cliente import VistaMesa
+from motor import EstadoJuego, Jugador, PokerGame
+from servidor import estado_mesa
+
+
+def resumen_tiempos(muestras):
+    """Media, mediana y p99 en ms de una lista de tiempos en segundos"""
+    ordenadas = sorted(muestras)
+    return {
+        "media_ms": sum(ordenadas) * 1000 / len(ordenadas),
+        "p50_ms": ordenadas[len(ordenadas) // 2] * 1000,
+        "p99_ms": ordenadas[min(len(ordenadas) - 1, int(0.99 * len(ordenadas)))] * 1000,
+    }
+
+
+def bench_evaluador(manos=200000, semilla=1234):
+    """Evaluaciones de 7 cartas por segundo (completas e incrementales)"""
+    rng = random.Random(semilla)
+    mazo = list(cartas.MAZO)
+    muestras = [rng.sample(mazo, 7) for _ in range(manos)]
+
+    inicio = time.perf_counter()
+    for codigos in muestras:
+        evaluador.evaluar(codigos)
+    completas = manos / (time.perf_counter() - inicio)
+
+    # Producto y máscara ya acumulados, como al recorrer tableros con la mano fija
+    acumulados = []
+    for codigos in muestras:
+        producto = 1
+        mascara = 0
+        for c in codigos:
+            producto *= evaluador.PRIMOS[c]
+            mascara |= 1 << c
+        acumulados.append((producto, mascara))
+
+    evaluar_incremental = evaluador.evaluar_incremental
+    inicio = time.perf_counter()
+    for producto, mascara in acumulados:
+        evaluar_incremental(producto, mascara)
+    incrementales = manos / (time.perf_counter() - inicio)
+
+    return {"evaluar": completas, "evaluar_incremental": incrementales}
+
+
+def bench_equidad(simulaciones=3000, oponentes=3, repeticiones=20):
+    """Tiempo medio (ms) de una estimación Monte Carlo post-flop"""
+    c = cartas.codigo_carta
+    mano = [c(0, 14), c(1, 13)]
+    tablero = [c(2, 5), c(3, 9), c(0, 2)]
+    equidad.simular_equidad(mano, tablero, oponentes, simulaciones)
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        equidad.simular_equidad(mano, tablero, oponentes, simulaciones)
+    ms = (time.perf_counter() - inicio) * 1000 / repeticiones
+
+    # Rango contra rango en el flop: primera consulta (calculada) y repetida (caché)
+    calculadora = rangos.CalculadoraEquidad(rng=np.random.default_rng(1))
+    inicio = time.perf_counter()
+    calculadora.equidad("TT+,AQs+,AKo", ["22+,A2s+,KTs+,QJs,AJo+"], tablero)
+    rangos_ms = (time.perf_counter() - inicio) * 1000
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        calculadora.equidad("TT+,AQs+,AKo", ["22+,A2s+,KTs+,QJs,AJo+"], list(reversed(tablero)))
+    cache_us = (time.perf_counter() - inicio) * 1e6 / repeticiones
+    return {"ms_por_decision": ms, "simulaciones_por_segundo": simulaciones * 1000 / ms,
+            "rangos_ms": rangos_ms, "rangos_cache_us": cache_us}
+
+
+def mesa_de_prueba(jugadores=6, semilla=11, fichas=10**9, reparto_perezoso=False):
+    """Mesa solo de IA (por defecto con fichas de sobra para que nadie vaya all-in)"""
+    return PokerGame(jugadores=[Jugador(f"IA {k}", es_ia=True, fichas=fichas) for k in range(jugadores)],
+                     semilla=semilla, reparto_perezoso=reparto_perezoso)
+
+
+def jugar_hasta(juego, estado):
+    """Nueva mano en la que todos pasan o igualan hasta cerrar la calle 'estado'"""
+    juego.iniciar_nueva_mano()
+    while not (juego.estado == estado and juego.ronda_terminada):
+        if juego.ronda_terminada:
+            juego.avanzar_ronda()
+        elif "check" in juego.acciones_validas():
+            juego.pasar()
+        else:
+            juego.igualar()
+
+
+def bench_motor(manos=20000, decisiones=2000, decisiones_monte_carlo=200, semilla=11):
+    """Manos repartidas, decisiones de IA y showdowns por segundo"""
+    resultado = {}
+    for perezoso in (False, True):
+        juego = mesa_de_prueba(semilla=semilla, reparto_perezoso=perezoso)
+        inicio = time.perf_counter()
+        for _ in range(manos):
+            juego.iniciar_nueva_mano()
+        clave = "manos_repartidas_por_segundo" + ("_perezoso" if perezoso else "")
+        resultado[clave] = manos / (time.perf_counter() - inicio)
+
+    # Decisiones en el flop: sin Monte Carlo (simulador) y con el de la partida
+    simulaciones, presupuesto = Jugador.simulaciones_ia, Jugador.presupuesto_ia_ms
+    juego = mesa_de_prueba(semilla=semilla)
+    try:
+        for nombre, sims, n in (("decisiones_por_segundo", 0, decisiones),
+                                ("decisiones_monte_carlo_por_segundo", simulaciones, decisiones_monte_carlo)):
+            Jugador.simulaciones_ia = sims
+            Jugador.presupuesto_ia_ms = None
+            total = 0.0
+            for _ in range(n):
+                jugar_hasta(juego, EstadoJuego.PREFLOP)
+                juego.avanzar_ronda()
+                jugador = juego.jugadores[juego.jugador_actual_index]
+                contexto = juego.contexto_decision(jugador)
+                rivales = juego.perfiles_rivales(jugador)
+                inicio = time.perf_counter()
+                jugador.tomar_decision_ia(*contexto, rng=juego.rng, rng_equidad=juego.rng_equidad,
+                                          rivales=rivales)
+                total += time.perf_counter() - inicio
+            resultado[nombre] = n / total
+    finally:
+        Jugador.simulaciones_ia, Jugador.presupuesto_ia_ms = simulaciones, presupuesto
+
+    # Showdown: del river cerrado al bote repartido, con un solo bote y con botes laterales
+    total = 0.0
+    for _ in range(manos // 4):
+        jugar_hasta(juego, EstadoJuego.RIVER)
+        inicio = time.perf_counter()
+        juego.avanzar_ronda()
+        total += time.perf_counter() - inicio
+    resultado["showdowns_por_segundo"] = (manos // 4) / total
+
+    pilas = [300, 800, 1500, 2500, 4000, 6000]
+    juego = mesa_de_prueba(len(pilas), semilla=semilla)
+    total = 0.0
+    for _ in range(manos // 4):
+        for j, fichas in zip(juego.jugadores, pilas):
+            j.fichas = fichas
+        juego.iniciar_nueva_mano()
+        while juego.acciones_validas():
+            juego.all_in()
+        while juego.estado != EstadoJuego.RIVER:
+            juego.avanzar_ronda()
+        inicio = time.perf_counter()
+        juego.avanzar_ronda()
+        total += time.perf_counter() - inicio
+    resultado["showdowns_botes_laterales_por_segundo"] = (manos // 4) / total
+    return resultado
+
+
+def bench_render(frames=300, semilla=11):
+    """Tiempo por llamada (ms) de las funciones de dibujo de la mesa con SDL sin pantalla"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    try:
+        import POKERR
+    except ImportError as e:
+        print(f"Render no medido: {e}")
+        return None
+    POKERR.inicializar_pygame()
+    screen = POKERR.screen
+
+    # Mesa en el river vista por el primer asiento, como la recibe la interfaz
+    juego = mesa_de_prueba(4, semilla=semilla, fichas=2500)
+    jugar_hasta(juego, EstadoJuego.TURN)
+    juego.avanzar_ronda()
+    vista = VistaMesa()
+    vista.actualizar(estado_mesa(juego, juego.jugadores[0]))
+    codigos = list(cartas.MAZO)
+
+    def frame():
+        POKERR.dibujar_mesa_premium(screen, vista)
+        POKERR.dibujar_comunitarias_premium(screen, vista)
+        POKERR.dibujar_jugadores_premium(screen, vista)
+        POKERR.dibujar_controles_premium(screen, vista)
+
+    funciones = {
+        "dibujar_mesa_premium": lambda k: POKERR.dibujar_mesa_premium(screen, vista),
+        "dibujar_jugadores_premium": lambda k: POKERR.dibujar_jugadores_premium(screen, vista),
+        "dibujar_comunitarias_premium": lambda k: POKERR.dibujar_comunitarias_premium(screen, vista),
+        "Carta.dibujar_premium": lambda k: POKERR.vista_carta(codigos[k % 52]).dibujar_premium(
+            screen, 100, 100, w=72, h=100, boca_arriba=k % 4 != 0),
+        "frame_mesa": lambda k: frame(),
+    }
+    resultado = {}
+    for nombre, funcion in funciones.items():
+        # Primera vuelta sin medir: llena las cachés de superficies y textos
+        for k in range(min(frames, 60)):
+            funcion(k)
+        muestras = []
+        for k in range(frames):
+            inicio = time.perf_counter()
+            funcion(k)
+            muestras.append(time.perf_counter() - inicio)
+        resultado[nombre] = resumen_tiempos(muestras)
+    POKERR.pygame.quit()
+    return resultado
+
+
+def entorno():
+    """Versiones y commit con los que se midió"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    try:
+        import pygame
+        version_pygame = pygame.version.ver
+    except ImportError:
+        version_pygame = None
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "numpy": np.__version__,
+        "pygame": version_pygame,
+        "commit": commit,
+    }
+
+
+def bench_usuarios(cantidad, operaciones=2000, semilla=7):
+    """Latencia (us) de login y actualización con 'cantidad' usuarios en SQLite"""
+    rng = random.Random(semilla)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "usuarios.db")
+        conexion = sqlite3.connect(ruta)
+        conexion.execute(usuarios.AlmacenSQLite.ESQUEMA)
+        plantilla = usuarios.usuario_nuevo("clave")
+        usuarios.insertar_usuarios(conexion, ((f"usuario{i}", plantilla) for i in range(cantidad)))
+        conexion.close()
+
+        almacen = usuarios.AlmacenSQLite(ruta, intervalo=3600, max_pendientes=10**9)
+        nombres = [f"usuario{rng.randrange(cantidad)}" for _ in range(operaciones)]
+
+        inicio = time.perf_counter()
+        for nombre in nombres:
+            datos = almacen.obtener(nombre)
+            if datos["password"] == "clave":
+                almacen.actualizar(nombre, ultima_conexion=usuarios.ahora())
+        login = (time.perf_counter() - inicio) * 1e6 / operaciones
+
+        inicio = time.perf_counter()
+        for k, nombre in enumerate(nombres):
+            almacen.registrar_mano(nombre, k % 2 == 0, 5000 + k)
+        actualizacion = (time.perf_counter() - inicio) * 1e6 / operaciones
+
+        inicio = time.perf_counter()
+        almacen.guardar()
+        lote = (time.perf_counter() - inicio) * 1000
+        almacen.cerrar()
+
+        resultado = {"login_us": login, "actualizacion_us": actualizacion, "lote_ms": lote,
+                     "lote_usuarios": len(set(nombres)), "json_login_ms": None}
+
+        # Referencia: el JSON antiguo se leía y reescribía entero en cada login
+        if cantidad <= 100000:
+            ruta_json = os.path.join(directorio, "usuarios.json")
+            with open(ruta_json, "w") as f:
+                json.dump({f"usuario{i}": plantilla for i in range(cantidad)}, f, indent=2)
+            inicio = time.perf_counter()
+            with open(ruta_json) as f:
+                todos = json.load(f)
+            todos[nombres[0]]["ultima_conexion"] = usuarios.ahora()
+            with open(ruta_json, "w") as f:
+                json.dump(todos, f, indent=2)
+            resultado["json_login_ms"] = (time.perf_counter() - inicio) * 1000
+    return resultado
+
+
+def bench_historial(manos=20000, semilla=99):
+    """Coste de grabar el historial (us por acción), manos leídas y repetidas por segundo"""
+    simulaciones = Jugador.simulaciones_ia
+    Jugador.simulaciones_ia = 0
+    try:
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "manos.bin")
+            # Misma semilla con y sin grabar: la diferencia es el coste del historial
+            sin_grabar = simulador.simular(manos, semilla=semilla)["segundos"]
+            grabando = simulador.simular(manos, semilla=semilla, historial=ruta)["segundos"]
+
+            inicio = time.perf_counter()
+            leidas = 0
+            acciones = 0
+            for mano in historial.leer_historial(ruta):
+                leidas += 1
+                acciones += len(mano.acciones)
+            lectura = time.perf_counter() - inicio
+            tamano = os.path.getsize(ruta)
+            repetidas = repeticion.repetir_historial(ruta, procesos=1)
+    finally:
+        Jugador.simulaciones_ia = simulaciones
+    return {
+        "us_por_accion": (grabando - sin_grabar) * 1e6 / acciones,
+        "bytes_por_mano": tamano / leidas,
+        "manos_leidas_por_segundo": leidas / lectura,
+        "manos_repetidas_por_segundo": repetidas["manos_por_segundo"],
+        "discrepancias": repetidas["discrepancias"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de poker")
+    parser.add_argument("--manos", type=int, default=200000, help="manos a evaluar")
+    parser.add_argument("--manos-motor", type=int, default=20000, help="manos repartidas para medir el motor")
+    parser.add_argument("--historial", type=int, default=20000, help="manos simuladas para medir el historial (0 = no medir)")
+    parser.add_argument("--usuarios", type=int, nargs="*", default=[10000],
+                        help="tamaños de la base de usuarios a medir (p. ej. 10000 100000 1000000)")
+    parser.add_argument("--frames", type=int, default=300, help="llamadas medidas por función de dibujo")
+    parser.add_argument("--sin-render", action="store_true", help="no medir el render")
+    parser.add_argument("--json", default=None, help="archivo donde guardar los resultados")
+    args = parser.parse_args()
+
+    resultados = {"entorno": entorno()}
+
+    r = resultados["evaluador"] = bench_evaluador(args.manos)
+    for nombre, por_segundo in r.items():
+        print(f"{nombre:<22} {por_segundo:>14,.0f} eval/s")
+
+    r = resultados["equidad"] = bench_equidad()
+    print(f"{'equidad (3 rivales)':<22} {r['ms_por_decision']:>14.2f} ms/decisión")
+    print(f"{'':<22} {r['simulaciones_por_segundo']:>14,.0f} simulaciones/s")
+    print(f"{'':<22} {r['rangos_ms']:>14.2f} ms rango contra rango "
+          f"({r['rangos_cache_us']:.1f} us desde la caché)")
+
+    r = resultados["motor"] = bench_motor(args.manos_motor)
+    print(f"{'motor':<22} {r['manos_repartidas_por_segundo']:>14,.0f} manos repartidas/s "
+          f"({r['manos_repartidas_por_segundo_perezoso']:,.0f} con reparto perezoso)")
+    print(f"{'':<22} {r['decisiones_por_segundo']:>14,.0f} decisiones IA/s "
+          f"({r['decisiones_monte_carlo_por_segundo']:,.0f} con Monte Carlo)")
+    print(f"{'':<22} {r['showdowns_por_segundo']:>14,.0f} showdowns/s "
+          f"({r['showdowns_botes_laterales_por_segundo']:,.0f} con botes laterales)")
+
+    if args.historial:
+        r = resultados["historial"] = bench_historial(args.historial)
+        print(f"{'historial':<22} {r['us_por_accion']:>14.2f} us/acción grabada")
+        print(f"{'':<22} {r['bytes_por_mano']:>14.0f} bytes/mano")
+        print(f"{'':<22} {r['manos_leidas_por_segundo']:>14,.0f} manos leídas/s")
+        print(f"{'':<22} {r['manos_repetidas_por_segundo']:>14,.0f} manos repetidas/s por proceso "
+              f"({r['discrepancias']} discrepancias)")
+
+    resultados["usuarios"] = {}
+    for cantidad in args.usuarios:
+        r = resultados["usuarios"][str(cantidad)] = bench_usuarios(cantidad)
+        json_login = f"{r['json_login_ms']:.1f} ms" if r["json_login_ms"] is not None else "-"
+        print(f"{f'usuarios {cantidad:,}':<22} login {r['login_us']:.1f} us  actualización {r['actualizacion_us']:.1f} us  "
+              f"lote {r['lote_ms']:.1f} ms ({r['lote_usuarios']:,} usuarios)  login JSON {json_login}")
+
+    if not args.sin_render:
+        r = resultados["render"] = bench_render(args.frames)
+        for nombre, tiempos in (r or {}).items():
+            print(f"{nombre:<30} media {tiempos['media_ms']:>7.3f} ms  p50 {tiempos['p50_ms']:>7.3f} ms  "
+                  f"p99 {tiempos['p99_ms']:>7.3f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(resultados, f, indent=2)
+        print(f"Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Codificación compacta de cartas para el motor.
+
+Una carta es un entero pequeño: palo * 16 + (valor - 2). Con ese
+desplazamiento cada palo ocupa su propio bloque de 16 bits, así que una mano,
+el tablero o el mazo entero caben en una máscara de 64 bits (bit = 1 << código)
+y la máscara de 13 bits de cada palo se obtiene con un desplazamiento.
+"""
+
+SUITS = ['♥', '♦', '♣', '♠']
+VAL_STR = {11: 'J', 12: 'Q', 13: 'K', 14: 'A'}
+
+def valor_str(v):
+    return VAL_STR.get(v, str(v))
+
+def codigo_carta(palo, valor):
+    """Código entero de una carta (palo 0-3, valor 2-14)"""
+    return (palo << 4) | (valor - 2)
+
+def palo_carta(codigo):
+    return codigo >> 4
+
+def valor_carta(codigo):
+    return (codigo & 15) + 2
+
+def texto_carta(codigo):
+    """Representación legible, p. ej. 'A♠'"""
+    return f"{valor_str(valor_carta(codigo))}{SUITS[palo_carta(codigo)]}"
+
+# Las 52 cartas en el mismo orden que el mazo original (palo, luego valor)
+MAZO = tuple(codigo_carta(p, v) for p in range(4) for v in range(2, 15))
+MASCARA_MAZO = sum(1 << c for c in MAZO)
+
+def mascara(codigos):
+    """Máscara de 64 bits de un conjunto de códigos"""
+    m = 0
+    for c in codigos:
+        m |= 1 << c
+    return m
+
+def codigos_de_mascara(m):
+    """Códigos presentes en una máscara, de menor a mayor"""
+    codigos = []
+    while m:
+        bajo = m & -m
+        codigos.append(bajo.bit_length() - 1)
+        m ^= bajo
+    return codigos
@@ -0,0 +1,207 @@
+"""
+Cliente de servidor.py para la interfaz, sin pygame.
+
+ClienteMesa mantiene la conexión en un bucle asyncio dentro de un hilo, así
+que el bucle de render nunca espera a la red: envía acciones sin bloquear y
+en cada frame recoge los estados que hayan llegado. Si no se indica una
+dirección arranca un ServidorPoker en el mismo hilo (partida local).
+
+VistaMesa refleja el último estado recibido con los mismos atributos que
+PokerGame lee la interfaz (jugadores, estado, bote, turno...), de modo que el
+código de dibujo no distingue entre partida local y remota.
+"""
+
+import asyncio
+import queue
+import threading
+
+import traza
+from evaluador import RankingMano
+from motor import EstadoJuego, Jugador
+from servidor import ServidorPoker, codificar, conectar, recibir
+
+# Carta que se dibuja boca abajo para las cartas ocultas de los rivales
+CARTA_OCULTA = 0
+
+
+class ClienteMesa:
+    """Conexión con el servidor en un hilo aparte"""
+
+    def __init__(self, direccion=None, **opciones_servidor):
+        self.direccion = direccion
+        self.opciones_servidor = opciones_servidor
+        self.servidor = None
+        self.recibidos = queue.Queue()
+        self.writer = None
+        self.lectores = set()
+        self.loop = asyncio.new_event_loop()
+        self.hilo = threading.Thread(target=self.loop.run_forever, name="cliente-mesa", daemon=True)
+        self.hilo.start()
+        if self.direccion is None:
+            self.direccion = self._esperar(self._arrancar_servidor())
+
+    def _esperar(self, corrutina, tiempo=10.0):
+        return asyncio.run_coroutine_threadsafe(corrutina, self.loop).result(tiempo)
+
+    async def _arrancar_servidor(self):
+        self.servidor = ServidorPoker(**self.opciones_servidor)
+        return await self.servidor.iniciar(puerto=0)
+
+    # ---------- Conexión ----------
+    def unirse(self, nombre, fichas, ia=0, mesa=None):
+        """Sentarse en una mesa (con 'ia' rivales IA abre una mesa propia)"""
+        self.salir()
+        self._esperar(self._conectar())
+        self.enviar({"t": "unirse", "nombre": nombre, "fichas": fichas, "ia": ia, "mesa": mesa})
+
+    async def _conectar(self):
+        reader, self.writer = await conectar(self.direccion)
+        lector = self.loop.create_task(self._leer(reader, self.writer))
+        self.lectores.add(lector)
+        lector.add_done_callback(self.lectores.discard)
+
+    async def _leer(self, reader, writer):
+        try:
+            while True:
+                self.recibidos.put((writer, await recibir(reader)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def enviar(self, mensaje):
+        """Enviar sin esperar (se escribe desde el hilo del cliente)"""
+        if self.writer is not None:
+            self.loop.call_soon_threadsafe(self.writer.write, codificar(mensaje))
+
+    def accion(self, accion, total=None):
+        traza.instante("accion enviada", "red", accion=accion, total=total)
+        self.enviar({"t": "accion", "a": accion, "total": total})
+
+    def nueva_mano(self):
+        self.enviar({"t": "nueva_mano"})
+
+    def salir(self):
+        """Dejar la mesa actual"""
+        if self.writer is not None:
+            self.loop.call_soon_threadsafe(self.writer.close)
+            self.writer = None
+        # Lo que quede de la mesa anterior ya no interesa
+        while not self.recibidos.empty():
+            self.recibidos.get_nowait()
+
+    async def _detener_lectores(self):
+        for lector in list(self.lectores):
+            lector.cancel()
+        await asyncio.gather(*self.lectores, return_exceptions=True)
+
+    def mensajes(self):
+        """Mensajes recibidos desde la última llamada (no bloquea)"""
+        mensajes = []
+        while True:
+            try:
+                writer, mensaje = self.recibidos.get_nowait()
+            except queue.Empty:
+                return mensajes
+            if writer is self.writer:
+                mensajes.append(mensaje)
+
+    def cerrar(self):
+        self.salir()
+        if self.servidor is not None:
+            self._esperar(self.servidor.cerrar())
+        self._esperar(self._detener_lectores())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.hilo.join(2.0)
+
+
+class VistaMesa:
+    """Último estado de la mesa recibido del servidor"""
+
+    def __init__(self, jugador_usuario=None):
+        self.jugador_usuario = jugador_usuario
+        self.por_nombre = {}
+        self.jugadores = []
+        self.visibles = []
+        self.yo = -1
+        self.numero_mano = 0
+        self.estado = EstadoJuego.PREFLOP
+        self.bote = 0
+        self.apuesta_minima = 0
+        self.cartas_comunitarias = []
+        self.jugador_actual_index = -1
+        self.dealer_index = -1
+        self.juego_activo = False
+        self.ganador = None
+        self.ganadores = []
+        self.premios = []
+        self.acciones = ()
+        self.igualar = 0
+        self.efecto_brillo_mesa = 0
+
+    def _jugador(self, datos, es_yo):
+        """Mismo objeto Jugador para el mismo nombre (conserva su color de avatar)"""
+        if es_yo and self.jugador_usuario is not None:
+            return self.jugador_usuario
+        jugador = self.por_nombre.get(datos["n"])
+        if jugador is None:
+            jugador = self.por_nombre[datos["n"]] = Jugador(datos["n"], es_ia=datos["ia"], fichas=datos["f"])
+        return jugador
+
+    def actualizar(self, mensaje):
+        """Aplicar un mensaje 'estado'"""
+        anterior = (self.numero_mano, self.estado)
+        self.yo = mensaje["yo"]
+        self.jugadores = []
+        self.visibles = []
+        for i, datos in enumerate(mensaje["jugadores"]):
+            j = self._jugador(datos, i == self.yo)
+            j.fichas = datos["f"]
+            j.apuesta_actual = datos["a"]
+            j.en_juego = datos["j"]
+            j.ha_hecho_all_in = datos["ai"]
+            j.ultima_accion = datos["u"]
+            j.mano = [c if c is not None else CARTA_OCULTA for c in datos["c"]]
+            j.ranking_mano = RankingMano(datos["r"]) if datos["r"] is not None else None
+            self.jugadores.append(j)
+            self.visibles.append(None not in datos["c"])
+
+        self.numero_mano = mensaje["mano"]
+        self.estado = EstadoJuego(mensaje["e"])
+        self.bote = mensaje["bote"]
+        self.apuesta_minima = mensaje["apuesta"]
+        self.cartas_comunitarias = mensaje["tablero"]
+        self.jugador_actual_index = mensaje["turno"]
+        self.dealer_index = mensaje["boton"]
+        self.acciones = tuple(mensaje["acciones"])
+        self.igualar = mensaje["igualar"]
+        self.juego_activo = True
+        self.ganadores = [self.jugadores[i] for i in mensaje["ganadores"]]
+        self.ganador = self.ganadores[0] if self.ganadores else None
+        self.premios = mensaje["premios"]
+
+        if self.numero_mano != anterior[0]:
+            self.efecto(40, "oro")
+        elif self.estado != anterior[1]:
+            if self.estado == EstadoJuego.FINAL:
+                self.efecto(200, "oro")
+                self.efecto(80, "diamante")
+                self.registrar_resultado()
+            else:
+                self.efecto(30, "oro")
+
+    def acciones_validas(self):
+        return self.acciones
+
+    def cantidad_para_igualar(self, jugador=None):
+        return self.igualar
+
+    def mi_jugador(self):
+        return self.jugadores[self.yo] if 0 <= self.yo < len(self.jugadores) else None
+
+    # ---------- Ganchos para la interfaz ----------
+    def efecto(self, cantidad, tipo="oro"):
+        """Efecto visual al cambiar de mano o de calle (sin interfaz no hace nada)"""
+        pass
+
+    def registrar_resultado(self):
+        """Llamado una vez por mano al llegar su estado final"""
+        pass
@@ -0,0 +1,2 @@
+# Los módulos del juego están en la raíz del repositorio: pytest la añade a sys.path
+# al cargar este archivo, así que las pruebas de tests/ funcionan con "pytest" a secas.
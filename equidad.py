@@ -0,0 +1,130 @@
+"""
+Motor de equidad Monte Carlo vectorizado con NumPy.
+
+Simula por lotes el resto del tablero y las manos ocultas de los rivales
+usando arrays de códigos de carta (ver cartas.py), sin crear
+objetos Carta. Evalúa todas las manos de un lote de una vez con las mismas
+tablas del evaluador.
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import cartas
+import evaluador
+
+# ---------- Tablas del evaluador en formato NumPy ----------
+PRIMOS_NP = np.array(evaluador.PRIMOS, dtype=np.int64)
+TABLA_COLOR_NP = np.array(evaluador.TABLA_COLOR, dtype=np.int64)
+_claves = sorted(evaluador.TABLA_SIN_COLOR)
+CLAVES_SIN_COLOR = np.array(_claves, dtype=np.int64)
+VALORES_SIN_COLOR = np.array([evaluador.TABLA_SIN_COLOR[k] for k in _claves], dtype=np.int64)
+del _claves
+
+MAZO_COMPLETO = np.array(cartas.MAZO, dtype=np.int64)
+
+# Cuantil normal para el intervalo de confianza del 95%
+Z_95 = 1.96
+
+ResultadoEquidad = namedtuple("ResultadoEquidad",
+                              ["ganar", "empatar", "equidad", "intervalo", "simulaciones"])
+
+_rng = np.random.default_rng()
+
+
+def evaluar_lote(codigos):
+    """Fuerza de cada fila de un array (M, n) de códigos, con 5 <= n <= 7"""
+    producto = PRIMOS_NP[codigos].prod(axis=1)
+    mascara = np.bitwise_or.reduce(np.left_shift(1, codigos), axis=1)
+
+    color = TABLA_COLOR_NP[mascara & evaluador.MASCARA_PALO]
+    for desplazamiento in (16, 32, 48):
+        np.maximum(color, TABLA_COLOR_NP[(mascara >> desplazamiento) & evaluador.MASCARA_PALO], out=color)
+
+    sin_color = VALORES_SIN_COLOR[np.searchsorted(CLAVES_SIN_COLOR, producto)]
+    return np.where(color > 0, color, sin_color)
+
+
+def _simular_lote(mano, tablero, restantes, oponentes, n, rng):
+    """Equidad de cada una de n simulaciones (array de 0 a 1) y victorias/empates"""
+    faltan = 5 - len(tablero)
+    necesarias = faltan + 2 * oponentes
+
+    # Muestreo sin reemplazo: las 'necesarias' claves aleatorias más pequeñas de cada fila
+    claves = rng.random((n, len(restantes)))
+    if necesarias < len(restantes):
+        indices = np.argpartition(claves, necesarias - 1, axis=1)[:, :necesarias]
+    else:
+        indices = np.argsort(claves, axis=1)
+    robadas = restantes[indices]
+
+    tablero_completo = np.empty((n, 5), dtype=np.int64)
+    tablero_completo[:, :len(tablero)] = tablero
+    tablero_completo[:, len(tablero):] = robadas[:, :faltan]
+
+    propia = np.empty((n, 7), dtype=np.int64)
+    propia[:, :2] = mano
+    propia[:, 2:] = tablero_completo
+    fuerza_propia = evaluar_lote(propia)
+
+    rivales = np.empty((n, oponentes, 7), dtype=np.int64)
+    rivales[:, :, :2] = robadas[:, faltan:].reshape(n, oponentes, 2)
+    rivales[:, :, 2:] = tablero_completo[:, None, :]
+    fuerza_rivales = evaluar_lote(rivales.reshape(n * oponentes, 7)).reshape(n, oponentes)
+
+    mejor_rival = fuerza_rivales.max(axis=1)
+    gana = fuerza_propia > mejor_rival
+    empata = fuerza_propia == mejor_rival
+    # En un empate el bote se reparte entre todos los que igualan la mejor mano
+    empatados = (fuerza_rivales == fuerza_propia[:, None]).sum(axis=1)
+    equidad = np.where(gana, 1.0, np.where(empata, 1.0 / (empatados + 1), 0.0))
+    return equidad, int(gana.sum()), int(empata.sum())
+
+
+def simular_equidad(mano, tablero, oponentes, simulaciones=2000, lote=1000,
+                    presupuesto_ms=None, rng=None):
+    """
+    Probabilidad de ganar/empatar de una mano contra 'oponentes' manos aleatorias.
+
+    mano y tablero son listas de códigos de carta. Si se indica presupuesto_ms,
+    se detiene al agotar el tiempo (siempre completa al menos un lote).
+    """
+    rng = rng or _rng
+    oponentes = max(1, int(oponentes))
+    mano = np.asarray(mano, dtype=np.int64)
+    tablero = np.asarray(tablero, dtype=np.int64)
+
+    usadas = np.zeros(64, dtype=bool)
+    usadas[mano] = True
+    usadas[tablero] = True
+    restantes = MAZO_COMPLETO[~usadas[MAZO_COMPLETO]]
+    if 5 - len(tablero) + 2 * oponentes > len(restantes):
+        raise ValueError("No quedan cartas suficientes para tantos oponentes")
+
+    limite = time.perf_counter() + presupuesto_ms / 1000.0 if presupuesto_ms else None
+    total = 0
+    ganadas = 0
+    empatadas = 0
+    suma = 0.0
+    suma_cuadrados = 0.0
+    while total < simulaciones:
+        n = min(lote, simulaciones - total)
+        equidad, g, e = _simular_lote(mano, tablero, restantes, oponentes, n, rng)
+        total += n
+        ganadas += g
+        empatadas += e
+        suma += float(equidad.sum())
+        suma_cuadrados += float(np.dot(equidad, equidad))
+        if limite is not None and time.perf_counter() >= limite:
+            break
+
+    media = suma / total
+    varianza = max(0.0, suma_cuadrados / total - media * media)
+    margen = Z_95 * (varianza / total) ** 0.5
+    return ResultadoEquidad(ganar=ganadas / total,
+                            empatar=empatadas / total,
+                            equidad=media,
+                            intervalo=(max(0.0, media - margen), min(1.0, media + margen)),
+                            simulaciones=total)
@@ -0,0 +1,376 @@
+"""
+Tablas de estrategia precalculadas para las personalidades de la IA.
+
+Un entrenador fuera de línea (CFR+ sobre un árbol de apuestas abstraído)
+calcula, para cada personalidad, la probabilidad de retirarse, igualar, subir
+o ir all-in por calle, cubo de fuerza de mano, posición, cubo de pot odds y
+cubo de fichas respecto al bote (SPR). El archivo binario resultante se mapea
+en memoria al arrancar, así que cada decisión es una consulta a la tabla y un
+número aleatorio.
+
+Árbol abstraído (el resto de la mesa como un solo rival, bote normalizado a
+1): el jugador decide ante una apuesta de c con s botes de fichas. Puede
+retirarse, igualar, subir al tamaño del bote (igualar y añadir el bote
+resultante) o ir all-in con todas sus fichas, exactamente como
+ia.decidir_con_fuerza ejecuta cada acción. Ante una subida el rival se retira,
+iguala o resube all-in, y entonces el jugador se retira o iguala; ante un
+all-in el rival se retira o iguala. Quien apuesta c lleva la parte alta de su
+rango (1 - 2q, con q las pot odds). El árbol no sigue a las calles
+siguientes, así que con más de SPR_MAXIMO_ALL_IN botes de fichas no hay
+all-in ni resubida: ahí robar el bote con un all-in enorme parecería gratis. La fuerza es la misma que en la mesa: la equidad contra
+todos los rivales (ia.fuerza_mano), en repartos de 1 a MAX_OPONENTES rivales
+en los que el rival del árbol es el más fuerte y el jugador cobra su parte del
+bote contra todos. Antes del river se realiza menos equidad fuera de posición
+salvo con alguien all-in.
+Las personalidades cambian la utilidad del jugador: la agresiva valora la
+iniciativa de subir, la conservadora pesa más las pérdidas y la impredecible
+mezcla la estrategia normal con acciones al azar que no son all-in.
+
+Formato (little-endian):
+    cabecera  "<4sHHHHHHHH": b"ESTR", versión, personalidades, calles, cubos de
+              fuerza, posiciones, cubos de pot odds, cubos de SPR, acciones
+    datos     uint16 acumulado por acción en cada celda (la última vale 65535),
+              en orden [personalidad][calle][fuerza][posición][pot odds][SPR][acción]
+
+Generar: python estrategia.py --muestras 3000 --iteraciones 1000
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_right
+
+PERSONALIDADES = ("normal", "agresiva", "conservadora", "impredecible")
+ACCIONES = ("fold", "call", "raise", "all_in")
+CALLES = 4  # Pre-flop, flop, turn y river (valores de EstadoJuego)
+CUBOS_FUERZA = 10
+POSICIONES = 3  # Temprana, media y tardía
+# Pot odds (a pagar / bote tras pagar): el cubo 0 es sin nada que pagar
+LIMITES_ODDS = (0.15, 0.25, 0.35)
+CUBOS_ODDS = len(LIMITES_ODDS) + 2
+# Fichas del jugador en botes (SPR)
+LIMITES_SPR = (1.5, 4.0, 10.0, 25.0)
+CUBOS_SPR = len(LIMITES_SPR) + 1
+
+MAGIA = b"ESTR"
+VERSION = 3
+CABECERA = struct.Struct("<4sHHHHHHHH")
+CELDA = struct.Struct(f"<{len(ACCIONES)}H")
+ESCALA = 65535
+
+RUTA_ESTRATEGIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "estrategia_ia.bin")
+
+# ---------- Parámetros del entrenamiento ----------
+CARTAS_VISIBLES = (0, 3, 4, 5)  # Cartas comunitarias en cada calle
+# Rivales con los que se calcula la fuerza al entrenar (la de la partida local va de 1 a 3)
+MAX_OPONENTES = 3
+ODDS_REPRESENTATIVAS = (0.0, 0.1, 0.2, 0.3, 0.4)  # Una por cubo de pot odds
+SPR_REPRESENTATIVOS = (1.0, 2.5, 6.0, 15.0, 40.0)  # Uno por cubo de SPR
+# Solo se va all-in (y el rival solo resube all-in) con hasta estos botes de fichas: con
+# más, un árbol de una sola calle premia robar el bote con all-ins enormes que en una mano
+# real se castigan en las calles siguientes
+SPR_MAXIMO_ALL_IN = 4.0
+REALIZACION = (0.9, 0.95, 1.0)  # Equidad realizada antes del river por posición
+BONUS_INICIATIVA = 0.1  # Personalidad agresiva: valor extra de subir (no de ir all-in), en botes
+AVERSION_PERDIDAS = 1.5  # Personalidad conservadora: peso de lo que se pierde
+MEZCLA_AZAR = 0.3  # Personalidad impredecible: parte de acciones al azar (sin all-in)
+
+
+def cubo_fuerza(fuerza):
+    """Cubo 0-9 de una fuerza de mano de 0 a 1"""
+    return min(CUBOS_FUERZA - 1, max(0, int(fuerza * CUBOS_FUERZA)))
+
+
+def cubo_odds(apuesta_requerida, bote):
+    """Cubo de pot odds: 0 sin nada que pagar, luego por lo que cuesta seguir"""
+    if apuesta_requerida <= 0:
+        return 0
+    return 1 + bisect_right(LIMITES_ODDS, apuesta_requerida / (bote + apuesta_requerida))
+
+
+def cubo_spr(fichas, bote):
+    """Cubo de las fichas del jugador medidas en botes"""
+    if bote <= 0:
+        return CUBOS_SPR - 1
+    return bisect_right(LIMITES_SPR, fichas / bote)
+
+
+def cubo_posicion(orden, jugadores):
+    """Cubo de posición según el orden de actuación post-flop (0 = primero)"""
+    if jugadores <= 1:
+        return POSICIONES - 1
+    return min(POSICIONES - 1, orden * POSICIONES // (jugadores - 1))
+
+
+def subida_bote(apuesta_requerida, bote):
+    """Fichas de una subida al tamaño del bote: igualar y añadir el bote resultante"""
+    return bote + 2 * apuesta_requerida
+
+
+class TablaEstrategia:
+    """Estrategias de las personalidades mapeadas en memoria"""
+
+    def __init__(self, ruta=RUTA_ESTRATEGIA):
+        with open(ruta, "rb") as f:
+            self.datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        dimensiones = CABECERA.unpack_from(self.datos, 0) if len(self.datos) >= CABECERA.size else None
+        esperadas = (MAGIA, VERSION, len(PERSONALIDADES), CALLES, CUBOS_FUERZA, POSICIONES,
+                     CUBOS_ODDS, CUBOS_SPR, len(ACCIONES))
+        celdas = len(PERSONALIDADES) * CALLES * CUBOS_FUERZA * POSICIONES * CUBOS_ODDS * CUBOS_SPR
+        if dimensiones != esperadas or len(self.datos) != CABECERA.size + CELDA.size * celdas:
+            self.datos.close()
+            raise ValueError(f"Tabla de estrategia no válida: {ruta}")
+
+    def umbrales(self, personalidad, calle, fuerza, posicion, odds, spr):
+        """Probabilidades acumuladas (0-65535) de cada acción en una celda"""
+        p = PERSONALIDADES.index(personalidad) if personalidad in PERSONALIDADES else 0
+        celda = ((((p * CALLES + min(calle, CALLES - 1)) * CUBOS_FUERZA + cubo_fuerza(fuerza))
+                  * POSICIONES + posicion) * CUBOS_ODDS + odds) * CUBOS_SPR + spr
+        return CELDA.unpack_from(self.datos, CABECERA.size + CELDA.size * celda)
+
+    def elegir(self, personalidad, calle, fuerza, posicion, apuesta_requerida, bote, fichas, rng):
+        """Índice en ACCIONES sorteado con la estrategia de la personalidad"""
+        umbrales = self.umbrales(personalidad, calle, fuerza, posicion, cubo_odds(apuesta_requerida, bote),
+                                 cubo_spr(fichas, bote))
+        r = rng.random() * ESCALA
+        for i, umbral in enumerate(umbrales):
+            if r < umbral:
+                return i
+        return len(umbrales) - 1
+
+    def cerrar(self):
+        self.datos.close()
+
+
+_tabla = None
+_tabla_cargada = False
+
+def cargar_tabla_estrategia(ruta=RUTA_ESTRATEGIA):
+    """Tabla compartida del proceso, o None si el archivo no existe o no es válido"""
+    global _tabla, _tabla_cargada
+    if not _tabla_cargada:
+        _tabla_cargada = True
+        try:
+            _tabla = TablaEstrategia(ruta)
+        except (OSError, ValueError) as e:
+            print(f"Sin tabla de estrategia ({e}); se usan los umbrales de fuerza")
+            _tabla = None
+    return _tabla
+
+
+# ---------- Entrenamiento ----------
+def equidad_entre_cubos(calle, muestras, simulaciones, rng):
+    """
+    Probabilidad de cada par de cubos (jugador, rival) y parte media del bote del jugador.
+
+    Los cubos son la misma fuerza que usa la IA en la partida: la equidad contra
+    k rivales, con k de 1 a MAX_OPONENTES. El rival del árbol representa a los k
+    (se toma el de mayor fuerza) y el jugador se lleva su parte del bote contra
+    todos, así que cada cubo rinde en el entrenamiento lo mismo que en la mesa.
+    """
+    import numpy as np
+    from cartas import MAZO
+    from evaluador import evaluar
+    from ia import fuerza_mano
+
+    visibles = CARTAS_VISIBLES[calle]
+    cuenta = np.zeros((CUBOS_FUERZA, CUBOS_FUERZA))
+    suma = np.zeros((CUBOS_FUERZA, CUBOS_FUERZA))
+    mazo = np.array(MAZO)
+    for _ in range(muestras):
+        oponentes = int(rng.integers(1, MAX_OPONENTES + 1))
+        cartas = [int(c) for c in rng.choice(mazo, 7 + 2 * oponentes, replace=False)]
+        tablero, manos = cartas[:5], [cartas[5 + 2 * k:7 + 2 * k] for k in range(oponentes + 1)]
+        cubos = [cubo_fuerza(fuerza_mano(m, tablero[:visibles], oponentes, simulaciones, rng=rng)[0])
+                 for m in manos]
+        fuerzas = [evaluar(m + tablero) for m in manos]
+        mejor = max(fuerzas)
+        ganadores = fuerzas.count(mejor)
+        parte = 1.0 / ganadores if fuerzas[0] == mejor else 0.0
+        j = max(cubos[1:])
+        cuenta[cubos[0], j] += 1
+        suma[cubos[0], j] += parte
+
+    # Pares sin muestras: una muestra ficticia con la equidad del cubo del jugador
+    previa = np.broadcast_to(((np.arange(CUBOS_FUERZA) + 0.5) / CUBOS_FUERZA)[:, None], cuenta.shape)
+    equidad = (suma + previa) / (cuenta + 1)
+    probabilidad = (cuenta + 1e-3) / (cuenta + 1e-3).sum()
+    return probabilidad, equidad
+
+
+def _normalizar(regrets, permitidas=None):
+    """Regret matching: estrategia proporcional al regret positivo (uniforme si no hay) entre las acciones permitidas"""
+    import numpy as np
+
+    if permitidas is None:
+        permitidas = np.ones(regrets.shape[-1])
+    positivo = np.maximum(regrets, 0.0) * permitidas
+    total = positivo.sum(axis=-1, keepdims=True)
+    uniforme = np.broadcast_to(permitidas / permitidas.sum(axis=-1, keepdims=True), positivo.shape)
+    return np.where(total > 0, positivo / np.where(total > 0, total, 1.0), uniforme)
+
+
+def rango_apostador(probabilidad):
+    """Probabilidad conjunta de cubos por pot odds: quien apuesta c al bote lleva su mejor 1 - 2q"""
+    import numpy as np
+
+    marginal = probabilidad.sum(axis=0)
+    por_encima = np.cumsum(marginal[::-1])[::-1] - marginal  # Masa de los cubos más fuertes
+    conjuntas = []
+    for odds in ODDS_REPRESENTATIVAS:
+        fraccion = 1.0 - 2.0 * odds
+        peso = np.clip((fraccion - por_encima) / np.maximum(marginal, 1e-12), 0.0, 1.0)
+        conjunta = probabilidad * peso
+        conjuntas.append(conjunta / conjunta.sum())
+    return np.stack(conjuntas)
+
+
+def entrenar_calle(probabilidad, equidad, calle, personalidad, iteraciones):
+    """Estrategia media CFR+ (posición, pot odds, SPR, fuerza, acción) de una calle"""
+    import numpy as np
+
+    # Ejes: posición, pot odds, SPR, cubo del jugador (i), cubo del rival (j)
+    probabilidad = rango_apostador(probabilidad)
+    realizacion = np.array(REALIZACION if calle < CALLES - 1 else (1.0,) * POSICIONES)
+    realizacion = realizacion[:, None, None, None, None]
+    odds = np.array(ODDS_REPRESENTATIVAS)[None, :, None, None, None]
+    s = np.array(SPR_REPRESENTATIVOS)[None, None, :, None, None]
+    c = np.minimum(odds / (1.0 - odds), s)
+    e = equidad[None, None, None]
+    conservadora = personalidad == "conservadora"
+
+    def showdown(invertido, bote_final, propia):
+        # Con alguien all-in no quedan decisiones: se realiza toda la equidad
+        realizada = np.where(invertido >= s, e, e * realizacion)
+        real = realizada * bote_final - invertido
+        if not propia or not conservadora:
+            return real
+        return real - (AVERSION_PERDIDAS - 1.0) * (1.0 - realizada) * invertido
+
+    def perdida(invertido, propia):
+        return -invertido * (AVERSION_PERDIDAS if propia and conservadora else 1.0)
+
+    # Lo que pone el jugador en total al subir al bote y al ir all-in
+    subida = np.minimum(c + 1.0 + c, s)
+    all_in = s <= SPR_MAXIMO_ALL_IN
+    resube = (subida < s) & all_in  # Tras la subida aún le quedan fichas al jugador para que el rival resuba
+    utilidades = {}
+    for propia in (True, False):
+        utilidades[propia] = {
+            "igualar": showdown(c, 1.0 + c, propia),
+            "subida_igualada": showdown(subida, 1.0 + 2 * subida - c, propia),
+            "all_in_igualado": showdown(s, 1.0 + 2 * s - c, propia),
+            "retirarse_ante_resubida": perdida(subida, propia),
+        }
+    bonus = BONUS_INICIATIVA if personalidad == "agresiva" else 0.0
+
+    forma = (POSICIONES, CUBOS_ODDS, CUBOS_SPR, CUBOS_FUERZA)
+    regrets_propios = np.zeros(forma + (len(ACCIONES),))
+    regrets_resubida = np.zeros(forma + (2,))  # Retirarse o igualar el all-in del rival
+    regrets_rival = np.zeros((POSICIONES, CUBOS_ODDS, CUBOS_SPR, 2, CUBOS_FUERZA, 3))  # Retirarse, igualar, resubir
+    media = np.zeros_like(regrets_propios)
+    # Acciones permitidas por SPR: con muchas fichas ni el jugador va all-in ni el rival resube
+    acciones_propias = np.ones((CUBOS_SPR, 1, len(ACCIONES)))
+    acciones_propias[~all_in[0, 0, :, 0, 0], :, 3] = 0.0
+    acciones_rival = np.ones((CUBOS_SPR, 1, 1, 3))
+    acciones_rival[~all_in[0, 0, :, 0, 0], :, :, 2] = 0.0
+    for t in range(1, iteraciones + 1):
+        propia = _normalizar(regrets_propios, acciones_propias)
+        resubida = _normalizar(regrets_resubida)
+        rival = _normalizar(regrets_rival, acciones_rival)
+
+        # Valor para el jugador (utilidad propia y real) de que el rival resuba sobre su subida
+        def valor_resubida(u):
+            ante = resubida[..., 0, None] * u["retirarse_ante_resubida"] \
+                + resubida[..., 1, None] * u["all_in_igualado"]
+            return np.where(resube, ante, u["subida_igualada"])
+
+        # Valor de cada acción del jugador para cada par de cubos (el rival responde con su estrategia)
+        u = utilidades[True]
+        r_sub = [rival[:, :, :, 0, None, :, k] for k in range(3)]
+        r_all = [rival[:, :, :, 1, None, :, k] for k in range(3)]
+        valores = np.empty(forma + (CUBOS_FUERZA, len(ACCIONES)))
+        valores[..., 0] = 0.0
+        valores[..., 1] = u["igualar"]
+        valores[..., 2] = r_sub[0] * 1.0 + r_sub[1] * u["subida_igualada"] + r_sub[2] * valor_resubida(u) + bonus
+        valores[..., 3] = r_all[0] * 1.0 + (r_all[1] + r_all[2]) * u["all_in_igualado"]
+        q = np.einsum("oij,posija->posia", probabilidad, valores)
+        regrets_propios = np.maximum(regrets_propios + q - (propia * q).sum(-1, keepdims=True), 0.0)
+
+        # Decisión ante la resubida: alcanzada cuando el rival resube
+        ante = np.stack([np.broadcast_to(u["retirarse_ante_resubida"], valores.shape[:-1]),
+                         np.broadcast_to(u["all_in_igualado"], valores.shape[:-1])], axis=-1)
+        q_resubida = np.einsum("oij,posj,posija->posia", probabilidad, r_sub[2][..., 0, :] * resube[..., 0, :], ante)
+        regrets_resubida = np.maximum(regrets_resubida + q_resubida
+                                      - (resubida * q_resubida).sum(-1, keepdims=True), 0.0)
+
+        # El rival maximiza la utilidad real contraria (juego de suma constante)
+        real = utilidades[False]
+        q_rival = np.empty_like(regrets_rival)
+        for k, (accion, resultado_igualado, resultado_resubida) in enumerate(
+                ((2, real["subida_igualada"], valor_resubida(real)),
+                 (3, real["all_in_igualado"], real["all_in_igualado"]))):
+            alcance = probabilidad[None, :, None] * propia[..., accion, None]
+            q_rival[:, :, :, k, :, 0] = -alcance.sum(axis=3)
+            q_rival[:, :, :, k, :, 1] = -(alcance * resultado_igualado).sum(axis=3)
+            q_rival[:, :, :, k, :, 2] = -(alcance * resultado_resubida).sum(axis=3)
+        regrets_rival = np.maximum(regrets_rival + q_rival - (rival * q_rival).sum(-1, keepdims=True), 0.0)
+
+        media += t * propia
+
+    estrategia = media / media.sum(axis=-1, keepdims=True)
+    # Sin nada que pagar, retirarse es pasar
+    estrategia[:, 0, :, :, 1] += estrategia[:, 0, :, :, 0]
+    estrategia[:, 0, :, :, 0] = 0.0
+    return estrategia
+
+
+def generar_tabla(ruta=RUTA_ESTRATEGIA, muestras=3000, simulaciones=300, iteraciones=1000, semilla=24):
+    """Entrenar las estrategias de todas las personalidades y escribir el archivo"""
+    import numpy as np
+
+    rng = np.random.default_rng(semilla)
+    estrategias = {p: [] for p in PERSONALIDADES}
+    inicio = time.perf_counter()
+    for calle in range(CALLES):
+        probabilidad, equidad = equidad_entre_cubos(calle, muestras, simulaciones, rng)
+        for personalidad in ("normal", "agresiva", "conservadora"):
+            estrategias[personalidad].append(entrenar_calle(probabilidad, equidad, calle, personalidad, iteraciones))
+        normal = estrategias["normal"][-1]
+        # Al azar entre retirarse, igualar y subir; sin nada que pagar no se tira la mano
+        mezcla = np.broadcast_to(np.array([1.0, 1.0, 1.0, 0.0]) / 3, normal.shape).copy()
+        mezcla[:, 0] = (0.0, 0.5, 0.5, 0.0)
+        estrategias["impredecible"].append((1.0 - MEZCLA_AZAR) * normal + MEZCLA_AZAR * mezcla)
+        print(f"  calle {calle} lista ({time.perf_counter() - inicio:.0f} s)")
+
+    # (posición, odds, SPR, fuerza, acción) -> [personalidad][calle][fuerza][posición][odds][SPR][acción]
+    tabla = np.stack([np.stack(estrategias[p]) for p in PERSONALIDADES]).transpose(0, 1, 5, 2, 3, 4, 6)
+    acumulada = np.rint(np.cumsum(tabla, axis=-1) * ESCALA).astype(np.uint16)
+    acumulada[..., -1] = ESCALA
+
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(CABECERA.pack(MAGIA, VERSION, len(PERSONALIDADES), CALLES, CUBOS_FUERZA, POSICIONES,
+                              CUBOS_ODDS, CUBOS_SPR, len(ACCIONES)))
+        f.write(acumulada.astype("<u2").tobytes())
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrenar las tablas de estrategia de la IA")
+    parser.add_argument("--muestras", type=int, default=3000, help="repartos por calle para la equidad entre cubos")
+    parser.add_argument("--simulaciones", type=int, default=300, help="simulaciones Monte Carlo por fuerza de mano")
+    parser.add_argument("--iteraciones", type=int, default=1000, help="iteraciones de CFR+ por calle y personalidad")
+    parser.add_argument("--semilla", type=int, default=24, help="semilla del generador aleatorio")
+    parser.add_argument("--salida", default=RUTA_ESTRATEGIA, help="archivo de salida")
+    args = parser.parse_args()
+
+    ruta = generar_tabla(args.salida, args.muestras, args.simulaciones, args.iteraciones, args.semilla)
+    print(f"Tabla escrita en {ruta} ({os.path.getsize(ruta)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Evaluador de manos de Texas Hold'em basado en tablas precalculadas.
+
+- Cada carta es un código entero de cartas.py: palo * 16 + (valor - 2)
+- Manos sin color: producto de primos por rango -> tabla hash perfecta
+- Manos con color: máscara de 13 bits del palo -> tabla directa
+- La fuerza devuelta es un entero comparable (mayor = mejor mano)
+
+No depende de pygame, así que se puede usar desde simulaciones y procesos
+auxiliares.
+"""
+
+from enum import Enum
+from itertools import combinations_with_replacement
+
+
+# Rangos de mano
+class RankingMano(Enum):
+    CARTA_ALTA = 0
+    PAR = 1
+    DOBLE_PAR = 2
+    TRIO = 3
+    ESCALERA = 4
+    COLOR = 5
+    FULL_HOUSE = 6
+    POKER = 7
+    ESCALERA_COLOR = 8
+    ESCALERA_REAL = 9
+
+
+NOMBRES_RANKING = {
+    RankingMano.CARTA_ALTA: "Carta Alta",
+    RankingMano.PAR: "Par",
+    RankingMano.DOBLE_PAR: "Doble Par",
+    RankingMano.TRIO: "Trío",
+    RankingMano.ESCALERA: "Escalera",
+    RankingMano.COLOR: "Color",
+    RankingMano.FULL_HOUSE: "Full House",
+    RankingMano.POKER: "Póker",
+    RankingMano.ESCALERA_COLOR: "Escalera de Color",
+    RankingMano.ESCALERA_REAL: "Escalera Real",
+}
+
+# ---------- Primos por rango ----------
+PRIMOS_RANGO = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+MASCARA_PALO = 0x1FFF
+
+# Primo de cada código de carta (los huecos 13-15 de cada palo no se usan)
+PRIMOS = [PRIMOS_RANGO[c & 15] if (c & 15) < 13 else 0 for c in range(64)]
+
+# ---------- Construcción de tablas ----------
+_CATEGORIAS = list(RankingMano)
+
+def _codificar(categoria, rangos):
+    """Empaquetar categoría y hasta 5 rangos en un entero comparable"""
+    valor = categoria.value
+    for i in range(5):
+        valor = (valor << 4) | (rangos[i] if i < len(rangos) else 0)
+    return valor
+
+def _escalera_mas_alta(mascara):
+    """Rango de la carta más alta de la mejor escalera, o -1"""
+    for alto in range(12, 3, -1):
+        patron = 0x1F << (alto - 4)
+        if mascara & patron == patron:
+            return alto
+    # Escalera baja A-2-3-4-5
+    if mascara & 0x100F == 0x100F:
+        return 3
+    return -1
+
+def _mejores_rangos(mascara, cantidad):
+    """Los rangos más altos presentes en la máscara"""
+    rangos = []
+    for r in range(12, -1, -1):
+        if mascara & (1 << r):
+            rangos.append(r)
+            if len(rangos) == cantidad:
+                break
+    return rangos
+
+def _valor_color(mascara):
+    """Valor de la mejor mano con las cartas de un mismo palo"""
+    alto = _escalera_mas_alta(mascara)
+    if alto == 12:
+        return _codificar(RankingMano.ESCALERA_REAL, [alto])
+    if alto >= 0:
+        return _codificar(RankingMano.ESCALERA_COLOR, [alto])
+    return _codificar(RankingMano.COLOR, _mejores_rangos(mascara, 5))
+
+def _valor_sin_color(conteos):
+    """Valor de la mejor mano de 5 cartas a partir de los conteos por rango"""
+    presentes = 0
+    for r in range(13):
+        if conteos[r]:
+            presentes |= 1 << r
+    # Rangos agrupados por cantidad, del más alto al más bajo
+    grupos = {4: [], 3: [], 2: [], 1: []}
+    for r in range(12, -1, -1):
+        if conteos[r]:
+            grupos[conteos[r]].append(r)
+
+    if grupos[4]:
+        q = grupos[4][0]
+        return _codificar(RankingMano.POKER, [q] + _mejores_rangos(presentes & ~(1 << q), 1))
+
+    trios = grupos[3]
+    pares = grupos[2]
+    if trios and (len(trios) > 1 or pares):
+        t = trios[0]
+        p = max(trios[1:] + pares)
+        return _codificar(RankingMano.FULL_HOUSE, [t, p])
+
+    alto = _escalera_mas_alta(presentes)
+    if alto >= 0:
+        return _codificar(RankingMano.ESCALERA, [alto])
+
+    if trios:
+        t = trios[0]
+        return _codificar(RankingMano.TRIO, [t] + _mejores_rangos(presentes & ~(1 << t), 2))
+
+    if len(pares) >= 2:
+        p1, p2 = pares[0], pares[1]
+        resto = presentes & ~(1 << p1) & ~(1 << p2)
+        return _codificar(RankingMano.DOBLE_PAR, [p1, p2] + _mejores_rangos(resto, 1))
+
+    if pares:
+        p = pares[0]
+        return _codificar(RankingMano.PAR, [p] + _mejores_rangos(presentes & ~(1 << p), 3))
+
+    return _codificar(RankingMano.CARTA_ALTA, _mejores_rangos(presentes, 5))
+
+def _construir_tablas():
+    """Precalcular las tablas de color (por máscara) y sin color (por producto de primos)"""
+    tabla_color = [0] * (MASCARA_PALO + 1)
+    for mascara in range(MASCARA_PALO + 1):
+        if bin(mascara).count("1") >= 5:
+            tabla_color[mascara] = _valor_color(mascara)
+
+    tabla_sin_color = {}
+    for n in (5, 6, 7):
+        for rangos in combinations_with_replacement(range(13), n):
+            conteos = [0] * 13
+            producto = 1
+            for r in rangos:
+                conteos[r] += 1
+                producto *= PRIMOS_RANGO[r]
+            if max(conteos) > 4:
+                continue
+            tabla_sin_color[producto] = _valor_sin_color(conteos)
+    return tabla_color, tabla_sin_color
+
+TABLA_COLOR, TABLA_SIN_COLOR = _construir_tablas()
+
+# ---------- Evaluación ----------
+def evaluar_incremental(producto, mascara):
+    """Evaluar a partir del producto de primos y la máscara de 64 bits ya acumulados"""
+    color = (TABLA_COLOR[mascara & MASCARA_PALO] or
+             TABLA_COLOR[(mascara >> 16) & MASCARA_PALO] or
+             TABLA_COLOR[(mascara >> 32) & MASCARA_PALO] or
+             TABLA_COLOR[(mascara >> 48) & MASCARA_PALO])
+    # Con 7 cartas o menos, si hay color no puede haber full house ni póker
+    return color or TABLA_SIN_COLOR[producto]
+
+def evaluar(codigos):
+    """Fuerza comparable de la mejor mano de 5 cartas entre 5 y 7 códigos"""
+    producto = 1
+    mascara = 0
+    for c in codigos:
+        producto *= PRIMOS[c]
+        mascara |= 1 << c
+    return evaluar_incremental(producto, mascara)
+
+def categoria(fuerza):
+    """RankingMano correspondiente a un valor de fuerza"""
+    return _CATEGORIAS[fuerza >> 20]
+
+def evaluar_mano(mano, cartas_comunitarias):
+    """Evaluar 2 códigos propios más los del tablero; devuelve (RankingMano, fuerza)"""
+    fuerza = evaluar(list(mano) + list(cartas_comunitarias))
+    return categoria(fuerza), fuerza
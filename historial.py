@@ -0,0 +1,207 @@
+"""
+Historial de manos en formato binario compacto.
+
+Cada mano se añade al final del archivo como un registro con prefijo de
+longitud, así que escribir es solo anexar y leer es recorrer el archivo una
+vez sin cargarlo entero. Un registro a medio escribir al final (cierre
+inesperado) se ignora al leer.
+
+Formato (little-endian):
+    cabecera  "<4sH": b"HIST", versión
+    registro  "<I" longitud + mano
+    mano      "<QBBIIB": número, botón, asientos, ciega grande, bote, cartas del tablero
+              por asiento "<IIBBB" (fichas al empezar y al terminar, 2 cartas, longitud
+              del nombre) + nombre UTF-8
+              cartas del tablero (1 byte cada una)
+              "<H" acciones + "<BBBI" por acción (asiento, tipo, calle, fichas puestas)
+              "<B" ganadores + "<BI" por ganador (asiento, fichas ganadas)
+
+Las cartas son códigos de cartas.py; SIN_CARTA marca un asiento sin cartas.
+No depende de pygame.
+
+Resumen de un archivo: python historial.py historial_manos.bin
+"""
+
+import argparse
+import struct
+import time
+from collections import namedtuple
+
+import traza
+
+MAGIA = b"HIST"
+VERSION = 1
+CABECERA = struct.Struct("<4sH")
+LONGITUD = struct.Struct("<I")
+MANO = struct.Struct("<QBBIIB")
+ASIENTO = struct.Struct("<IIBBB")
+ACCION = struct.Struct("<BBBI")
+NUM_ACCIONES = struct.Struct("<H")
+NUM_GANADORES = struct.Struct("<B")
+GANADOR = struct.Struct("<BI")
+
+SIN_CARTA = 255
+
+TIPOS_ACCION = ("ciega_pequena", "ciega_grande", "fold", "check", "call", "raise", "all_in")
+CODIGO_ACCION = {tipo: codigo for codigo, tipo in enumerate(TIPOS_ACCION)}
+
+Mano = namedtuple("Mano", ["numero", "boton", "ciega_grande", "bote", "asientos",
+                           "tablero", "acciones", "ganadores"])
+Asiento = namedtuple("Asiento", ["nombre", "fichas_inicio", "fichas_fin", "cartas"])
+Accion = namedtuple("Accion", ["asiento", "tipo", "calle", "cantidad"])
+
+
+# ---------- Escritura ----------
+class GrabadorMesa:
+    """Estado de la mano en curso de una mesa; el registro terminado va al escritor"""
+
+    def __init__(self, escritor):
+        self.escritor = escritor
+        self.acciones = bytearray()
+        self.num_acciones = 0
+        self.fichas_inicio = []
+
+    def empezar_mano(self, juego):
+        """Llamar tras repartir y antes de las ciegas"""
+        self.acciones.clear()
+        self.num_acciones = 0
+        self.fichas_inicio = [j.fichas for j in juego.jugadores]
+
+    def accion(self, asiento, tipo, calle, cantidad):
+        """Anotar una acción en memoria (se escribe al terminar la mano)"""
+        self.acciones += ACCION.pack(asiento, CODIGO_ACCION[tipo], calle, cantidad)
+        self.num_acciones += 1
+
+    def terminar_mano(self, juego, premios):
+        """Escribir la mano; 'premios' es una lista de (asiento, fichas ganadas)"""
+        tablero = juego.cartas_comunitarias
+        partes = [MANO.pack(juego.numero_mano, max(0, juego.dealer_index), len(juego.jugadores),
+                            juego.ciega_grande, sum(c for _, c in premios), len(tablero))]
+        for j, inicio in zip(juego.jugadores, self.fichas_inicio):
+            nombre = j.nombre.encode("utf-8")[:255]
+            cartas = list(j.mano[:2]) + [SIN_CARTA] * (2 - len(j.mano[:2]))
+            partes.append(ASIENTO.pack(inicio, j.fichas, cartas[0], cartas[1], len(nombre)))
+            partes.append(nombre)
+        partes.append(bytes(tablero))
+        partes.append(NUM_ACCIONES.pack(self.num_acciones))
+        partes.append(self.acciones)
+        partes.append(NUM_GANADORES.pack(len(premios)))
+        for asiento, cantidad in premios:
+            partes.append(GANADOR.pack(asiento, cantidad))
+
+        self.escritor.escribir(b"".join(partes))
+
+
+class EscritorHistorial(GrabadorMesa):
+    """Anexa manos a un archivo de historial con escritura en búfer"""
+
+    def __init__(self, ruta, tam_buffer=1 << 16):
+        super().__init__(self)
+        self.ruta = ruta
+        self.archivo = open(ruta, "ab", buffering=tam_buffer)
+        if self.archivo.tell() == 0:
+            self.archivo.write(CABECERA.pack(MAGIA, VERSION))
+        self.manos = 0
+
+    def mesa(self):
+        """Grabador para otra mesa que comparte este archivo (varias mesas a la vez)"""
+        return GrabadorMesa(self)
+
+    def escribir(self, registro):
+        self.archivo.write(LONGITUD.pack(len(registro)))
+        self.archivo.write(registro)
+        self.manos += 1
+
+    def vaciar(self):
+        with traza.tramo("vaciar historial", "persistencia", manos=self.manos):
+            self.archivo.flush()
+
+    def cerrar(self):
+        if not self.archivo.closed:
+            self.archivo.close()
+
+
+# ---------- Lectura ----------
+def decodificar_mano(registro):
+    """Mano a partir de los bytes de un registro"""
+    numero, boton, num_asientos, ciega_grande, bote, num_tablero = MANO.unpack_from(registro, 0)
+    posicion = MANO.size
+
+    asientos = []
+    for _ in range(num_asientos):
+        inicio, fin, c1, c2, largo = ASIENTO.unpack_from(registro, posicion)
+        posicion += ASIENTO.size
+        nombre = bytes(registro[posicion:posicion + largo]).decode("utf-8")
+        posicion += largo
+        cartas = tuple(c for c in (c1, c2) if c != SIN_CARTA)
+        asientos.append(Asiento(nombre, inicio, fin, cartas))
+
+    tablero = tuple(registro[posicion:posicion + num_tablero])
+    posicion += num_tablero
+
+    num_acciones, = NUM_ACCIONES.unpack_from(registro, posicion)
+    posicion += NUM_ACCIONES.size
+    fin_acciones = posicion + num_acciones * ACCION.size
+    acciones = [Accion(asiento, TIPOS_ACCION[tipo], calle, cantidad)
+                for asiento, tipo, calle, cantidad in ACCION.iter_unpack(registro[posicion:fin_acciones])]
+    posicion = fin_acciones
+
+    num_ganadores, = NUM_GANADORES.unpack_from(registro, posicion)
+    posicion += NUM_GANADORES.size
+    ganadores = [GANADOR.unpack_from(registro, posicion + k * GANADOR.size) for k in range(num_ganadores)]
+
+    return Mano(numero, boton, ciega_grande, bote, asientos, tablero, acciones, ganadores)
+
+
+def leer_registros(ruta, tam_buffer=1 << 16):
+    """Generador de los bytes de cada registro, sin decodificar"""
+    with open(ruta, "rb", buffering=tam_buffer) as f:
+        magia, version = CABECERA.unpack(f.read(CABECERA.size))
+        if magia != MAGIA or version != VERSION:
+            raise ValueError(f"Historial no válido: {ruta}")
+        while True:
+            prefijo = f.read(LONGITUD.size)
+            if len(prefijo) < LONGITUD.size:
+                return
+            longitud, = LONGITUD.unpack(prefijo)
+            registro = f.read(longitud)
+            if len(registro) < longitud:
+                return  # Registro incompleto al final del archivo
+            yield registro
+
+
+def leer_historial(ruta):
+    """Generador de las manos de un archivo de historial (memoria constante)"""
+    for registro in leer_registros(ruta):
+        yield decodificar_mano(registro)
+
+
+def resumir(ruta):
+    """Manos, acciones y balance de fichas por jugador de un historial"""
+    manos = 0
+    acciones = 0
+    balance = {}
+    for mano in leer_historial(ruta):
+        manos += 1
+        acciones += len(mano.acciones)
+        for asiento in mano.asientos:
+            balance[asiento.nombre] = balance.get(asiento.nombre, 0) + asiento.fichas_fin - asiento.fichas_inicio
+    return manos, acciones, balance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumen de un archivo de historial de manos")
+    parser.add_argument("ruta", help="archivo de historial")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    manos, acciones, balance = resumir(args.ruta)
+    segundos = time.perf_counter() - inicio
+
+    print(f"Manos: {manos:,} - acciones: {acciones:,} ({segundos:.2f} s)")
+    for nombre, fichas in sorted(balance.items(), key=lambda x: -x[1]):
+        print(f"  {nombre:<20} balance {fichas:>+12,}")
+
+
+if __name__ == "__main__":
+    main()
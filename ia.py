@@ -0,0 +1,142 @@
+"""
+Lógica de decisión de la IA.
+
+Las decisiones se describen con una SolicitudDecision (solo enteros, cadenas
+y tuplas de códigos de carta) para poder enviarlas a procesos auxiliares sin
+arrastrar objetos de pygame; el servidor (servidor.py) las resuelve con
+decidir() en su pool de procesos mientras las mesas siguen jugando. La acción sale
+de la tabla de estrategia de cada personalidad (estrategia.py) si existe, y
+si no de umbrales fijos sobre la fuerza de la mano.
+"""
+
+import random
+from collections import namedtuple
+
+import numpy as np
+
+from equidad import simular_equidad
+from estrategia import cargar_tabla_estrategia, subida_bote
+from evaluador import RankingMano, categoria, evaluar
+from tabla_preflop import cargar_tabla_preflop
+
+# ajuste_rivales: multiplicador de la fuerza según los rivales (modelo_rivales.ajuste_fuerza)
+# posicion: cubo de posición de estrategia.cubo_posicion (0 temprana, 2 tardía)
+# semilla: de la aleatoriedad de la mesa, para que la decisión se repita en cualquier proceso
+SolicitudDecision = namedtuple("SolicitudDecision", [
+    "personalidad", "mano", "tablero", "fichas", "apuesta_requerida", "bote",
+    "ronda", "apuesta_minima", "jugadores_en_vida", "simulaciones", "presupuesto_ms",
+    "ajuste_rivales", "posicion", "semilla"
+], defaults=(1.0, 1, None))
+
+# Fuerza aproximada por jugada hecha, para simulaciones masivas sin Monte Carlo
+FUERZA_CATEGORIA = {
+    RankingMano.CARTA_ALTA: 0.25,
+    RankingMano.PAR: 0.5,
+    RankingMano.DOBLE_PAR: 0.7,
+    RankingMano.TRIO: 0.8,
+    RankingMano.ESCALERA: 0.85,
+    RankingMano.COLOR: 0.9,
+    RankingMano.FULL_HOUSE: 0.95,
+    RankingMano.POKER: 1.0,
+    RankingMano.ESCALERA_COLOR: 1.0,
+    RankingMano.ESCALERA_REAL: 1.0,
+}
+
+
+# ---------- Fuerza de mano ----------
+def fuerza_preflop(mano, oponentes=1):
+    """Fuerza pre-flop: tabla de equidad precalculada, o fórmula por valor de las cartas"""
+    oponentes = max(1, oponentes)
+    tabla = cargar_tabla_preflop()
+    if tabla is not None:
+        return tabla.equidad(mano, oponentes)
+
+    valores = sorted([(c & 15) + 2 for c in mano], reverse=True)
+    base = valores[0] / 14.0 * 0.6 + valores[1] / 14.0 * 0.4
+
+    # Bonus por pareja o cartas altas
+    if valores[0] == valores[1]:
+        base += 0.3  # Par
+    elif valores[0] >= 12 or valores[1] >= 12:
+        base += 0.2  # Cartas altas
+
+    # La fórmula es mano a mano: ganar a k rivales ~ p^k
+    return min(1.0, base) ** oponentes
+
+def fuerza_mano(mano, tablero, oponentes=1, simulaciones=2000, presupuesto_ms=None, rng=None):
+    """
+    Fuerza de 0 a 1 (equidad contra todos los oponentes) y resultado de
+    equidad (None sin Monte Carlo) a partir de códigos de carta.
+    """
+    oponentes = max(1, oponentes)
+    if len(tablero) == 0:
+        return fuerza_preflop(mano, oponentes), None
+    if simulaciones <= 0:
+        # Sin simulaciones: solo la jugada hecha (mucho más rápido, menos preciso); ganar a k rivales ~ p^k
+        return FUERZA_CATEGORIA[categoria(evaluar(list(mano) + list(tablero)))] ** oponentes, None
+
+    # Post-flop: equidad Monte Carlo contra las manos ocultas de los rivales
+    resultado = simular_equidad(mano, tablero, oponentes, simulaciones, presupuesto_ms=presupuesto_ms, rng=rng)
+    return resultado.equidad, resultado
+
+
+# ---------- Decisión ----------
+def decidir_con_fuerza(personalidad, fuerza, fichas, apuesta_requerida, apuesta_minima, rng=random,
+                       bote=0, ronda=0, posicion=1, oponentes=1):
+    """Acción (decisión, cantidad) para una fuerza de mano (equidad contra 'oponentes') y personalidad"""
+    tabla = cargar_tabla_estrategia()
+    if tabla is not None:
+        # Estrategia precalculada: una consulta y un sorteo. La tabla se entrenó con la
+        # equidad contra todos los rivales, así que el ajuste no puede sacarla de [0, 1]
+        fuerza = min(1.0, max(0.0, fuerza))
+        accion = tabla.elegir(personalidad, ronda, fuerza, posicion, apuesta_requerida, bote, fichas, rng)
+        if accion == 0:
+            # Sin nada que pagar no se tira la mano
+            return ("fold", 0) if apuesta_requerida > 0 else ("call", 0)
+        if accion == 1:
+            return "call", apuesta_requerida
+        if accion == 2:
+            # Los mismos tamaños que modela el entrenador: subida al bote y todas las fichas
+            return "raise", min(fichas, subida_bote(apuesta_requerida, bote))
+        return "raise", fichas
+
+    # Sin tabla: umbrales de fuerza pensados para mano a mano (ganar a k rivales ~ p^k)
+    fuerza = max(0.0, fuerza) ** (1.0 / max(1, oponentes))
+    # Modificar fuerza según personalidad
+    if personalidad == "agresiva":
+        fuerza *= 1.3
+    elif personalidad == "conservadora":
+        fuerza *= 0.7
+    elif personalidad == "impredecible":
+        fuerza *= rng.uniform(0.5, 1.5)
+
+    # Tomar decisión basada en fuerza
+    if fuerza < 0.3:
+        return "fold", 0
+    elif fuerza < 0.6:
+        return "call", apuesta_requerida
+    elif fuerza < 0.9:
+        return "raise", min(fichas, apuesta_minima * 2)
+    else:
+        return "raise", fichas
+
+def decidir(solicitud):
+    """Resolver una SolicitudDecision completa (se ejecuta también en los procesos del pool)"""
+    # Con semilla, generadores propios como los de la mesa (PokerGame.rng y rng_equidad)
+    rng, rng_equidad = random, None
+    if solicitud.semilla is not None:
+        rng = random.Random(solicitud.semilla)
+        rng_equidad = np.random.default_rng(rng.getrandbits(64))
+    oponentes = max(1, solicitud.jugadores_en_vida - 1)
+    fuerza, _ = fuerza_mano(solicitud.mano, solicitud.tablero, oponentes,
+                            solicitud.simulaciones, solicitud.presupuesto_ms, rng_equidad)
+    return decidir_con_fuerza(solicitud.personalidad, fuerza * solicitud.ajuste_rivales, solicitud.fichas,
+                              solicitud.apuesta_requerida, solicitud.apuesta_minima, rng,
+                              bote=solicitud.bote, ronda=solicitud.ronda, posicion=solicitud.posicion,
+                              oponentes=oponentes)
+
+def describir_accion(decision, cantidad, fichas):
+    """Texto de la última acción que se muestra sobre el avatar"""
+    if decision == "raise":
+        return "all in" if cantidad >= fichas else f"raise {cantidad}"
+    return decision
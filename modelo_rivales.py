@@ -0,0 +1,145 @@
+"""
+Modelo de los rivales a partir de cómo juegan de verdad.
+
+Cada jugador lleva un PerfilRival: contadores enteros en un array de tamaño
+fijo (4 bytes por contador) que la mesa actualiza en O(1) por acción. Las
+acciones son públicas, así que todos los asientos IA leen los mismos
+contadores de cada rival en lugar de llevar una copia cada uno.
+
+Estadísticas (mezcladas con un jugador medio mientras hay pocas manos):
+- VPIP: pone fichas voluntariamente pre-flop
+- PFR: sube pre-flop
+- Agresión: apuestas y subidas post-flop por cada igualada post-flop
+- Retirada ante apuesta: se retira post-flop cuando hay algo que igualar
+- Showdown: llega al showdown después de ver el flop
+
+a_bytes() y cargar() pasan los contadores tal cual al almacén de usuarios.
+No depende de pygame.
+"""
+
+from array import array
+
+# Posiciones de los contadores
+(MANOS, VPIP, PFR, AGRESIVAS, IGUALADAS, ANTE_APUESTA, RETIRADAS_ANTE_APUESTA,
+ VIO_FLOP, SHOWDOWNS) = range(9)
+NUM_CONTADORES = 9
+
+# Observaciones "imaginarias" del jugador medio que se suman a las reales
+PESO_PREVIO = 20
+PREVIO_VPIP = 0.3
+PREVIO_PFR = 0.15
+PREVIO_AGRESION = 1.5
+PREVIO_RETIRADA = 0.45
+PREVIO_SHOWDOWN = 0.3
+
+# Límites del multiplicador de la fuerza de mano
+AJUSTE_MINIMO = 0.8
+AJUSTE_MAXIMO = 1.25
+
+# Acciones que cuentan para las estadísticas (las ciegas no son voluntarias)
+ACCIONES_OBSERVADAS = ("fold", "check", "call", "raise", "all_in")
+
+
+class PerfilRival:
+    """Contadores de las acciones de un jugador, a lo largo de todas sus manos"""
+
+    __slots__ = ("contadores", "vpip_mano", "pfr_mano")
+
+    def __init__(self):
+        self.contadores = array("I", [0]) * NUM_CONTADORES
+        self.vpip_mano = False
+        self.pfr_mano = False
+
+    # ---------- Observación (O(1)) ----------
+    def nueva_mano(self):
+        self.contadores[MANOS] += 1
+        self.vpip_mano = False
+        self.pfr_mano = False
+
+    def observar(self, accion, preflop, ante_apuesta):
+        """Una acción voluntaria; 'ante_apuesta' si tenía algo que igualar"""
+        c = self.contadores
+        agresiva = accion == "raise" or accion == "all_in"
+        if preflop:
+            if not self.vpip_mano and (agresiva or accion == "call"):
+                self.vpip_mano = True
+                c[VPIP] += 1
+            if agresiva and not self.pfr_mano:
+                self.pfr_mano = True
+                c[PFR] += 1
+            return
+        if agresiva:
+            c[AGRESIVAS] += 1
+        elif accion == "call":
+            c[IGUALADAS] += 1
+        if ante_apuesta:
+            c[ANTE_APUESTA] += 1
+            if accion == "fold":
+                c[RETIRADAS_ANTE_APUESTA] += 1
+
+    def vio_flop(self):
+        self.contadores[VIO_FLOP] += 1
+
+    def showdown(self):
+        self.contadores[SHOWDOWNS] += 1
+
+    # ---------- Estadísticas ----------
+    def _frecuencia(self, veces, de, previo):
+        c = self.contadores
+        return (c[veces] + previo * PESO_PREVIO) / (c[de] + PESO_PREVIO)
+
+    def vpip(self):
+        return self._frecuencia(VPIP, MANOS, PREVIO_VPIP)
+
+    def pfr(self):
+        return self._frecuencia(PFR, MANOS, PREVIO_PFR)
+
+    def agresion(self):
+        return self._frecuencia(AGRESIVAS, IGUALADAS, PREVIO_AGRESION)
+
+    def retirada_ante_apuesta(self):
+        return self._frecuencia(RETIRADAS_ANTE_APUESTA, ANTE_APUESTA, PREVIO_RETIRADA)
+
+    def frecuencia_showdown(self):
+        return self._frecuencia(SHOWDOWNS, VIO_FLOP, PREVIO_SHOWDOWN)
+
+    def resumen(self):
+        return {
+            "manos": self.contadores[MANOS],
+            "vpip": self.vpip(),
+            "pfr": self.pfr(),
+            "agresion": self.agresion(),
+            "retirada_ante_apuesta": self.retirada_ante_apuesta(),
+            "showdown": self.frecuencia_showdown(),
+        }
+
+    # ---------- Persistencia ----------
+    def a_bytes(self):
+        return self.contadores.tobytes()
+
+    def cargar(self, datos):
+        """Contadores guardados con a_bytes(); False si no tienen el tamaño esperado"""
+        contadores = array("I")
+        if len(datos) != contadores.itemsize * NUM_CONTADORES:
+            return False
+        contadores.frombytes(datos)
+        self.contadores = contadores
+        return True
+
+
+def ajuste_fuerza(rivales, apuesta_requerida):
+    """Multiplicador de la fuerza de mano según cómo juegan los rivales que siguen en la mano"""
+    if not rivales:
+        return 1.0
+    n = len(rivales)
+    # Rivales que entran con muchas manos las tienen más flojas
+    ajuste = 1.0 + 0.5 * (sum(r.vpip() for r in rivales) / n - PREVIO_VPIP)
+    if apuesta_requerida > 0:
+        # La apuesta de un rival agresivo significa menos
+        agresion = sum(r.agresion() for r in rivales) / n
+        ajuste += 0.1 * (agresion - PREVIO_AGRESION) / PREVIO_AGRESION
+    else:
+        # Apostar rinde más contra quien se retira y menos contra quien llega siempre al showdown
+        ajuste += 0.5 * (sum(r.retirada_ante_apuesta() for r in rivales) / n - PREVIO_RETIRADA)
+        ajuste -= 0.3 * (sum(r.frecuencia_showdown() for r in rivales) / n - PREVIO_SHOWDOWN)
+    return min(AJUSTE_MAXIMO, max(AJUSTE_MINIMO, ajuste))
@@ -0,0 +1,777 @@
+"""
+Motor de juego de Texas Hold'em sin dependencias de pygame.
+
+Contiene los jugadores y la lógica de la mano (reparto, apuestas y showdown).
+Las apuestas llevan su estado de forma incremental: cantidad a igualar,
+subida mínima, último agresor, jugadores que aún deben actuar y un anillo
+enlazado de asientos que pueden actuar, así que validar una acción, pasar el
+turno y detectar el fin de la ronda no recorre la mesa. Los botes laterales
+se calculan a partir de lo aportado por cada jugador.
+Cada mesa tiene su propio generador aleatorio con semilla opcional para el
+mazo y las decisiones de la IA, así que una semilla reproduce las mismas
+manos sin depender del estado global de random.
+Cada jugador lleva las estadísticas de cómo juega (modelo_rivales.py), que
+la mesa actualiza en cada acción y la IA usa contra los rivales en la mano.
+Las cartas son códigos enteros de cartas.py y las manos, el tablero y el mazo
+llevan además su máscara de 64 bits. POKERR.py extiende PokerGame con los
+efectos y crea objetos Carta solo para dibujar; el simulador y los procesos
+auxiliares usan el motor directamente sin ventana.
+"""
+
+import random
+from enum import Enum
+
+import numpy as np
+
+import traza
+from cartas import MAZO, MASCARA_MAZO
+from estrategia import cubo_posicion
+from evaluador import PRIMOS, categoria, evaluar_incremental
+from ia import SolicitudDecision, fuerza_mano, decidir_con_fuerza, describir_accion
+from modelo_rivales import ACCIONES_OBSERVADAS, PerfilRival, ajuste_fuerza
+
+# ---------- Configuración de la IA ----------
+# Simulaciones Monte Carlo por decisión post-flop de la IA (limitadas al tiempo de un frame)
+SIMULACIONES_IA = 2000
+PRESUPUESTO_IA_MS = 10
+
+# Simulaciones cuando la decisión se resuelve en el pool de procesos
+SIMULACIONES_IA_ASINCRONA = 20000
+
+# Color del avatar del usuario (ORO_PRINCIPAL del tema)
+COLOR_USUARIO = (212, 175, 55)
+
+# Estados del juego
+class EstadoJuego(Enum):
+    PREFLOP = 0
+    FLOP = 1
+    TURN = 2
+    RIVER = 3
+    SHOWDOWN = 4
+    FINAL = 5
+
+# ---------- Jugadores ----------
+class Jugador:
+    # Monte Carlo de la IA síncrona; el simulador los ajusta para ir más rápido
+    simulaciones_ia = SIMULACIONES_IA
+    presupuesto_ia_ms = PRESUPUESTO_IA_MS
+
+    def __init__(self, nombre, es_ia=False, fichas=2000, personalidad="normal", es_usuario=False):
+        self.nombre = nombre
+        self.es_ia = es_ia
+        self.es_usuario = es_usuario
+        self.fichas = fichas
+        self.mano = []
+        self.mascara = 0
+        self.producto = 1
+        self.apuesta_actual = 0
+        self.aporte = 0  # Total puesto en el bote durante la mano
+        self.en_juego = True
+        self.ha_hecho_all_in = False
+        self.ha_pasado = False
+        self.mano_final = None
+        self.ranking_mano = None
+        self.personalidad = personalidad
+        self.avatar_color = self.generar_color_premium()
+        self.ultima_accion = ""
+        self.tiempo_decision = 0
+        self.efecto_brillo = 0
+        self.equidad = None
+        self.perfil = PerfilRival()  # Cómo juega, visto por los rivales
+
+    def generar_color_premium(self):
+        """Colores de avatar premium"""
+        if self.es_usuario:
+            return COLOR_USUARIO
+        elif "Ana" in self.nombre:
+            return (180, 80, 120)  # Rosa oscuro premium
+        elif "Luis" in self.nombre:
+            return (80, 160, 120)  # Verde esmeralda
+        elif "Mia" in self.nombre:
+            return (160, 100, 200)  # Púrpura real
+        else:
+            return (random.randint(120, 180), random.randint(120, 180), random.randint(120, 180))
+
+    def recibir_carta(self, carta):
+        self.mano.append(carta)
+        self.mascara |= 1 << carta
+        self.producto *= PRIMOS[carta]
+
+    def vaciar_mano(self):
+        self.mano = []
+        self.mascara = 0
+        self.producto = 1
+
+    def hacer_apuesta(self, cantidad):
+        cantidad = max(0, int(cantidad))
+        if cantidad >= self.fichas:
+            cantidad = self.fichas
+            self.ha_hecho_all_in = True
+        self.fichas -= cantidad
+        self.apuesta_actual += cantidad
+        self.aporte += cantidad
+        return cantidad
+
+    def reset_apuesta(self):
+        self.apuesta_actual = 0
+        self.ha_pasado = False
+
+    def puede_jugar(self):
+        return self.en_juego and not self.ha_hecho_all_in and self.fichas > 0
+
+    # IA mejorada
+    def tomar_decision_ia(self, apuesta_requerida, bote_actual, cartas_comunitarias, ronda, apuesta_minima, jugadores_en_vida,
+                          posicion=1, rng=random, rng_equidad=None, rivales=()):
+        if not self.puede_jugar():
+            return "fold", 0
+            
+        # Calcular fuerza de mano contra los rivales que siguen en la mano, ajustada a cómo juegan
+        oponentes = max(1, jugadores_en_vida - 1)
+        fuerza = self.calcular_fuerza_mano(cartas_comunitarias, oponentes, rng_equidad)
+        fuerza *= ajuste_fuerza(rivales, apuesta_requerida)
+        
+        decision, cantidad = decidir_con_fuerza(self.personalidad, fuerza, self.fichas,
+                                                apuesta_requerida, apuesta_minima, rng,
+                                                bote_actual, ronda.value, posicion, oponentes)
+        self.ultima_accion = describir_accion(decision, cantidad, self.fichas)
+        return decision, cantidad
+
+    def crear_solicitud_decision(self, apuesta_requerida, bote_actual, cartas_comunitarias, ronda, apuesta_minima, jugadores_en_vida,
+                                 posicion=1, rivales=()):
+        """Describir la decisión pendiente para resolverla en el servicio de IA"""
+        return SolicitudDecision(
+            personalidad=self.personalidad,
+            mano=tuple(self.mano),
+            tablero=tuple(cartas_comunitarias),
+            fichas=self.fichas,
+            apuesta_requerida=apuesta_requerida,
+            bote=bote_actual,
+            ronda=ronda.value,
+            apuesta_minima=apuesta_minima,
+            jugadores_en_vida=jugadores_en_vida,
+            simulaciones=SIMULACIONES_IA_ASINCRONA,
+            presupuesto_ms=None,
+            ajuste_rivales=ajuste_fuerza(rivales, apuesta_requerida),
+            posicion=posicion
+        )
+
+    def calcular_fuerza_mano(self, cartas_comunitarias, oponentes=1, rng=None):
+        """Calcular fuerza aproximada de la mano"""
+        fuerza, self.equidad = fuerza_mano(self.mano, cartas_comunitarias,
+                                           oponentes, self.simulaciones_ia, self.presupuesto_ia_ms, rng)
+        return fuerza
+
+class JugadorSesion(Jugador):
+    """Jugador del usuario conectado: sus fichas son las de la sesión (usuarios.SesionUsuario)"""
+
+    def __init__(self, sesion):
+        self.sesion = sesion
+        super().__init__(sesion.nombre, es_ia=False, fichas=sesion.fichas, es_usuario=True)
+
+    @property
+    def fichas(self):
+        return self.sesion.fichas
+
+    @fichas.setter
+    def fichas(self, valor):
+        self.sesion.fichas = valor
+
+# ---------- Clase Principal del Juego ----------
+class PokerGame:
+    def __init__(self, jugador_usuario=None, jugadores=None, semilla=None, reparto_perezoso=False):
+        if jugadores is not None:
+            self.jugadores = jugadores
+        elif jugador_usuario:
+            self.jugadores = [
+                jugador_usuario,
+                Jugador("IA - Ana", es_ia=True, fichas=2500, personalidad="agresiva"),
+                Jugador("IA - Luis", es_ia=True, fichas=2500, personalidad="conservadora"),
+                Jugador("IA - Mia", es_ia=True, fichas=2500, personalidad="impredecible")
+            ]
+        else:
+            self.jugadores = [
+                Jugador("Tú", es_ia=False, fichas=3000, es_usuario=True),
+                Jugador("IA - Ana", es_ia=True, fichas=2500, personalidad="agresiva"),
+                Jugador("IA - Luis", es_ia=True, fichas=2500, personalidad="conservadora"),
+                Jugador("IA - Mia", es_ia=True, fichas=2500, personalidad="impredecible")
+            ]
+            
+        self.mazo = []
+        self.mascara_mazo = 0
+        self.cartas_comunitarias = []
+        self.mascara_tablero = 0
+        self.producto_tablero = 1
+        self.bote = 0
+        self.botes = []  # [(cantidad, elegibles)] principal y laterales
+        self.ciega_grande = 50
+        self.apuesta_minima = self.ciega_grande  # Cantidad a igualar en la calle actual
+        self.subida_minima = self.ciega_grande
+        # Asientos que ya actuaron desde la última subida completa: ante un all-in corto
+        # vuelven a actuar, pero solo para igualar o retirarse
+        self.ya_actuaron = set()
+        self.ultimo_agresor = None
+        self.dealer_index = -1
+        self.jugador_actual_index = 1
+        self.estado = EstadoJuego.PREFLOP
+        self.ronda_terminada = False
+        self.ganador = None
+        self.ganadores = []
+        self.animaciones = []
+        self.efecto_brillo_mesa = 0
+        self.juego_activo = False
+
+        # Estado incremental de la ronda de apuestas
+        n = len(self.jugadores)
+        self.siguiente = list(range(n))  # Anillo de asientos que pueden actuar
+        self.anterior = list(range(n))
+        self.en_anillo = [False] * n
+        self.pueden_actuar = 0  # En la mano, sin all-in y con fichas
+        self.en_mano = 0  # Sin retirarse
+        self.pendientes = 0  # Jugadores que aún deben actuar en esta calle
+        self.hubo_all_in = False
+
+        # Aleatoriedad propia de la mesa (mazo e IA): con la misma semilla se repiten las manos
+        self.semilla = semilla
+        self.rng = random.Random(semilla)
+        self.rng_equidad = np.random.default_rng(self.rng.getrandbits(64))
+        # Perezoso: cada carta se elige al robarla, sin barajar el mazo entero
+        self.reparto_perezoso = reparto_perezoso
+
+        # Historial de manos (historial.EscritorHistorial) si se quiere grabar
+        self.historial = None
+        # Contador de acciones por (asiento, acción) (collections.Counter) si se quiere medir
+        self.acciones = None
+        self.numero_mano = 0
+        self.premios = []  # [(asiento, fichas ganadas)] de la última mano
+        self.inicio_traza = None  # Comienzo de la mano en la traza (traza.py), si está activa
+        self.fila_traza = None  # Fila propia en la traza (None = la del hilo)
+        self.crear_mazo()
+
+    def crear_mazo(self):
+        self.mazo = list(MAZO)
+        self.mascara_mazo = MASCARA_MAZO
+
+    def barajar(self):
+        if not self.reparto_perezoso:
+            self.rng.shuffle(self.mazo)
+
+    def robar(self):
+        """Sacar la carta de arriba del mazo"""
+        mazo = self.mazo
+        if self.reparto_perezoso:
+            # Un paso de Fisher-Yates: la carta se elige entre las que quedan al robarla
+            k = int(self.rng.random() * len(mazo))
+            mazo[k], mazo[-1] = mazo[-1], mazo[k]
+        carta = mazo.pop()
+        self.mascara_mazo ^= 1 << carta
+        return carta
+
+    def repartir_cartas(self):
+        for j in self.jugadores:
+            j.vaciar_mano()
+        for _ in range(2):
+            for j in self.jugadores:
+                if j.en_juego and len(self.mazo) > 0:
+                    j.recibir_carta(self.robar())
+
+    def agregar_comunitaria(self, carta):
+        self.cartas_comunitarias.append(carta)
+        self.mascara_tablero |= 1 << carta
+        self.producto_tablero *= PRIMOS[carta]
+
+    def repartir_cartas_comunitarias(self):
+        if self.estado == EstadoJuego.FLOP and len(self.cartas_comunitarias) == 0:
+            if len(self.mazo) > 0: 
+                self.robar()  # Quemar carta
+            for _ in range(3):
+                if len(self.mazo) > 0:
+                    self.agregar_comunitaria(self.robar())
+                    self.efecto(30, "oro")
+                    
+        elif self.estado == EstadoJuego.TURN and len(self.cartas_comunitarias) == 3:
+            if len(self.mazo) > 0: 
+                self.robar()  # Quemar carta
+            if len(self.mazo) > 0:
+                self.agregar_comunitaria(self.robar())
+                self.efecto(20, "oro")
+                
+        elif self.estado == EstadoJuego.RIVER and len(self.cartas_comunitarias) == 4:
+            if len(self.mazo) > 0: 
+                self.robar()  # Quemar carta
+            if len(self.mazo) > 0:
+                self.agregar_comunitaria(self.robar())
+                self.efecto(20, "oro")
+
+    def iniciar_nueva_mano(self):
+        try:
+            # Jugadores válidos para la mano: con fichas
+            jugadores_validos = [i for i, j in enumerate(self.jugadores) if j.fichas > 0]
+            if len(jugadores_validos) < 2:
+                return False
+
+            self.crear_mazo()
+            self.barajar()
+            self.cartas_comunitarias = []
+            self.mascara_tablero = 0
+            self.producto_tablero = 1
+            self.bote = 0
+            self.botes = []
+            self.apuesta_minima = self.ciega_grande
+            self.subida_minima = self.ciega_grande
+            self.estado = EstadoJuego.PREFLOP
+            self.ronda_terminada = False
+            self.hubo_all_in = False
+            self.ganador = None
+            self.ganadores = []
+            self.premios = []
+            self.juego_activo = True
+            self.numero_mano += 1
+            self.inicio_traza = None
+            if traza.activa():
+                self.inicio_traza = traza.ahora()
+                traza.instante("nueva mano", fila=self.fila_traza, mano=self.numero_mano)
+            
+            # Reset jugadores (los que no tienen fichas no juegan la mano)
+            for j in self.jugadores:
+                j.reset_apuesta()
+                j.vaciar_mano()
+                j.aporte = 0
+                j.en_juego = j.fichas > 0
+                j.ha_hecho_all_in = False
+                j.mano_final = None
+                j.ranking_mano = None
+                j.equidad = None
+                j.ultima_accion = ""
+                if j.en_juego:
+                    j.perfil.nueva_mano()
+            self.en_mano = len(jugadores_validos)
+            self._construir_anillo(jugadores_validos)
+            
+            # Repartir cartas
+            self.repartir_cartas()
+            if self.historial is not None:
+                self.historial.empezar_mano(self)
+            
+            # El botón pasa al siguiente jugador con fichas; mano a mano el botón pone la ciega pequeña
+            self.dealer_index = next((i for i in jugadores_validos if i > self.dealer_index), jugadores_validos[0])
+            posicion = jugadores_validos.index(self.dealer_index)
+            if len(jugadores_validos) == 2:
+                sb_idx = self.dealer_index
+            else:
+                sb_idx = jugadores_validos[(posicion + 1) % len(jugadores_validos)]
+            bb_idx = jugadores_validos[(jugadores_validos.index(sb_idx) + 1) % len(jugadores_validos)]
+            
+            # Aplicar small blind y big blind (el bote recibe lo que realmente se paga)
+            self._anotar(sb_idx, "ciega_pequena", self._pagar(self.jugadores[sb_idx], self.ciega_grande // 2))
+            self._anotar(bb_idx, "ciega_grande", self._pagar(self.jugadores[bb_idx], self.ciega_grande))
+            self.ultimo_agresor = bb_idx
+            
+            # Pre-flop actúan todos (la ciega grande tiene opción), empezando tras la ciega grande
+            self._abrir_calle(self._primero_tras(bb_idx))
+            
+            self.efecto(40, "oro")
+            return True
+            
+        except Exception as e:
+            print(f"Error al iniciar nueva mano: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+    # ---------- Asientos (solo entre manos) ----------
+    def sentar(self, jugador):
+        """Añadir un jugador a la mesa; devuelve su asiento"""
+        self.jugadores.append(jugador)
+        return len(self.jugadores) - 1
+
+    def levantar(self, jugador):
+        """Quitar un jugador de la mesa manteniendo el botón en su sitio"""
+        i = self.jugadores.index(jugador)
+        del self.jugadores[i]
+        if self.dealer_index >= i:
+            self.dealer_index -= 1
+
+    # ---------- Anillo de jugadores que pueden actuar ----------
+    def _construir_anillo(self, indices):
+        if len(self.en_anillo) != len(self.jugadores):
+            # Cambió el número de asientos desde la última mano
+            total = len(self.jugadores)
+            self.siguiente = list(range(total))
+            self.anterior = list(range(total))
+            self.en_anillo = [False] * total
+        n = len(indices)
+        for k, i in enumerate(indices):
+            self.siguiente[i] = indices[(k + 1) % n]
+            self.anterior[i] = indices[k - 1]
+        for i in range(len(self.jugadores)):
+            self.en_anillo[i] = False
+        for i in indices:
+            self.en_anillo[i] = True
+        self.pueden_actuar = n
+
+    def _quitar_del_anillo(self, i):
+        """Sacar del turno a un jugador que se retira o va all-in (O(1))"""
+        if self.en_anillo[i]:
+            a, s = self.anterior[i], self.siguiente[i]
+            self.siguiente[a] = s
+            self.anterior[s] = a
+            self.en_anillo[i] = False
+            self.pueden_actuar -= 1
+
+    def _primero_tras(self, desde):
+        """Primer asiento que puede actuar después de 'desde' (una vez por calle)"""
+        n = len(self.jugadores)
+        for k in range(1, n + 1):
+            i = (desde + k) % n
+            if self.en_anillo[i]:
+                return i
+        return None
+
+    def encontrar_siguiente_jugador_index(self, desde):
+        if self.en_anillo[desde]:
+            return self.siguiente[desde] if self.pueden_actuar > 0 else None
+        return self._primero_tras(desde)
+
+    # ---------- Estado de la ronda de apuestas ----------
+    def _pagar(self, jugador, cantidad):
+        """Mover fichas del jugador al bote, registrando el all-in"""
+        pagado = jugador.hacer_apuesta(cantidad)
+        self.bote += pagado
+        if jugador.ha_hecho_all_in:
+            self.hubo_all_in = True
+            self._quitar_del_anillo(self.jugadores.index(jugador))
+        return pagado
+
+    def _anotar(self, i, tipo, cantidad=0):
+        """Pasar una acción al perfil del jugador y al historial y la traza, si se están grabando"""
+        if tipo in ACCIONES_OBSERVADAS:
+            # Se anota ya pagada pero antes de cambiar la apuesta vigente
+            jugador = self.jugadores[i]
+            jugador.perfil.observar(tipo, self.estado == EstadoJuego.PREFLOP,
+                                    self.apuesta_minima > jugador.apuesta_actual - cantidad)
+        if self.historial is not None:
+            self.historial.accion(i, tipo, self.estado.value, cantidad)
+        if self.acciones is not None:
+            self.acciones[i, tipo] += 1
+        if self.inicio_traza is not None:
+            traza.instante(tipo, "accion", self.fila_traza, mano=self.numero_mano, asiento=i,
+                           cantidad=cantidad)
+
+    def _abrir_calle(self, primero):
+        """Preparar los turnos de una calle: deben actuar todos los que pueden"""
+        self.pendientes = self.pueden_actuar
+        self.ya_actuaron.clear()
+        if self.pueden_actuar == 1:
+            # Los demás están all-in: el último solo actúa si le falta igualar
+            solo = self.jugadores[primero]
+            if solo.apuesta_actual >= self.apuesta_minima:
+                self.pendientes = 0
+        if primero is not None:
+            self.jugador_actual_index = primero
+        self.ronda_terminada = self.pendientes == 0 or self.en_mano <= 1
+
+    def _accion_realizada(self, i, reabre=False):
+        """Actualizar los pendientes tras actuar el jugador i y pasar el turno"""
+        self.ya_actuaron.add(i)
+        if reabre:
+            # Tras una subida (aunque sea un all-in corto) deben volver a actuar todos los demás que pueden
+            self.pendientes = self.pueden_actuar - (1 if self.en_anillo[i] else 0)
+        else:
+            self.pendientes -= 1
+        if self.pendientes <= 0 or self.en_mano <= 1:
+            self.pendientes = 0
+            self.ronda_terminada = True
+        else:
+            self.jugador_actual_index = self.siguiente[i]
+
+    def verificar_fin_ronda(self):
+        return self.ronda_terminada
+
+    def cantidad_para_igualar(self, jugador=None):
+        jugador = jugador or self.jugadores[self.jugador_actual_index]
+        return max(0, min(self.apuesta_minima - jugador.apuesta_actual, jugador.fichas))
+
+    def minimo_para_subir(self):
+        """Apuesta total mínima de una subida completa"""
+        return self.apuesta_minima + self.subida_minima
+
+    def acciones_validas(self):
+        """Acciones permitidas al jugador actual (vacío si no le toca a nadie)"""
+        if self.ronda_terminada or self.estado in (EstadoJuego.SHOWDOWN, EstadoJuego.FINAL):
+            return ()
+        jugador = self.jugadores[self.jugador_actual_index]
+        acciones = ["fold", "check" if jugador.apuesta_actual >= self.apuesta_minima else "call"]
+        if self.jugador_actual_index in self.ya_actuaron:
+            # Apuesta no reabierta (all-in corto): el all-in solo vale si no pasa de igualar
+            if jugador.apuesta_actual + jugador.fichas <= self.apuesta_minima:
+                acciones.append("all_in")
+            return tuple(acciones)
+        acciones.append("all_in")
+        if jugador.apuesta_actual + jugador.fichas > self.minimo_para_subir():
+            acciones.append("raise")
+        return tuple(acciones)
+
+    def _jugador_en_turno(self, accion):
+        if accion not in self.acciones_validas():
+            raise ValueError(f"Acción no válida ahora: {accion}")
+        return self.jugador_actual_index, self.jugadores[self.jugador_actual_index]
+
+    # ---------- Acciones ----------
+    def retirarse(self):
+        i, jugador = self._jugador_en_turno("fold")
+        jugador.en_juego = False
+        self.en_mano -= 1
+        self._quitar_del_anillo(i)
+        self._anotar(i, "fold")
+        self.efecto(20, "brillo_oro")
+        self._accion_realizada(i)
+
+    def pasar(self):
+        i, jugador = self._jugador_en_turno("check")
+        self._anotar(i, "check")
+        self._accion_realizada(i)
+
+    def igualar(self):
+        """Igualar la apuesta vigente (pasar si no hay nada que igualar)"""
+        if self.cantidad_para_igualar() == 0:
+            return self.pasar()
+        i, jugador = self._jugador_en_turno("call")
+        self._anotar(i, "call", self._pagar(jugador, self.apuesta_minima - jugador.apuesta_actual))
+        self.efecto(25, "oro")
+        self._accion_realizada(i)
+
+    def subir(self, total=None):
+        """Subir hasta una apuesta total; por defecto el doble de la vigente (o la subida mínima)"""
+        jugador = self.jugadores[self.jugador_actual_index]
+        if total is None:
+            total = max(self.minimo_para_subir(), 2 * self.apuesta_minima)
+        if total >= jugador.apuesta_actual + jugador.fichas:
+            return self.all_in()
+        i, jugador = self._jugador_en_turno("raise")
+        if total < self.minimo_para_subir():
+            raise ValueError(f"La subida mínima es hasta {self.minimo_para_subir()}")
+        self._anotar(i, "raise", self._pagar(jugador, total - jugador.apuesta_actual))
+        self._apuesta_subida(i, jugador)
+        self.efecto(35, "oro")
+
+    def all_in(self):
+        i, jugador = self._jugador_en_turno("all_in")
+        self._anotar(i, "all_in", self._pagar(jugador, jugador.fichas))
+        if jugador.apuesta_actual > self.apuesta_minima:
+            self._apuesta_subida(i, jugador)
+        else:
+            # All-in por debajo de la apuesta vigente: no la cambia
+            self._accion_realizada(i)
+        self.efecto(35, "oro")
+
+    def _apuesta_subida(self, i, jugador):
+        """Nueva apuesta vigente: los demás vuelven a actuar"""
+        subida = jugador.apuesta_actual - self.apuesta_minima
+        # Un all-in corto no cambia la subida mínima ni reabre la apuesta a quien ya actuó
+        if subida >= self.subida_minima:
+            self.subida_minima = subida
+            self.ya_actuaron.clear()
+        self.apuesta_minima = jugador.apuesta_actual
+        self.ultimo_agresor = i
+        self._accion_realizada(i, reabre=True)
+
+    def aplicar_decision(self, jugador, decision, cantidad):
+        """Aplicar una decisión de la IA: fold, call o raise de 'cantidad' fichas más"""
+        validas = self.acciones_validas()
+        if decision == "fold":
+            self.retirarse()
+        elif decision == "raise" and cantidad >= jugador.fichas and "all_in" in validas:
+            self.all_in()
+        elif decision == "raise" and "raise" in validas and jugador.apuesta_actual + cantidad > self.apuesta_minima:
+            self.subir(max(jugador.apuesta_actual + cantidad, self.minimo_para_subir()))
+        else:
+            self.igualar()
+
+    def contexto_decision(self, jugador):
+        """Argumentos de la decisión de la IA: (requerida, bote, tablero, ronda, referencia, en mano, posición)"""
+        # La referencia de la subida nunca baja de la subida mínima (post-flop la apuesta vigente es 0)
+        return (self.cantidad_para_igualar(jugador), self.bote, self.cartas_comunitarias, self.estado,
+                max(self.apuesta_minima, self.subida_minima), self.en_mano, self.posicion(jugador))
+
+    def posicion(self, jugador):
+        """Cubo de posición de 'jugador' según cuántos de la mano actúan antes que él post-flop"""
+        n = len(self.jugadores)
+        i = self.jugadores.index(jugador)
+        # Post-flop empieza el primero tras el botón y el botón actúa el último
+        distancia = (i - self.dealer_index - 1) % n
+        orden = sum(1 for k, j in enumerate(self.jugadores)
+                    if j.en_juego and j is not jugador and (k - self.dealer_index - 1) % n < distancia)
+        return cubo_posicion(orden, self.en_mano)
+
+    def perfiles_rivales(self, jugador):
+        """Perfiles de los rivales de 'jugador' que siguen en la mano"""
+        return [j.perfil for j in self.jugadores if j.en_juego and j is not jugador]
+
+    def turno_ia(self):
+        """Resolver en el acto la decisión del jugador IA actual"""
+        if self.ronda_terminada:
+            return
+        current = self.jugadores[self.jugador_actual_index]
+        trazando = self.inicio_traza is not None
+        inicio = traza.ahora() if trazando else 0.0
+        decision, cantidad = current.tomar_decision_ia(*self.contexto_decision(current),
+                                                       rng=self.rng, rng_equidad=self.rng_equidad,
+                                                       rivales=self.perfiles_rivales(current))
+        if trazando:
+            traza.completo("decision IA", inicio, traza.ahora() - inicio, "ia", self.fila_traza,
+                           jugador=current.nombre,
+                           decision=decision, cantidad=cantidad, simulaciones=current.simulaciones_ia)
+        self.aplicar_decision(current, decision, cantidad)
+
+    def mano_decidida(self):
+        """¿Queda un solo jugador en la mano?"""
+        return self.en_mano <= 1
+
+    # ---------- Calles y showdown ----------
+    def siguiente_estado(self):
+        """Cerrar la calle actual y repartir la siguiente"""
+        if self.hubo_all_in:
+            self.botes = self.calcular_botes()
+
+        if self.estado == EstadoJuego.PREFLOP:
+            self.estado = EstadoJuego.FLOP
+        elif self.estado == EstadoJuego.FLOP:
+            self.estado = EstadoJuego.TURN
+        elif self.estado == EstadoJuego.TURN:
+            self.estado = EstadoJuego.RIVER
+        elif self.estado == EstadoJuego.RIVER:
+            self.estado = EstadoJuego.SHOWDOWN
+            self.determinar_ganador()
+            return
+        if self.inicio_traza is not None:
+            traza.instante(f"calle {self.estado.name.lower()}", fila=self.fila_traza,
+                           mano=self.numero_mano, bote=self.bote)
+        self.repartir_cartas_comunitarias()
+        self.efecto(60, "oro")
+        
+        vio_flop = self.estado == EstadoJuego.FLOP
+        for j in self.jugadores:
+            j.reset_apuesta()
+            if vio_flop and j.en_juego:
+                j.perfil.vio_flop()
+        self.apuesta_minima = 0
+        self.subida_minima = self.ciega_grande
+        self.ultimo_agresor = None
+        
+        # Post-flop empieza el primero que puede actuar después del botón
+        self._abrir_calle(self._primero_tras(self.dealer_index))
+
+    def calcular_botes(self):
+        """Bote principal y laterales [(cantidad, elegibles)] según lo aportado por cada jugador"""
+        niveles = sorted({j.aporte for j in self.jugadores if j.en_juego and j.aporte > 0})
+        botes = []
+        anterior = 0
+        for nivel in niveles:
+            cantidad = sum(min(j.aporte, nivel) - min(j.aporte, anterior) for j in self.jugadores)
+            elegibles = [j for j in self.jugadores if j.en_juego and j.aporte >= nivel]
+            botes.append((cantidad, elegibles))
+            anterior = nivel
+        # Lo que pusieron los retirados por encima del último nivel va al último bote
+        sobrante = sum(max(0, j.aporte - anterior) for j in self.jugadores)
+        if sobrante and botes:
+            botes[-1] = (botes[-1][0] + sobrante, botes[-1][1])
+        return botes
+
+    def determinar_ganador(self):
+        jugadores_activos = [j for j in self.jugadores if j.en_juego]
+        if len(jugadores_activos) == 1:
+            self.ganador = jugadores_activos[0]
+            self.ganadores = [self.ganador]
+            self.ganador.fichas += self.bote
+            self.premios = [(self.jugadores.index(self.ganador), self.bote)]
+            self.efecto(150, "oro")
+            self.efecto(50, "diamante")
+            self._terminar_historial()
+            self._terminar_traza()
+            self.registrar_resultado()
+            
+            self.bote = 0
+            self.botes = []
+            self.estado = EstadoJuego.FINAL
+            return
+            
+        # Evaluar las manos de todos los jugadores que llegan al showdown
+        if jugadores_activos:
+            inicio = traza.ahora() if self.inicio_traza is not None else 0.0
+            for j in jugadores_activos:
+                j.mano_final = evaluar_incremental(j.producto * self.producto_tablero,
+                                                   j.mascara | self.mascara_tablero)
+                j.ranking_mano = categoria(j.mano_final)
+                j.perfil.showdown()
+
+            # Cada bote se reparte entre sus elegibles con la mejor mano (el resto va al primero)
+            self.ganadores = []
+            ganado = {}
+            for cantidad, elegibles in self.calcular_botes():
+                mejor = max(j.mano_final for j in elegibles)
+                ganadores = [j for j in elegibles if j.mano_final == mejor]
+                parte, resto = divmod(cantidad, len(ganadores))
+                for k, j in enumerate(ganadores):
+                    premio = parte + (resto if k == 0 else 0)
+                    j.fichas += premio
+                    ganado[j] = ganado.get(j, 0) + premio
+                    if j not in self.ganadores:
+                        self.ganadores.append(j)
+            self.premios = [(self.jugadores.index(j), cantidad) for j, cantidad in ganado.items()]
+            # El ganador que se anuncia es el del bote principal
+            self.ganador = self.ganadores[0]
+            if self.inicio_traza is not None:
+                traza.completo("showdown", inicio, traza.ahora() - inicio, fila=self.fila_traza,
+                               mano=self.numero_mano, jugadores=len(jugadores_activos), premios=self.premios)
+            self.efecto(200, "oro")
+            self.efecto(80, "diamante")
+            self._terminar_historial()
+            self._terminar_traza()
+            self.registrar_resultado()
+
+        self.bote = 0
+        self.botes = []
+        self.estado = EstadoJuego.FINAL
+
+    def _terminar_historial(self):
+        if self.historial is not None:
+            self.historial.terminar_mano(self, self.premios)
+
+    def _terminar_traza(self):
+        """La mano entera como un tramo de la traza"""
+        if self.inicio_traza is not None:
+            traza.completo(f"mano {self.numero_mano}", self.inicio_traza, traza.ahora() - self.inicio_traza,
+                           fila=self.fila_traza, premios=self.premios)
+
+    def avanzar_ronda(self):
+        """Si la ronda de apuestas terminó, repartir la siguiente calle (O(1) si no)"""
+        if not self.ronda_terminada or self.estado in (EstadoJuego.SHOWDOWN, EstadoJuego.FINAL):
+            return
+        if self.mano_decidida():
+            # Todos los demás se retiraron: el bote se entrega sin más calles
+            self.estado = EstadoJuego.SHOWDOWN
+            self.determinar_ganador()
+            return
+        self.siguiente_estado()
+
+    def jugar_mano(self, max_acciones=500):
+        """Jugar una mano completa sin interfaz; todos los asientos deben ser IA"""
+        if not self.iniciar_nueva_mano():
+            return False
+        for _ in range(max_acciones):
+            if self.estado == EstadoJuego.FINAL:
+                return True
+            if not self.ronda_terminada and self.jugadores[self.jugador_actual_index].es_ia:
+                self.turno_ia()
+            self.avanzar_ronda()
+        return self.estado == EstadoJuego.FINAL
+
+
+    # ---------- Ganchos para la interfaz ----------
+    def efecto(self, cantidad, tipo="oro"):
+        """Efecto visual al repartir o apostar (sin interfaz no hace nada)"""
+        pass
+
+    def registrar_resultado(self):
+        """Llamado tras repartir el bote a self.ganadores"""
+        pass
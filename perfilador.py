@@ -0,0 +1,135 @@
+"""
+Perfilador de frames del bucle principal, sin pygame.
+
+Cada frame se divide en etapas con marca(nombre): el tiempo desde la marca
+anterior se suma a esa etapa, así que medir una etapa cuesta una llamada a
+perf_counter. Desactivado, marca() solo comprueba un atributo.
+
+Guarda los últimos frames para las estadísticas en vivo (FPS, histograma de
+tiempos de frame y etapa más lenta) y todos los frames desde que se activó
+para exportarlos a CSV o JSON.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+
+# Frames que se usan para las estadísticas en vivo
+VENTANA_FRAMES = 120
+# Frames guardados para exportar (unos 30 minutos a 60 FPS)
+MAX_FRAMES = 100000
+# Límites superiores (ms) de los cubos del histograma; el último recoge el resto
+CUBOS_MS = (4, 8, 12, 16.7, 20, 25, 33.3, 50)
+
+# Etapas que no son trabajo del frame (reloj esperando al siguiente frame)
+ETAPAS_ESPERA = ("espera",)
+
+
+class PerfiladorFrames:
+    """Tiempos por etapa de cada frame"""
+
+    def __init__(self, activo=False, ventana=VENTANA_FRAMES, max_frames=MAX_FRAMES):
+        self.activo = activo
+        self.max_frames = max_frames
+        self.etapas = []  # Orden de aparición, para las columnas del CSV
+        self.frames = []  # (inicio, total, {etapa: segundos})
+        self.recientes = deque(maxlen=ventana)
+        self.actual = None
+        self.inicio = 0.0
+        self.ultimo = 0.0
+        self.origen = time.perf_counter()
+
+    def alternar(self):
+        """Activar o desactivar; devuelve el nuevo estado"""
+        self.activo = not self.activo
+        self.actual = None
+        return self.activo
+
+    # ---------- Medición ----------
+    def empezar_frame(self):
+        """Cerrar el frame anterior y empezar uno nuevo"""
+        if not self.activo:
+            return
+        ahora = time.perf_counter()
+        if self.actual is not None:
+            self._cerrar(ahora)
+        self.actual = {}
+        self.inicio = self.ultimo = ahora
+
+    def marca(self, etapa):
+        """Sumar a 'etapa' el tiempo desde la marca anterior"""
+        if self.actual is None:
+            return
+        ahora = time.perf_counter()
+        actual = self.actual
+        if etapa not in actual:
+            actual[etapa] = 0.0
+            if etapa not in self.etapas:
+                self.etapas.append(etapa)
+        actual[etapa] += ahora - self.ultimo
+        self.ultimo = ahora
+
+    def _cerrar(self, ahora):
+        frame = (self.inicio - self.origen, ahora - self.inicio, self.actual)
+        self.recientes.append(frame)
+        if len(self.frames) < self.max_frames:
+            self.frames.append(frame)
+
+    # ---------- Estadísticas en vivo ----------
+    def fps(self):
+        total = sum(f[1] for f in self.recientes)
+        return len(self.recientes) / total if total > 0 else 0.0
+
+    def tiempos_ms(self):
+        """Duración de los frames recientes en ms"""
+        return [f[1] * 1000 for f in self.recientes]
+
+    def histograma(self, cubos=CUBOS_MS):
+        """Frames recientes por cubo de duración (uno más para los que superan el último)"""
+        cuentas = [0] * (len(cubos) + 1)
+        for ms in self.tiempos_ms():
+            k = 0
+            while k < len(cubos) and ms > cubos[k]:
+                k += 1
+            cuentas[k] += 1
+        return cuentas
+
+    def medias_ms(self):
+        """Media por frame (ms) de cada etapa en los frames recientes"""
+        n = len(self.recientes)
+        if not n:
+            return {}
+        sumas = {}
+        for _, _, etapas in self.recientes:
+            for etapa, segundos in etapas.items():
+                sumas[etapa] = sumas.get(etapa, 0.0) + segundos
+        return {etapa: s * 1000 / n for etapa, s in sumas.items()}
+
+    def etapa_mas_lenta(self):
+        """(etapa, ms de media) con más trabajo en los frames recientes, o None"""
+        medias = [(ms, etapa) for etapa, ms in self.medias_ms().items() if etapa not in ETAPAS_ESPERA]
+        if not medias:
+            return None
+        ms, etapa = max(medias)
+        return etapa, ms
+
+    # ---------- Exportación ----------
+    def exportar(self, ruta):
+        """Escribir los frames a CSV o JSON según la extensión; devuelve los frames escritos"""
+        if ruta.endswith(".json"):
+            with open(ruta, "w") as f:
+                json.dump({
+                    "etapas": self.etapas,
+                    "frames": [{"inicio_s": inicio, "total_ms": total * 1000,
+                                "etapas_ms": {e: s * 1000 for e, s in etapas.items()}}
+                               for inicio, total, etapas in self.frames],
+                }, f)
+        else:
+            with open(ruta, "w", newline="") as f:
+                escritor = csv.writer(f)
+                escritor.writerow(["frame", "inicio_s", "total_ms"] + [f"{e}_ms" for e in self.etapas])
+                for k, (inicio, total, etapas) in enumerate(self.frames):
+                    escritor.writerow([k, f"{inicio:.6f}", f"{total * 1000:.4f}"] +
+                                      [f"{etapas.get(e, 0.0) * 1000:.4f}" for e in self.etapas])
+        return len(self.frames)
@@ -0,0 +1,340 @@
+"""
+Equidad entre rangos de manos con caché por tablero.
+
+Un rango es una lista de combinaciones de dos códigos de carta; también se
+acepta una mano concreta o la notación habitual ("QQ+, AKs, KTo+, AhKd, *").
+CalculadoraEquidad reparte el bote entre una mano o rango del jugador y uno o
+más rangos rivales sobre un tablero parcial: enumera todos los repartos
+cuando son pocos (equidad exacta) y si no estima por Monte Carlo con las
+mismas tablas vectorizadas de equidad.py. Los resultados se guardan en una
+caché LRU con el tablero y los rangos en forma canónica (ordenados y sin
+repetidos), así que las consultas repetidas de un análisis no se recalculan.
+La IA de la mesa todavía no lo usa: decide con la equidad contra manos al
+azar de ia.fuerza_mano.
+
+Ejecutar: python rangos.py AKs "QQ+,AKo" [más rangos...] --tablero Ah7d2c
+"""
+
+import argparse
+import time
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from itertools import combinations
+from math import comb, prod
+
+import numpy as np
+
+from cartas import MAZO, codigo_carta, mascara, texto_carta
+from equidad import MAZO_COMPLETO, evaluar_lote
+
+# Filas (repartos x tableros) a partir de las cuales se estima en vez de enumerar
+LIMITE_EXACTO = 200000
+SIMULACIONES_RANGOS = 20000
+CAPACIDAD_CACHE = 4096
+
+RANGOS = "23456789TJQKA"
+PALOS = "hdcs"  # Mismo orden que cartas.SUITS: ♥ ♦ ♣ ♠
+
+# margenes: semiancho del intervalo del 95 % de cada equidad (0 si es exacta)
+ResultadoRangos = namedtuple("ResultadoRangos", ["equidades", "exacta", "muestras", "margenes"])
+
+
+# ---------- Rangos ----------
+def parsear_cartas(texto):
+    """Códigos de carta de un texto como 'Ah7d2c'"""
+    texto = texto.replace(" ", "")
+    if len(texto) % 2:
+        raise ValueError(f"Cartas no válidas: {texto!r}")
+    codigos = []
+    for i in range(0, len(texto), 2):
+        valor, palo = texto[i].upper(), texto[i + 1].lower()
+        if valor not in RANGOS or palo not in PALOS:
+            raise ValueError(f"Carta no válida: {texto[i:i + 2]!r}")
+        codigos.append(codigo_carta(PALOS.index(palo), RANGOS.index(valor) + 2))
+    return codigos
+
+
+def _combos(alto, bajo, tipo):
+    """Combinaciones de dos valores: 's' mismo palo, 'o' palos distintos, '' ambas"""
+    resultado = []
+    for p1 in range(4):
+        for p2 in range(4):
+            if alto == bajo and p2 <= p1:
+                continue
+            if (tipo == "s" and p1 != p2) or (tipo == "o" and p1 == p2):
+                continue
+            resultado.append((codigo_carta(p1, alto), codigo_carta(p2, bajo)))
+    return resultado
+
+
+@lru_cache(maxsize=256)
+def parsear_rango(texto):
+    """Combinaciones ordenadas de un rango en notación de texto"""
+    combos = []
+    for parte in texto.replace(" ", "").split(","):
+        if not parte:
+            continue
+        if parte in ("*", "aleatorio"):
+            combos.extend(combinations(MAZO, 2))
+            continue
+        if len(parte) == 4 and parte[1].lower() in PALOS and parte[3].lower() in PALOS:
+            combos.append(tuple(parsear_cartas(parte)))
+            continue
+
+        mas = parte.endswith("+")
+        cuerpo = parte.rstrip("+")
+        tipo = cuerpo[2:].lower()
+        if len(cuerpo) not in (2, 3) or tipo not in ("", "s", "o") \
+                or cuerpo[0].upper() not in RANGOS or cuerpo[1].upper() not in RANGOS:
+            raise ValueError(f"Rango no válido: {parte!r}")
+        alto, bajo = RANGOS.index(cuerpo[0].upper()) + 2, RANGOS.index(cuerpo[1].upper()) + 2
+        if alto < bajo:
+            alto, bajo = bajo, alto
+        if alto == bajo:
+            # Parejas: 'QQ+' son de QQ a AA
+            for v in range(alto, 15 if mas else alto + 1):
+                combos.extend(_combos(v, v, tipo))
+        else:
+            # 'KTo+' sube la segunda carta hasta justo debajo de la primera
+            for v in range(bajo, alto if mas else bajo + 1):
+                combos.extend(_combos(alto, v, tipo))
+    return normalizar_rango(combos)
+
+
+def normalizar_rango(rango):
+    """Forma canónica de un rango: tupla ordenada de pares (menor, mayor) sin repetir"""
+    if isinstance(rango, str):
+        return parsear_rango(rango)
+    rango = list(rango)
+    if len(rango) == 2 and all(_es_carta(c) for c in rango):
+        rango = [rango]  # Una mano concreta
+    return tuple(sorted({(min(int(a), int(b)), max(int(a), int(b))) for a, b in rango}))
+
+
+def _es_carta(valor):
+    return isinstance(valor, (int, np.integer))
+
+
+def _lista_rangos(villanos):
+    """
+    Rangos rivales como lista: un texto es un solo rango; si no, una lista de
+    rangos, cada uno un texto o una lista de pares de cartas. Una lista de
+    pares suelta no se sabe si es un rango o varios rivales: ValueError.
+    """
+    if isinstance(villanos, str):
+        return [villanos]
+    villanos = list(villanos)
+    for rango in villanos:
+        if isinstance(rango, str):
+            continue
+        if _es_carta(rango) or any(_es_carta(c) for c in rango):
+            raise ValueError("Los rivales deben ser una lista de rangos: un rango de pares "
+                             "va dentro de otra lista, p. ej. [[(a, b), (c, d)]]")
+    return villanos
+
+
+# ---------- Cálculo ----------
+def _repartir(fuerzas):
+    """Parte del bote de cada jugador en cada fila (empates repartidos)"""
+    mejor = fuerzas.max(axis=1, keepdims=True)
+    ganadores = fuerzas == mejor
+    return ganadores / ganadores.sum(axis=1, keepdims=True)
+
+
+def _fuerzas(huecos, tablero, resto):
+    """Fuerza (filas, jugadores) con huecos (filas, jugadores, 2) y el tablero completado con resto"""
+    filas, jugadores = huecos.shape[:2]
+    codigos = np.empty((filas, jugadores, 7), dtype=np.int64)
+    codigos[:, :, :2] = huecos
+    codigos[:, :, 2:2 + len(tablero)] = tablero
+    codigos[:, :, 2 + len(tablero):] = resto[:, None, :]
+    return evaluar_lote(codigos.reshape(filas * jugadores, 7)).reshape(filas, jugadores)
+
+
+def _sin_choques(mascaras):
+    """Filas de (filas, jugadores) máscaras en las que nadie comparte cartas, y su unión"""
+    union = np.zeros(len(mascaras), dtype=np.int64)
+    valida = np.ones(len(mascaras), dtype=bool)
+    for p in range(mascaras.shape[1]):
+        valida &= (union & mascaras[:, p]) == 0
+        union |= mascaras[:, p]
+    return valida, union
+
+
+def _exacta(rangos, mascaras, tablero, restantes, faltan):
+    """Equidad enumerando todos los repartos sin choques y todos los tableros"""
+    indices = np.stack(np.meshgrid(*[np.arange(len(r)) for r in rangos], indexing="ij"), axis=-1)
+    indices = indices.reshape(-1, len(rangos))
+    mascara_asientos = np.stack([mascaras[p][indices[:, p]] for p in range(len(rangos))], axis=1)
+    valida, union = _sin_choques(mascara_asientos)
+    indices, union = indices[valida], union[valida]
+
+    tableros = list(combinations(restantes, faltan))
+    resto = np.array(tableros, dtype=np.int64).reshape(len(tableros), faltan)
+    mascara_resto = np.bitwise_or.reduce(np.left_shift(1, resto), axis=1)
+    reparto, completado = np.nonzero((union[:, None] & mascara_resto[None, :]) == 0)
+    if len(reparto) == 0:
+        raise ValueError("Los rangos no dejan ningún reparto posible")
+
+    huecos = np.stack([rangos[p][indices[reparto, p]] for p in range(len(rangos))], axis=1)
+    partes = _repartir(_fuerzas(huecos, tablero, resto[completado]))
+    return partes.mean(axis=0), len(reparto)
+
+
+def _monte_carlo(rangos, mascaras, tablero, faltan, simulaciones, lote, rng):
+    """Equidad estimada y su margen del 95 % con repartos aleatorios (se descartan los que comparten cartas)"""
+    jugadores = len(rangos)
+    suma = np.zeros(jugadores)
+    suma_cuadrados = np.zeros(jugadores)
+    total = 0
+    intentos = 0
+    while total < simulaciones:
+        elegidos = [rng.integers(len(r), size=lote) for r in rangos]
+        valida, union = _sin_choques(np.stack([mascaras[p][elegidos[p]] for p in range(jugadores)], axis=1))
+        intentos += lote
+        if not valida.any():
+            if intentos >= 50 * lote:
+                raise ValueError("Los rangos no dejan ningún reparto posible")
+            continue
+        huecos = np.stack([rangos[p][elegidos[p][valida]] for p in range(jugadores)], axis=1)
+        n = len(huecos)
+
+        # Tablero: las 'faltan' claves más pequeñas entre las cartas que nadie tiene
+        claves = rng.random((n, len(MAZO_COMPLETO)))
+        claves[((union[valida, None] >> MAZO_COMPLETO[None, :]) & 1) == 1] = 2.0
+        claves[:, ((mascara(tablero) >> MAZO_COMPLETO) & 1) == 1] = 2.0
+        if faltan:
+            resto = MAZO_COMPLETO[np.argpartition(claves, faltan - 1, axis=1)[:, :faltan]]
+        else:
+            resto = np.empty((n, 0), dtype=np.int64)
+
+        partes = _repartir(_fuerzas(huecos, tablero, resto))
+        suma += partes.sum(axis=0)
+        suma_cuadrados += (partes ** 2).sum(axis=0)
+        total += n
+    media = suma / total
+    varianza = np.maximum(suma_cuadrados / total - media ** 2, 0.0)
+    return media, total, 1.96 * np.sqrt(varianza / total)
+
+
+class CalculadoraEquidad:
+    """Equidad entre rangos, exacta o Monte Carlo, con caché LRU por tablero y rangos canónicos"""
+
+    def __init__(self, capacidad=CAPACIDAD_CACHE, limite_exacto=LIMITE_EXACTO,
+                 simulaciones=SIMULACIONES_RANGOS, lote=2000, rng=None):
+        self.capacidad = capacidad
+        self.limite_exacto = limite_exacto
+        self.simulaciones = simulaciones
+        self.lote = lote
+        self.rng = rng or np.random.default_rng()
+        self.resultados = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def equidad(self, heroe, villanos, tablero=()):
+        """
+        ResultadoRangos con la equidad del jugador y de cada rival, en ese orden.
+
+        heroe es una mano o un rango, villanos un rango en texto o una lista
+        de rangos (ver _lista_rangos) y tablero una lista de 0 a 5 códigos de
+        carta.
+        """
+        tablero = tuple(sorted(int(c) for c in tablero))
+        rivales = [normalizar_rango(v) for v in _lista_rangos(villanos)]
+        if not rivales:
+            raise ValueError("Hace falta al menos un rango rival")
+        # El orden de los rivales no cambia el cálculo: se ordenan para la clave
+        orden = sorted(range(len(rivales)), key=rivales.__getitem__)
+        clave = (tablero, normalizar_rango(heroe)) + tuple(rivales[i] for i in orden)
+
+        resultado = self.resultados.get(clave)
+        if resultado is not None:
+            self.resultados.move_to_end(clave)
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+            resultado = self.resultados[clave] = self._calcular(clave[1:], tablero)
+            if len(self.resultados) > self.capacidad:
+                self.resultados.popitem(last=False)
+
+        equidades = [resultado.equidades[0]] + [0.0] * len(rivales)
+        margenes = [resultado.margenes[0]] + [0.0] * len(rivales)
+        for posicion, i in enumerate(orden):
+            equidades[1 + i] = resultado.equidades[1 + posicion]
+            margenes[1 + i] = resultado.margenes[1 + posicion]
+        return resultado._replace(equidades=tuple(equidades), margenes=tuple(margenes))
+
+    def _calcular(self, rangos, tablero):
+        if len(tablero) > 5:
+            raise ValueError("El tablero tiene más de 5 cartas")
+        mascara_tablero = mascara(tablero)
+        # Fuera las combinaciones que usan cartas del tablero
+        rangos = [np.array([c for c in r if not (mascara_tablero >> c[0]) & 1 and not (mascara_tablero >> c[1]) & 1],
+                           dtype=np.int64).reshape(-1, 2) for r in rangos]
+        if any(len(r) == 0 for r in rangos):
+            raise ValueError("Un rango no tiene combinaciones compatibles con el tablero")
+        mascaras = [np.left_shift(1, r[:, 0]) | np.left_shift(1, r[:, 1]) for r in rangos]
+
+        faltan = 5 - len(tablero)
+        restantes = [c for c in MAZO if not (mascara_tablero >> c) & 1]
+        if 2 * len(rangos) + faltan > len(restantes):
+            raise ValueError("No quedan cartas suficientes para tantos jugadores")
+        tablero = np.array(tablero, dtype=np.int64)
+        if prod(len(r) for r in rangos) * comb(len(restantes), faltan) <= self.limite_exacto:
+            equidades, muestras = _exacta(rangos, mascaras, tablero, restantes, faltan)
+            margenes = np.zeros(len(rangos))
+            exacta = True
+        else:
+            equidades, muestras, margenes = _monte_carlo(rangos, mascaras, tablero, faltan,
+                                                         self.simulaciones, self.lote, self.rng)
+            exacta = False
+        return ResultadoRangos(tuple(float(e) for e in equidades), exacta, muestras,
+                               tuple(float(m) for m in margenes))
+
+    def vaciar(self):
+        self.resultados.clear()
+
+    def resumen(self):
+        total = self.aciertos + self.fallos
+        porcentaje = 100.0 * self.aciertos / total if total else 0.0
+        return f"Caché de equidades: {self.aciertos:,} aciertos, {self.fallos:,} fallos ({porcentaje:.1f}% aciertos)"
+
+
+# Calculadora compartida del proceso
+calculadora = CalculadoraEquidad()
+
+def equidad_rangos(heroe, villanos, tablero=()):
+    """Equidad del jugador y de cada rival con la calculadora compartida"""
+    return calculadora.equidad(heroe, villanos, tablero)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equidad entre rangos de manos")
+    parser.add_argument("heroe", help="mano o rango del jugador (p. ej. AhKh o 'QQ+,AKs')")
+    parser.add_argument("villanos", nargs="+", help="rango de cada rival")
+    parser.add_argument("--tablero", default="", help="cartas comunitarias (p. ej. Ah7d2c)")
+    parser.add_argument("--simulaciones", type=int, default=SIMULACIONES_RANGOS, help="simulaciones si no se enumera")
+    parser.add_argument("--semilla", type=int, default=None, help="semilla del generador aleatorio")
+    args = parser.parse_args()
+
+    def rango(texto):
+        # Una mano concreta ('AhKh') es un rango de una sola combinación
+        if len(texto) == 4 and texto[1].lower() in PALOS and texto[3].lower() in PALOS:
+            return [tuple(parsear_cartas(texto))]
+        return texto
+
+    tablero = parsear_cartas(args.tablero)
+    calc = CalculadoraEquidad(simulaciones=args.simulaciones, rng=np.random.default_rng(args.semilla))
+    inicio = time.perf_counter()
+    resultado = calc.equidad(rango(args.heroe), [rango(v) for v in args.villanos], tablero)
+    ms = (time.perf_counter() - inicio) * 1000
+
+    print(f"Tablero: {' '.join(texto_carta(c) for c in tablero) or '-'}")
+    for nombre, equidad, margen in zip([args.heroe] + args.villanos, resultado.equidades, resultado.margenes):
+        print(f"  {nombre:<24} {equidad * 100:6.2f}%" + (f" ± {margen * 100:.2f}" if margen else ""))
+    metodo = "exacta" if resultado.exacta else "Monte Carlo"
+    print(f"{metodo}, {resultado.muestras:,} repartos, {ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Repetición determinista de manos grabadas en un historial (ver historial.py).
+
+Cada mano se vuelve a jugar en PokerGame sin interfaz: el mazo se ordena para
+que salgan las mismas cartas, el botón y las fichas iniciales son los
+grabados y las acciones se aplican con los métodos de apuesta del motor. Al
+terminar se comprueba que las fichas de cada asiento y los premios coinciden
+con lo grabado. Sirve de prueba de regresión para cualquier cambio en las
+apuestas o el showdown.
+
+Los registros se reparten por lotes entre procesos.
+
+Ejecutar: python repeticion.py historial_manos.bin [--procesos 4]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cartas import MAZO
+from historial import decodificar_mano, leer_registros
+from motor import EstadoJuego, Jugador, PokerGame
+
+# Manos por tarea enviada a cada proceso
+LOTE_REPETICION = 2000
+
+# Ejemplos de discrepancia que se devuelven como máximo por lote
+MAX_DISCREPANCIAS = 20
+
+
+class ManoRepetida(PokerGame):
+    """PokerGame que reparte las cartas grabadas en lugar de barajar"""
+
+    def __init__(self, mano):
+        jugadores = [Jugador(a.nombre, es_ia=True, fichas=a.fichas_inicio) for a in mano.asientos]
+        super().__init__(jugadores=jugadores)
+        self.grabada = mano
+        self.ciega_grande = mano.ciega_grande
+        self.numero_mano = mano.numero - 1
+        # El botón avanza al primer asiento con fichas después de dealer_index
+        self.dealer_index = mano.boton - 1
+
+    def barajar(self):
+        # Orden de salida: dos vueltas de cartas propias y el tablero con sus quemadas
+        asientos = self.grabada.asientos
+        orden = [a.cartas[k] for k in range(2) for a in asientos if len(a.cartas) > k]
+        for k, carta in enumerate(self.grabada.tablero):
+            if k in (0, 3, 4):
+                orden.append(None)  # Carta quemada: cualquiera de las que no salen
+            orden.append(carta)
+
+        usadas = {c for c in orden if c is not None}
+        libres = [c for c in MAZO if c not in usadas]
+        orden = [c if c is not None else libres.pop() for c in orden]
+        # robar() saca del final de la lista
+        self.mazo = libres + orden[::-1]
+
+
+def repetir_mano(mano):
+    """Volver a jugar una mano grabada; devuelve None o el motivo de la discrepancia"""
+    juego = ManoRepetida(mano)
+    if not juego.iniciar_nueva_mano():
+        return "no se pudo iniciar la mano"
+    if juego.dealer_index != mano.boton:
+        return f"botón {juego.dealer_index}, grabado {mano.boton}"
+
+    for k, accion in enumerate(mano.acciones):
+        if accion.tipo in ("ciega_pequena", "ciega_grande"):
+            # Las ciegas las pone el motor; se comprueban con lo que aportó cada asiento
+            if juego.jugadores[accion.asiento].aporte < accion.cantidad:
+                return f"acción {k}: ciega de {accion.cantidad} no puesta por el asiento {accion.asiento}"
+            continue
+
+        while juego.ronda_terminada and juego.estado != EstadoJuego.FINAL:
+            juego.avanzar_ronda()
+        if juego.estado == EstadoJuego.FINAL:
+            return f"acción {k}: la mano ya había terminado"
+        if juego.estado.value != accion.calle:
+            return f"acción {k}: calle {juego.estado.value}, grabada {accion.calle}"
+        if juego.jugador_actual_index != accion.asiento:
+            return f"acción {k}: turno del asiento {juego.jugador_actual_index}, grabado {accion.asiento}"
+
+        jugador = juego.jugadores[accion.asiento]
+        antes = jugador.aporte
+        try:
+            if accion.tipo == "fold":
+                juego.retirarse()
+            elif accion.tipo == "check":
+                juego.pasar()
+            elif accion.tipo == "call":
+                juego.igualar()
+            elif accion.tipo == "raise":
+                juego.subir(jugador.apuesta_actual + accion.cantidad)
+            else:
+                juego.all_in()
+        except ValueError as e:
+            return f"acción {k} ({accion.tipo}): {e}"
+        if jugador.aporte - antes != accion.cantidad:
+            return f"acción {k} ({accion.tipo}): puso {jugador.aporte - antes}, grabado {accion.cantidad}"
+
+    # Repartir lo que falte del tablero (all-in) y llegar al showdown
+    for _ in range(8):
+        if juego.estado == EstadoJuego.FINAL:
+            break
+        juego.avanzar_ronda()
+    if juego.estado != EstadoJuego.FINAL:
+        return "la mano no terminó con las acciones grabadas"
+
+    for k, (j, asiento) in enumerate(zip(juego.jugadores, mano.asientos)):
+        if j.fichas != asiento.fichas_fin:
+            return f"asiento {k}: {j.fichas} fichas, grabadas {asiento.fichas_fin}"
+    if sorted(juego.premios) != sorted(mano.ganadores):
+        return f"premios {sorted(juego.premios)}, grabados {sorted(mano.ganadores)}"
+    return None
+
+
+def repetir_lote(registros):
+    """Repetir un lote de registros; devuelve (manos, fallidas, [(número, motivo)])"""
+    fallidas = 0
+    ejemplos = []
+    for registro in registros:
+        mano = decodificar_mano(registro)
+        motivo = repetir_mano(mano)
+        if motivo is not None:
+            fallidas += 1
+            if len(ejemplos) < MAX_DISCREPANCIAS:
+                ejemplos.append((mano.numero, motivo))
+    return len(registros), fallidas, ejemplos
+
+
+def _lotes(ruta, tamano):
+    lote = []
+    for registro in leer_registros(ruta):
+        lote.append(registro)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def repetir_historial(ruta, procesos=None, lote=LOTE_REPETICION):
+    """Repetir todas las manos de un historial en paralelo"""
+    procesos = procesos or os.cpu_count() or 1
+    totales = [0, 0]
+    ejemplos = []
+
+    def acumular(resultado):
+        n, fallidas, e = resultado
+        totales[0] += n
+        totales[1] += fallidas
+        ejemplos.extend(e[:MAX_DISCREPANCIAS - len(ejemplos)])
+
+    inicio = time.perf_counter()
+    if procesos == 1:
+        for registros in _lotes(ruta, lote):
+            acumular(repetir_lote(registros))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            # Pocos lotes en vuelo a la vez para no cargar el archivo entero
+            pendientes = []
+            for registros in _lotes(ruta, lote):
+                pendientes.append(pool.submit(repetir_lote, registros))
+                if len(pendientes) >= 2 * procesos:
+                    acumular(pendientes.pop(0).result())
+            for futuro in pendientes:
+                acumular(futuro.result())
+    segundos = time.perf_counter() - inicio
+    manos = totales[0]
+    return {
+        "manos": manos,
+        "discrepancias": totales[1],
+        "ejemplos": ejemplos,
+        "segundos": segundos,
+        "manos_por_segundo": manos / segundos if segundos > 0 else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repetir y verificar las manos de un historial")
+    parser.add_argument("ruta", help="archivo de historial")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--lote", type=int, default=LOTE_REPETICION, help="manos por tarea")
+    args = parser.parse_args()
+
+    resultado = repetir_historial(args.ruta, args.procesos, args.lote)
+    print(f"Manos repetidas: {resultado['manos']:,} ({resultado['discrepancias']:,} discrepancias)")
+    print(f"Tiempo: {resultado['segundos']:.2f} s - {resultado['manos_por_segundo']:,.0f} manos/s")
+    for numero, motivo in resultado["ejemplos"]:
+        print(f"  mano {numero}: {motivo}")
+    sys.exit(1 if resultado["discrepancias"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,653 @@
+"""
+Servidor de mesas de poker con asyncio, sin pygame.
+
+Un solo proceso aloja muchas mesas a la vez. Cada mesa es una tarea que
+juega manos con PokerGame y Jugador del motor; los asientos de IA deciden en
+el servidor (en línea o en un pool de procesos) y los humanos y bots se
+conectan por TCP local o por socket Unix. La interfaz de POKERR.py es un
+cliente más (ver cliente.py).
+
+Protocolo: cada mensaje es un objeto JSON compacto precedido de su longitud
+("!I", 4 bytes).
+
+Cliente -> servidor
+    {"t": "unirse", "nombre": str, "fichas": int, "mesa": int?, "ia": int?}
+        "ia" > 0 abre una mesa propia con ese número de rivales IA
+        "fichas" (como en "recomprar") se limita a la compra máxima del servidor
+    {"t": "accion", "a": "fold" | "check" | "call" | "raise" | "all_in", "total": int?}
+    {"t": "nueva_mano"}          listo para la siguiente mano
+    {"t": "recomprar", "fichas": int}   solo sin fichas, se aplica entre manos
+    {"t": "metricas"}
+    {"t": "salir"}
+
+Servidor -> cliente
+    {"t": "sentado", "mesa": int}
+    {"t": "estado", ...}         ver Mesa.estado_para()
+    {"t": "metricas", ...}
+    {"t": "error", "msg": str}
+
+Con un almacén de usuarios (usuarios.py) los perfiles de juego de cada
+jugador (modelo_rivales.py) se cargan al sentarse y se guardan al levantarse.
+
+Ejecutar: python servidor.py [--puerto 8765 | --unix /tmp/poker.sock] [--perfiles usuarios_poker.db]
+Prueba de carga: python servidor.py --bots 400 --jugadores-por-mesa 4 --duracion 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import struct
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import traza
+from ia import decidir, describir_accion
+from motor import SIMULACIONES_IA_ASINCRONA, EstadoJuego, Jugador, PokerGame
+from usuarios import AlmacenSQLite
+
+LONGITUD = struct.Struct("!I")
+MAX_MENSAJE = 1 << 16
+
+PUERTO = 8765
+ASIENTOS_POR_MESA = 6
+# Conexiones pendientes de aceptar (muchos clientes se conectan a la vez en las pruebas)
+CONEXIONES_EN_ESPERA = 1024
+
+# Segundos entre manos (None: esperar a que todos los humanos pidan nueva mano)
+PAUSA_ENTRE_MANOS = 3.0
+# Segundos para actuar antes de pasar o retirarse automáticamente (None: sin límite)
+TIEMPO_TURNO = 30.0
+# Tiempo máximo de una decisión de IA en el pool de procesos
+PRESUPUESTO_IA_MS = 300
+
+# Latencias que se guardan por mesa para los percentiles
+MUESTRAS_LATENCIA = 1000
+
+RIVALES_IA = [("IA - Ana", "agresiva"), ("IA - Luis", "conservadora"), ("IA - Mia", "impredecible")]
+# Fichas de cada rival IA al sentarse y en cada recompra
+FICHAS_IA = 2500
+# Compra de los clientes al sentarse o recomprar: la que pidan, hasta la máxima
+COMPRA_INICIAL = 2500
+COMPRA_MAXIMA = 10000
+
+TEXTO_ACCION = {"fold": "fold", "check": "check", "call": "call", "all_in": "all in"}
+
+
+# ---------- Protocolo ----------
+def codificar(mensaje):
+    datos = json.dumps(mensaje, separators=(",", ":")).encode("utf-8")
+    return LONGITUD.pack(len(datos)) + datos
+
+
+async def recibir(reader):
+    """Siguiente mensaje del stream; lanza IncompleteReadError al cerrarse"""
+    longitud, = LONGITUD.unpack(await reader.readexactly(LONGITUD.size))
+    if longitud > MAX_MENSAJE:
+        raise ValueError(f"Mensaje demasiado largo: {longitud} bytes")
+    return json.loads(await reader.readexactly(longitud))
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def estado_mesa(juego, jugador, mesa=0):
+    """Mensaje 'estado' de una partida para 'jugador': solo ve sus cartas hasta el showdown"""
+    final = juego.estado in (EstadoJuego.SHOWDOWN, EstadoJuego.FINAL)
+    jugadores = []
+    for j in juego.jugadores:
+        visibles = j is jugador or (final and j.mano_final is not None)
+        jugadores.append({
+            "n": j.nombre, "f": j.fichas, "a": j.apuesta_actual, "j": j.en_juego,
+            "ai": j.ha_hecho_all_in, "u": j.ultima_accion, "ia": j.es_ia,
+            "c": list(j.mano) if visibles else [None] * len(j.mano),
+            "r": j.ranking_mano.value if final and j.ranking_mano is not None else None,
+        })
+    yo = juego.jugadores.index(jugador) if jugador in juego.jugadores else -1
+    turno = -1 if juego.ronda_terminada or final else juego.jugador_actual_index
+    return {
+        "t": "estado", "mesa": mesa, "mano": juego.numero_mano, "e": juego.estado.value,
+        "bote": juego.bote, "apuesta": juego.apuesta_minima, "tablero": juego.cartas_comunitarias,
+        "turno": turno, "boton": juego.dealer_index, "yo": yo, "jugadores": jugadores,
+        "acciones": list(juego.acciones_validas()) if turno == yo and yo >= 0 else [],
+        "igualar": juego.cantidad_para_igualar(jugador) if turno == yo and yo >= 0 else 0,
+        "ganadores": [juego.jugadores.index(j) for j in juego.ganadores] if final else [],
+        "premios": juego.premios if final else [],
+    }
+
+
+# ---------- Conexiones ----------
+class Conexion:
+    """Un cliente conectado y, si está sentado, su jugador y su mesa"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.jugador = None
+        self.mesa = None
+        self.quiere_nueva_mano = False
+
+    def enviar(self, mensaje):
+        if not self.writer.is_closing():
+            self.writer.write(codificar(mensaje))
+
+
+class MetricasMesa:
+    """Manos jugadas y latencia de las acciones de los clientes en una mesa"""
+
+    def __init__(self):
+        self.manos = 0
+        self.acciones = 0
+        self.latencias = deque(maxlen=MUESTRAS_LATENCIA)
+
+    def anotar_latencia(self, segundos):
+        self.acciones += 1
+        self.latencias.append(segundos)
+
+    def resumen(self):
+        latencias = list(self.latencias)
+        return {
+            "manos": self.manos,
+            "acciones": self.acciones,
+            "latencia_media_ms": sum(latencias) * 1000 / len(latencias) if latencias else 0.0,
+            "latencia_p50_ms": percentil(latencias, 50) * 1000,
+            "latencia_p99_ms": percentil(latencias, 99) * 1000,
+            "latencia_max_ms": max(latencias) * 1000 if latencias else 0.0,
+        }
+
+
+# ---------- Mesas ----------
+class Mesa:
+    """Una partida con su propia tarea asyncio"""
+
+    def __init__(self, numero, servidor, privada=False):
+        self.numero = numero
+        self.servidor = servidor
+        self.privada = privada
+        semilla = servidor.semilla + numero if servidor.semilla is not None else None
+        self.juego = PokerGame(jugadores=[], semilla=semilla)
+        self.juego.fila_traza = f"mesa {numero}"
+        if servidor.historial is not None:
+            self.juego.historial = servidor.historial.mesa()
+        self.conexiones = {}  # Jugador -> Conexion
+        self.por_sentar = []
+        self.recompras = {}
+        self.acciones = asyncio.Queue()  # (conexion, mensaje, instante de llegada)
+        self.despertar = asyncio.Event()
+        self.metricas = MetricasMesa()
+        self.activa = True
+        self.tarea = None
+
+    def asientos_ocupados(self):
+        return len(self.juego.jugadores) + len(self.por_sentar)
+
+    def sentar_ia(self, nombre, personalidad, fichas):
+        self.por_sentar.append(Jugador(nombre, es_ia=True, fichas=fichas, personalidad=personalidad))
+
+    def sentar(self, conexion, nombre, fichas):
+        jugador = Jugador(nombre, es_ia=False, fichas=fichas, es_usuario=True)
+        conexion.jugador = jugador
+        conexion.mesa = self
+        self.conexiones[jugador] = conexion
+        self.por_sentar.append(jugador)
+        self.despertar.set()
+
+    def desconectar(self, conexion):
+        """El cliente se fue: su asiento pasa o se retira y se libera entre manos"""
+        self.conexiones.pop(conexion.jugador, None)
+        if conexion.jugador in self.por_sentar:
+            self.por_sentar.remove(conexion.jugador)
+        self.acciones.put_nowait((conexion, None, time.perf_counter()))
+        self.despertar.set()
+
+    def recibir_accion(self, conexion, mensaje, llegada):
+        self.acciones.put_nowait((conexion, mensaje, llegada))
+
+    def pedir_nueva_mano(self, conexion):
+        conexion.quiere_nueva_mano = True
+        self.despertar.set()
+
+    def recomprar(self, conexion, fichas):
+        self.recompras[conexion.jugador] = fichas
+        self.despertar.set()
+
+    # ---------- Estado para los clientes ----------
+    def estado_para(self, conexion):
+        return estado_mesa(self.juego, conexion.jugador, self.numero)
+
+    def difundir(self):
+        for conexion in list(self.conexiones.values()):
+            conexion.enviar(self.estado_para(conexion))
+
+    # ---------- Bucle de la mesa ----------
+    async def ejecutar(self):
+        try:
+            while self.activa:
+                self._preparar_mano()
+                if not self.conexiones and self.privada:
+                    break  # Mesa propia sin su humano: se cierra
+                if not self.juego.iniciar_nueva_mano():
+                    self.despertar.clear()
+                    await self.despertar.wait()
+                    continue
+                self.difundir()
+                await self._jugar_mano()
+                self.metricas.manos += 1
+                if self.juego.historial is not None:
+                    self.servidor.historial.vaciar()
+                await self._esperar_nueva_mano()
+        finally:
+            for j in self.juego.jugadores:
+                self.servidor.guardar_perfil(j)
+            self.servidor.mesa_cerrada(self)
+
+    def _preparar_mano(self):
+        """Entre manos: liberar asientos abandonados, sentar a los nuevos y aplicar recompras (también de las IA)"""
+        juego = self.juego
+        for j in list(juego.jugadores):
+            if not j.es_ia and j not in self.conexiones:
+                juego.levantar(j)
+                self.servidor.guardar_perfil(j)
+        for j in self.por_sentar:
+            self.servidor.cargar_perfil(j)
+            juego.sentar(j)
+        self.por_sentar = []
+        for j, fichas in self.recompras.items():
+            if j.fichas <= 0:
+                j.fichas = fichas
+        self.recompras = {}
+        for j in juego.jugadores:
+            # Las IA sin fichas recompran, como los bots, para que la mesa nunca se quede sin rivales
+            if j.es_ia and j.fichas <= 0:
+                j.fichas = FICHAS_IA
+        for conexion in self.conexiones.values():
+            conexion.quiere_nueva_mano = False
+        while not self.acciones.empty():
+            self.acciones.get_nowait()  # Acciones de la mano anterior
+
+    async def _jugar_mano(self):
+        juego = self.juego
+        while juego.estado != EstadoJuego.FINAL:
+            if juego.ronda_terminada:
+                juego.avanzar_ronda()
+            else:
+                jugador = juego.jugadores[juego.jugador_actual_index]
+                if jugador.es_ia:
+                    await self._turno_ia(jugador)
+                else:
+                    llegada = await self._turno_humano(jugador)
+                    if llegada is not None:
+                        self.difundir()
+                        self.metricas.anotar_latencia(time.perf_counter() - llegada)
+                        await asyncio.sleep(0)
+                        continue
+            self.difundir()
+            # Ceder el bucle a las demás mesas entre acción y acción
+            await asyncio.sleep(0)
+
+    async def _turno_ia(self, jugador):
+        juego = self.juego
+        pool = self.servidor.pool
+        if pool is None:
+            juego.turno_ia()
+            return
+        solicitud = jugador.crear_solicitud_decision(*juego.contexto_decision(jugador),
+                                                     rivales=juego.perfiles_rivales(jugador))
+        presupuesto_ms = self.servidor.presupuesto_ia_ms
+        # La semilla sale de la aleatoriedad de la mesa: con semilla, el pool decide igual en cada ejecución
+        solicitud = solicitud._replace(simulaciones=self.servidor.simulaciones_ia,
+                                       presupuesto_ms=presupuesto_ms * 0.8,
+                                       semilla=juego.rng.getrandbits(64))
+        jugador.ultima_accion = "pensando..."
+        self.difundir()
+        inicio = traza.ahora()
+        fuente = "pool"
+        try:
+            decision, cantidad = await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(pool, decidir, solicitud),
+                presupuesto_ms / 1000.0)
+        except (asyncio.TimeoutError, OSError, RuntimeError):
+            # Respaldo en el propio bucle, así que sin Monte Carlo (solo la jugada hecha):
+            # un pool lento o caído no debe frenar a las demás mesas
+            fuente = "respaldo"
+            decision, cantidad = decidir(solicitud._replace(simulaciones=0, presupuesto_ms=None))
+        if traza.activa():
+            traza.completo("decision IA", inicio, traza.ahora() - inicio, "ia", self.juego.fila_traza,
+                           jugador=jugador.nombre, decision=decision, cantidad=cantidad, fuente=fuente)
+        jugador.ultima_accion = describir_accion(decision, cantidad, jugador.fichas)
+        juego.aplicar_decision(jugador, decision, cantidad)
+
+    async def _turno_humano(self, jugador):
+        """Esperar la acción del cliente; devuelve cuándo llegó (None si fue automática)"""
+        tiempo_turno = self.servidor.tiempo_turno
+        limite = time.monotonic() + tiempo_turno if tiempo_turno is not None else None
+        while True:
+            if jugador not in self.conexiones:
+                self._accion_automatica(jugador)
+                return None
+            try:
+                espera = None if limite is None else max(0.0, limite - time.monotonic())
+                conexion, mensaje, llegada = await asyncio.wait_for(self.acciones.get(), espera)
+            except asyncio.TimeoutError:
+                self._accion_automatica(jugador)
+                return None
+            if mensaje is None:
+                continue  # Alguien se desconectó; se vuelve a comprobar arriba
+            if conexion.jugador is not jugador:
+                conexion.enviar({"t": "error", "msg": "No es tu turno"})
+                continue
+            if traza.activa():
+                traza.instante("accion recibida", "red", self.juego.fila_traza, jugador=jugador.nombre,
+                               espera_ms=(time.perf_counter() - llegada) * 1000)
+            try:
+                self._aplicar(jugador, mensaje.get("a"), mensaje.get("total"))
+            except (ValueError, TypeError) as e:
+                conexion.enviar({"t": "error", "msg": str(e)})
+                continue
+            return llegada
+
+    def _aplicar(self, jugador, accion, total=None):
+        juego = self.juego
+        if accion == "fold":
+            juego.retirarse()
+        elif accion == "check":
+            juego.pasar()
+        elif accion == "call":
+            juego.igualar()
+        elif accion == "raise":
+            juego.subir(int(total) if total is not None else None)
+        elif accion == "all_in":
+            juego.all_in()
+        else:
+            raise ValueError(f"Acción desconocida: {accion}")
+        jugador.ultima_accion = TEXTO_ACCION.get(accion) or f"raise {jugador.apuesta_actual}"
+
+    def _accion_automatica(self, jugador):
+        """Sin respuesta a tiempo: pasar si se puede, si no retirarse"""
+        self._aplicar(jugador, "check" if "check" in self.juego.acciones_validas() else "fold")
+
+    async def _esperar_nueva_mano(self):
+        pausa = self.servidor.pausa
+        limite = time.monotonic() + pausa if pausa is not None else None
+        while self.activa:
+            conexiones = list(self.conexiones.values())
+            if not conexiones or all(c.quiere_nueva_mano for c in conexiones):
+                return
+            espera = None if limite is None else limite - time.monotonic()
+            if espera is not None and espera <= 0:
+                return
+            self.despertar.clear()
+            try:
+                await asyncio.wait_for(self.despertar.wait(), espera)
+            except asyncio.TimeoutError:
+                return
+
+
+# ---------- Servidor ----------
+class ServidorPoker:
+    """Acepta clientes y reparte asientos entre las mesas"""
+
+    def __init__(self, asientos_por_mesa=ASIENTOS_POR_MESA, pausa=PAUSA_ENTRE_MANOS,
+                 tiempo_turno=TIEMPO_TURNO, procesos_ia=0, simulaciones_ia=SIMULACIONES_IA_ASINCRONA,
+                 presupuesto_ia_ms=PRESUPUESTO_IA_MS, historial=None, semilla=None, perfiles=None,
+                 compra_maxima=COMPRA_MAXIMA):
+        self.asientos_por_mesa = asientos_por_mesa
+        self.pausa = pausa
+        self.tiempo_turno = tiempo_turno
+        self.simulaciones_ia = simulaciones_ia
+        self.presupuesto_ia_ms = presupuesto_ia_ms
+        self.compra_maxima = compra_maxima
+        # Sin procesos la IA decide en línea con Jugador.simulaciones_ia
+        self.pool = ProcessPoolExecutor(max_workers=procesos_ia) if procesos_ia else None
+        self.historial = historial
+        # Almacén de usuarios donde persisten los perfiles de juego (None = solo en memoria)
+        self.perfiles = perfiles
+        # Con semilla, cada mesa usa la suya (semilla + número de mesa)
+        self.semilla = semilla
+        self.mesas = {}
+        self.atendiendo = {}  # Tarea de cada conexión abierta -> su writer
+        self.cerradas = []
+        self.siguiente_mesa = 1
+        self.servidor = None
+        self.direccion = None
+
+    async def iniciar(self, host="127.0.0.1", puerto=PUERTO, unix=None):
+        if unix:
+            self.servidor = await asyncio.start_unix_server(self.atender, path=unix, backlog=CONEXIONES_EN_ESPERA)
+            self.direccion = unix
+        else:
+            self.servidor = await asyncio.start_server(self.atender, host, puerto, backlog=CONEXIONES_EN_ESPERA)
+            self.direccion = self.servidor.sockets[0].getsockname()[:2]
+        return self.direccion
+
+    async def cerrar(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        tareas = [m.tarea for m in self.mesas.values()]
+        for mesa in list(self.mesas.values()):
+            mesa.activa = False
+        for tarea in tareas:
+            tarea.cancel()
+        # Las conexiones terminan solas al cerrar su transporte
+        for writer in self.atendiendo.values():
+            writer.close()
+        await asyncio.gather(*tareas, *self.atendiendo, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+
+    def crear_mesa(self, privada=False):
+        mesa = Mesa(self.siguiente_mesa, self, privada)
+        self.siguiente_mesa += 1
+        self.mesas[mesa.numero] = mesa
+        mesa.tarea = asyncio.get_running_loop().create_task(mesa.ejecutar())
+        return mesa
+
+    def mesa_cerrada(self, mesa):
+        if self.mesas.pop(mesa.numero, None) is not None:
+            self.cerradas.append(mesa.metricas)
+
+    def cargar_perfil(self, jugador):
+        if self.perfiles is not None:
+            datos = self.perfiles.obtener_perfil(jugador.nombre)
+            if datos is not None:
+                jugador.perfil.cargar(datos)
+
+    def guardar_perfil(self, jugador):
+        if self.perfiles is not None:
+            self.perfiles.guardar_perfil(jugador.nombre, jugador.perfil.a_bytes())
+
+    def buscar_mesa(self, numero=None):
+        """Mesa pública con sitio (la indicada si existe), o una nueva"""
+        if numero is not None:
+            mesa = self.mesas.get(numero)
+            if mesa is not None and not mesa.privada and mesa.asientos_ocupados() < self.asientos_por_mesa:
+                return mesa
+        for mesa in self.mesas.values():
+            if not mesa.privada and mesa.asientos_ocupados() < self.asientos_por_mesa:
+                return mesa
+        return self.crear_mesa()
+
+    def fichas_compra(self, mensaje):
+        """Fichas que pide el cliente al sentarse o recomprar, dentro del límite del servidor"""
+        return min(self.compra_maxima, max(1, int(mensaje.get("fichas") or COMPRA_INICIAL)))
+
+    def unirse(self, conexion, mensaje):
+        if conexion.mesa is not None:
+            conexion.enviar({"t": "error", "msg": "Ya estás sentado"})
+            return
+        nombre = str(mensaje.get("nombre") or "Jugador")[:30]
+        fichas = self.fichas_compra(mensaje)
+        rivales = min(int(mensaje.get("ia") or 0), self.asientos_por_mesa - 1)
+        if rivales > 0:
+            # Mesa propia: el humano en el primer asiento, como en la partida local
+            mesa = self.crear_mesa(privada=True)
+            mesa.sentar(conexion, nombre, fichas)
+            for k in range(rivales):
+                nombre_ia, personalidad = (RIVALES_IA[k] if k < len(RIVALES_IA)
+                                           else (f"IA - {k + 1}", "normal"))
+                mesa.sentar_ia(nombre_ia, personalidad, FICHAS_IA)
+        else:
+            mesa = self.buscar_mesa(mensaje.get("mesa"))
+            mesa.sentar(conexion, nombre, fichas)
+        conexion.enviar({"t": "sentado", "mesa": mesa.numero})
+
+    async def atender(self, reader, writer):
+        conexion = Conexion(writer)
+        tarea = asyncio.current_task()
+        self.atendiendo[tarea] = writer
+        try:
+            while True:
+                mensaje = await recibir(reader)
+                llegada = time.perf_counter()
+                tipo = mensaje.get("t")
+                mesa = conexion.mesa
+                if tipo == "unirse":
+                    self.unirse(conexion, mensaje)
+                elif tipo == "accion" and mesa is not None:
+                    mesa.recibir_accion(conexion, mensaje, llegada)
+                elif tipo == "nueva_mano" and mesa is not None:
+                    mesa.pedir_nueva_mano(conexion)
+                elif tipo == "recomprar" and mesa is not None:
+                    mesa.recomprar(conexion, self.fichas_compra(mensaje))
+                elif tipo == "metricas":
+                    conexion.enviar({"t": "metricas", **self.metricas()})
+                elif tipo == "salir":
+                    break
+                else:
+                    conexion.enviar({"t": "error", "msg": f"Mensaje no válido: {tipo}"})
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, TypeError):
+            pass
+        finally:
+            self.atendiendo.pop(tarea, None)
+            if conexion.mesa is not None:
+                conexion.mesa.desconectar(conexion)
+            writer.close()
+
+    def metricas(self):
+        """Resumen de todas las mesas: manos y latencias por mesa"""
+        por_mesa = {numero: mesa.metricas.resumen() for numero, mesa in self.mesas.items()}
+        manos = sum(m["manos"] for m in por_mesa.values()) + sum(m.manos for m in self.cerradas)
+        p99 = [m["latencia_p99_ms"] for m in por_mesa.values() if m["acciones"]]
+        return {
+            "mesas": len(por_mesa),
+            "manos": manos,
+            "latencia_p99_mediana_ms": percentil(p99, 50),
+            "latencia_p99_peor_ms": max(p99) if p99 else 0.0,
+            "por_mesa": por_mesa,
+        }
+
+
+# ---------- Bots de prueba ----------
+async def conectar(direccion):
+    if isinstance(direccion, str):
+        return await asyncio.open_unix_connection(direccion)
+    return await asyncio.open_connection(*direccion)
+
+
+async def bot(direccion, nombre, fichas=2500, semilla=None):
+    """Cliente automático: juega al azar entre las acciones válidas hasta que lo cancelen"""
+    rng = random.Random(semilla)
+    reader, writer = await conectar(direccion)
+    writer.write(codificar({"t": "unirse", "nombre": nombre, "fichas": fichas}))
+    mano_vista = None
+    try:
+        while True:
+            mensaje = await recibir(reader)
+            if mensaje.get("t") != "estado":
+                continue
+            yo = mensaje["yo"]
+            if mensaje["acciones"]:
+                acciones = mensaje["acciones"]
+                pasiva = "check" if "check" in acciones else "call"
+                accion = rng.choices([pasiva, "fold", "raise", "all_in"], [70, 15, 13, 2])[0]
+                if accion not in acciones:
+                    accion = pasiva
+                writer.write(codificar({"t": "accion", "a": accion}))
+            elif mensaje["e"] == EstadoJuego.FINAL.value and mensaje["mano"] != mano_vista:
+                mano_vista = mensaje["mano"]
+                if yo >= 0 and mensaje["jugadores"][yo]["f"] <= 0:
+                    writer.write(codificar({"t": "recomprar", "fichas": fichas}))
+                writer.write(codificar({"t": "nueva_mano"}))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def prueba_carga(bots, jugadores_por_mesa, duracion, unix=None):
+    """Servidor y bots en el mismo proceso; devuelve las métricas al terminar"""
+    servidor = ServidorPoker(asientos_por_mesa=jugadores_por_mesa, pausa=0.0, tiempo_turno=5.0)
+    direccion = await servidor.iniciar(puerto=0, unix=unix)
+    tareas = [asyncio.create_task(bot(direccion, f"bot{k}", semilla=k)) for k in range(bots)]
+    inicio = time.perf_counter()
+    await asyncio.sleep(duracion)
+    resultado = servidor.metricas()
+    resultado["segundos"] = time.perf_counter() - inicio
+    for tarea in tareas:
+        tarea.cancel()
+    await asyncio.gather(*tareas, return_exceptions=True)
+    await servidor.cerrar()
+    return resultado
+
+
+async def servir(args):
+    perfiles = AlmacenSQLite(args.perfiles) if args.perfiles else None
+    servidor = ServidorPoker(procesos_ia=args.procesos_ia, simulaciones_ia=args.simulaciones,
+                             semilla=args.semilla, perfiles=perfiles, compra_maxima=args.compra_maxima)
+    direccion = await servidor.iniciar(args.host, args.puerto, args.unix)
+    print(f"Servidor de poker en {direccion}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            m = servidor.metricas()
+            print(f"{m['mesas']} mesas - {m['manos']:,} manos - latencia p99 mediana "
+                  f"{m['latencia_p99_mediana_ms']:.2f} ms, peor {m['latencia_p99_peor_ms']:.2f} ms")
+    finally:
+        await servidor.cerrar()
+        if perfiles is not None:
+            perfiles.cerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de mesas de poker sin interfaz")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--unix", default=None, help="ruta de un socket Unix en lugar de TCP")
+    parser.add_argument("--procesos-ia", type=int, default=2, help="procesos para las decisiones de IA (0 = en línea)")
+    parser.add_argument("--simulaciones", type=int, default=SIMULACIONES_IA_ASINCRONA,
+                        help="simulaciones Monte Carlo por decisión de IA en el pool")
+    parser.add_argument("--semilla", type=int, default=None, help="semilla base de los mazos de las mesas")
+    parser.add_argument("--compra-maxima", type=int, default=COMPRA_MAXIMA,
+                        help="fichas máximas que un cliente puede pedir al sentarse o recomprar")
+    parser.add_argument("--perfiles", default=None, help="base de datos de usuarios donde guardar los perfiles de juego")
+    parser.add_argument("--traza", default=None, help="archivo JSON de traza (formato de Chrome) al terminar")
+    parser.add_argument("--bots", type=int, default=0, help="prueba de carga con este número de bots locales")
+    parser.add_argument("--jugadores-por-mesa", type=int, default=4)
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos de la prueba de carga")
+    args = parser.parse_args()
+    if args.traza:
+        traza.activar()
+
+    if not args.bots:
+        try:
+            asyncio.run(servir(args))
+        except KeyboardInterrupt:
+            pass
+    else:
+        r = asyncio.run(prueba_carga(args.bots, args.jugadores_por_mesa, args.duracion, args.unix))
+        print(f"{r['mesas']} mesas, {r['manos']:,} manos en {r['segundos']:.1f} s "
+              f"({r['manos'] / r['segundos']:,.0f} manos/s)")
+        print(f"Latencia por acción (p99 por mesa): mediana {r['latencia_p99_mediana_ms']:.2f} ms, "
+              f"peor {r['latencia_p99_peor_ms']:.2f} ms")
+
+    if args.traza:
+        print(f"Traza: {traza.guardar(args.traza):,} eventos en {args.traza}")
+
+
+if __name__ == "__main__":
+    main()
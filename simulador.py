@@ -0,0 +1,110 @@
+"""
+Simulador sin interfaz: enfrenta personalidades de IA durante miles de manos.
+
+No importa pygame ni abre ventanas, así que sirve para simulaciones por lotes
+y pruebas de regresión en servidores sin pantalla.
+
+Ejecutar: python simulador.py --manos 100000 --semilla 42 [--historial manos.bin] [--traza traza.json]
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import traza
+from historial import EscritorHistorial
+from motor import Jugador, PokerGame
+
+PERSONALIDADES = ["agresiva", "conservadora", "impredecible", "normal"]
+MIN_JUGADORES = 2
+MAX_JUGADORES = 9
+
+
+def crear_mesa(personalidades, fichas, semilla=None, reparto_perezoso=True):
+    """Mesa solo con jugadores IA, uno por personalidad (se pueden repetir)"""
+    # El asiento en el nombre lo hace único aunque se repita la personalidad
+    jugadores = [Jugador(f"IA {i + 1} - {p}", es_ia=True, fichas=fichas, personalidad=p)
+                 for i, p in enumerate(personalidades)]
+    return PokerGame(jugadores=jugadores, semilla=semilla, reparto_perezoso=reparto_perezoso)
+
+
+def simular(manos, personalidades=PERSONALIDADES, fichas=2500, semilla=None, historial=None,
+            reparto_perezoso=True):
+    """Jugar 'manos' manos seguidas; los jugadores sin fichas recompran"""
+    juego = crear_mesa(personalidades, fichas, semilla, reparto_perezoso)
+    juego.acciones = Counter()
+    if historial:
+        juego.historial = EscritorHistorial(historial)
+    estadisticas = {j.nombre: {"ganadas": 0, "recompras": 0} for j in juego.jugadores}
+
+    jugadas = 0
+    incompletas = 0
+    inicio = time.perf_counter()
+    for _ in range(manos):
+        for j in juego.jugadores:
+            if j.fichas <= 0:
+                j.fichas = fichas
+                estadisticas[j.nombre]["recompras"] += 1
+
+        if not juego.jugar_mano():
+            incompletas += 1
+            continue
+        jugadas += 1
+        for j in juego.ganadores:
+            estadisticas[j.nombre]["ganadas"] += 1
+    segundos = time.perf_counter() - inicio
+    if juego.historial is not None:
+        juego.historial.cerrar()
+
+    for i, j in enumerate(juego.jugadores):
+        e = estadisticas[j.nombre]
+        e["fichas"] = j.fichas
+        e["balance"] = j.fichas - fichas * (1 + e["recompras"])
+        # Retiradas y all-ins por mano jugada: una estrategia sana se retira a menudo y rara vez va all-in
+        e["retiradas"] = juego.acciones[i, "fold"] / max(1, jugadas)
+        e["all_ins"] = juego.acciones[i, "all_in"] / max(1, jugadas)
+    return {
+        "manos": jugadas,
+        "incompletas": incompletas,
+        "segundos": segundos,
+        "manos_por_minuto": jugadas * 60 / segundos if segundos > 0 else 0,
+        "jugadores": estadisticas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación sin interfaz entre personalidades de IA")
+    parser.add_argument("--manos", type=int, default=10000, help="número de manos a jugar")
+    parser.add_argument("--semilla", type=int, default=None, help="semilla del generador aleatorio")
+    parser.add_argument("--fichas", type=int, default=2500, help="fichas iniciales (y de cada recompra)")
+    parser.add_argument("--personalidades", nargs="+", default=PERSONALIDADES,
+                        choices=PERSONALIDADES, help=f"personalidades en la mesa, una por asiento ({MIN_JUGADORES} a {MAX_JUGADORES})")
+    parser.add_argument("--simulaciones", type=int, default=0,
+                        help="simulaciones Monte Carlo por decisión post-flop (0 = solo jugada hecha)")
+    parser.add_argument("--historial", default=None, help="archivo donde grabar el historial de manos")
+    parser.add_argument("--baraja-completa", action="store_true",
+                        help="barajar las 52 cartas cada mano en lugar de robarlas al azar una a una")
+    parser.add_argument("--traza", default=None, help="archivo JSON de traza (formato de Chrome) de las manos")
+    args = parser.parse_args()
+    if not MIN_JUGADORES <= len(args.personalidades) <= MAX_JUGADORES:
+        parser.error(f"--personalidades necesita de {MIN_JUGADORES} a {MAX_JUGADORES} jugadores")
+    if args.traza:
+        traza.activar()
+
+    Jugador.simulaciones_ia = args.simulaciones
+    Jugador.presupuesto_ia_ms = None
+
+    resultado = simular(args.manos, args.personalidades, args.fichas, args.semilla, args.historial,
+                        not args.baraja_completa)
+
+    print(f"Manos jugadas: {resultado['manos']:,} ({resultado['incompletas']} incompletas)")
+    print(f"Tiempo: {resultado['segundos']:.2f} s - {resultado['manos_por_minuto']:,.0f} manos/minuto")
+    for nombre, e in resultado["jugadores"].items():
+        print(f"  {nombre:<20} ganadas {e['ganadas']:>8,}  recompras {e['recompras']:>6,}  "
+              f"balance {e['balance']:>+12,}  retiradas {e['retiradas']:.2f}  all-in {e['all_ins']:.2f}")
+    if args.traza:
+        print(f"Traza: {traza.guardar(args.traza):,} eventos en {args.traza}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Tabla precalculada de equidad pre-flop.
+
+Guarda la equidad all-in de las 169 manos iniciales canónicas contra 1 a 9
+oponentes aleatorios en un archivo binario compacto que se mapea en memoria
+al arrancar, así que cada consulta pre-flop es O(1) y no calcula nada.
+
+Formato (little-endian):
+    cabecera  "<4sHHH": b"PFEQ", versión, manos (169), máximo de oponentes (9)
+    datos     uint16 por (oponentes, mano), equidad * 65535
+
+Generar: python tabla_preflop.py --simulaciones 50000
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+
+MAGIA = b"PFEQ"
+VERSION = 1
+CABECERA = struct.Struct("<4sHHH")
+MANOS_CANONICAS = 169
+MAX_OPONENTES = 9
+ESCALA = 65535
+
+RUTA_TABLA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equidad.bin")
+
+
+def indice_mano(c1, c2):
+    """Índice canónico 0-168 de dos códigos de carta (matriz 13x13)"""
+    r1, r2 = c1 & 15, c2 & 15
+    alto, bajo = (r1, r2) if r1 >= r2 else (r2, r1)
+    if (c1 >> 4) == (c2 >> 4):
+        # Suited encima de la diagonal, offsuit debajo, parejas en la diagonal
+        return alto * 13 + bajo
+    return bajo * 13 + alto
+
+
+def mano_representante(indice):
+    """Dos códigos de carta de ejemplo para un índice canónico"""
+    a, b = divmod(indice, 13)
+    if a > b:
+        return [a, b]  # Suited: mismo palo
+    return [b, a + 16]  # Offsuit o pareja: palos distintos
+
+
+class TablaPreflop:
+    """Tabla de equidades pre-flop mapeada en memoria"""
+
+    def __init__(self, ruta=RUTA_TABLA):
+        with open(ruta, "rb") as f:
+            self.datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, version, manos, max_oponentes = CABECERA.unpack_from(self.datos, 0)
+        if magia != MAGIA or version != VERSION or manos != MANOS_CANONICAS:
+            self.datos.close()
+            raise ValueError(f"Tabla pre-flop no válida: {ruta}")
+        self.max_oponentes = max_oponentes
+
+    def equidad(self, mano, oponentes):
+        """Equidad (0-1) de dos códigos de carta contra 'oponentes' manos aleatorias"""
+        oponentes = min(max(1, oponentes), self.max_oponentes)
+        posicion = CABECERA.size + 2 * ((oponentes - 1) * MANOS_CANONICAS + indice_mano(mano[0], mano[1]))
+        return struct.unpack_from("<H", self.datos, posicion)[0] / ESCALA
+
+    def cerrar(self):
+        self.datos.close()
+
+
+_tabla = None
+_tabla_cargada = False
+
+def cargar_tabla_preflop(ruta=RUTA_TABLA):
+    """Tabla compartida del proceso, o None si el archivo no existe o no es válido"""
+    global _tabla, _tabla_cargada
+    if not _tabla_cargada:
+        _tabla_cargada = True
+        try:
+            _tabla = TablaPreflop(ruta)
+        except (OSError, ValueError) as e:
+            print(f"Sin tabla pre-flop ({e}); se usa la fórmula aproximada")
+            _tabla = None
+    return _tabla
+
+
+# ---------- Generación ----------
+def generar_tabla(ruta=RUTA_TABLA, simulaciones=50000, semilla=169):
+    """Calcular por Monte Carlo las 169 x 9 equidades y escribir el archivo"""
+    import numpy as np
+    from equidad import simular_equidad
+
+    rng = np.random.default_rng(semilla)
+    valores = []
+    inicio = time.perf_counter()
+    for oponentes in range(1, MAX_OPONENTES + 1):
+        for indice in range(MANOS_CANONICAS):
+            resultado = simular_equidad(mano_representante(indice), [], oponentes,
+                                        simulaciones, lote=5000, rng=rng)
+            valores.append(int(round(resultado.equidad * ESCALA)))
+        print(f"  {oponentes} oponente(s) listos ({time.perf_counter() - inicio:.0f} s)")
+
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(CABECERA.pack(MAGIA, VERSION, MANOS_CANONICAS, MAX_OPONENTES))
+        f.write(struct.pack(f"<{len(valores)}H", *valores))
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar la tabla de equidad pre-flop")
+    parser.add_argument("--simulaciones", type=int, default=50000, help="simulaciones por mano y número de oponentes")
+    parser.add_argument("--semilla", type=int, default=169, help="semilla del generador aleatorio")
+    parser.add_argument("--salida", default=RUTA_TABLA, help="archivo de salida")
+    args = parser.parse_args()
+
+    ruta = generar_tabla(args.salida, args.simulaciones, args.semilla)
+    print(f"Tabla escrita en {ruta} ({os.path.getsize(ruta)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
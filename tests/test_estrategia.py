@@ -0,0 +1,19 @@
+import pytest
+
+import simulador
+from estrategia import cargar_tabla_estrategia
+from motor import Jugador
+
+
+@pytest.fixture
+def sin_monte_carlo(monkeypatch):
+    monkeypatch.setattr(Jugador, "simulaciones_ia", 0)
+    monkeypatch.setattr(Jugador, "presupuesto_ia_ms", None)
+
+
+@pytest.mark.skipif(cargar_tabla_estrategia() is None, reason="sin estrategia_ia.bin")
+def test_cada_personalidad_se_retira_y_rara_vez_va_all_in(sin_monte_carlo):
+    resultado = simulador.simular(2000, semilla=1)
+    for nombre, e in resultado["jugadores"].items():
+        assert e["retiradas"] >= 0.3, nombre
+        assert e["all_ins"] <= 0.4, nombre
@@ -0,0 +1,66 @@
+import random
+from collections import Counter
+from itertools import combinations
+
+from cartas import MAZO, palo_carta, valor_carta
+from evaluador import RankingMano, categoria, evaluar
+
+
+def cinco_cartas(cartas):
+    """Valor comparable (categoría, desempates) de 5 cartas, por fuerza bruta"""
+    valores = sorted((valor_carta(c) for c in cartas), reverse=True)
+    color = len({palo_carta(c) for c in cartas}) == 1
+    distintos = sorted(set(valores), reverse=True)
+    alto = None
+    if len(distintos) == 5 and distintos[0] - distintos[4] == 4:
+        alto = distintos[0]
+    elif distintos == [14, 5, 4, 3, 2]:
+        alto = 5  # A-2-3-4-5
+    grupos = sorted(Counter(valores).items(), key=lambda g: (g[1], g[0]), reverse=True)
+    forma = [n for _, n in grupos]
+    desempate = [v for v, _ in grupos]
+
+    if alto is not None and color:
+        return (RankingMano.ESCALERA_REAL if alto == 14 else RankingMano.ESCALERA_COLOR).value, [alto]
+    if forma == [4, 1]:
+        return RankingMano.POKER.value, desempate
+    if forma == [3, 2]:
+        return RankingMano.FULL_HOUSE.value, desempate
+    if color:
+        return RankingMano.COLOR.value, valores
+    if alto is not None:
+        return RankingMano.ESCALERA.value, [alto]
+    if forma == [3, 1, 1]:
+        return RankingMano.TRIO.value, desempate
+    if forma == [2, 2, 1]:
+        return RankingMano.DOBLE_PAR.value, desempate
+    if forma == [2, 1, 1, 1]:
+        return RankingMano.PAR.value, desempate
+    return RankingMano.CARTA_ALTA.value, valores
+
+
+def fuerza_bruta(cartas):
+    return max(cinco_cartas(c) for c in combinations(cartas, 5))
+
+
+def test_categoria_y_orden_contra_fuerza_bruta():
+    rng = random.Random(7)
+    manos = [rng.sample(MAZO, 7) for _ in range(10000)]
+    fuerzas = [evaluar(m) for m in manos]
+    esperadas = [fuerza_bruta(m) for m in manos]
+    for fuerza, esperada in zip(fuerzas, esperadas):
+        assert categoria(fuerza).value == esperada[0]
+    # Mismo orden, empates incluidos: vecinas tras ordenar por la fuerza del evaluador
+    orden = sorted(range(len(manos)), key=fuerzas.__getitem__)
+    for i, j in zip(orden, orden[1:]):
+        assert esperadas[i] <= esperadas[j]
+        assert (fuerzas[i] == fuerzas[j]) == (esperadas[i] == esperadas[j])
+
+
+def test_escalera_baja_pierde_con_la_de_seis():
+    def cartas(*pares):
+        return [MAZO[palo * 13 + valor - 2] for valor, palo in pares]
+    rueda = cartas((14, 0), (2, 1), (3, 2), (4, 3), (5, 0), (9, 1), (11, 2))
+    seis = cartas((6, 0), (2, 1), (3, 2), (4, 3), (5, 0), (9, 1), (11, 2))
+    assert categoria(evaluar(rueda)) == RankingMano.ESCALERA
+    assert evaluar(seis) > evaluar(rueda)
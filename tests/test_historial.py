@@ -0,0 +1,54 @@
+import pytest
+
+from historial import EscritorHistorial, leer_historial
+from motor import Jugador, PokerGame
+
+
+@pytest.fixture
+def sin_monte_carlo(monkeypatch):
+    monkeypatch.setattr(Jugador, "simulaciones_ia", 0)
+    monkeypatch.setattr(Jugador, "presupuesto_ia_ms", None)
+
+
+def test_ida_y_vuelta(tmp_path, sin_monte_carlo):
+    ruta = str(tmp_path / "manos.bin")
+    nombres = ["Ana", "Luis", "Mía", "José"]
+    juego = PokerGame(jugadores=[Jugador(n, es_ia=True, fichas=2500, personalidad=p)
+                                 for n, p in zip(nombres, ["agresiva", "conservadora", "impredecible", "normal"])],
+                      semilla=3)
+    juego.historial = EscritorHistorial(ruta)
+    esperadas = []
+    for _ in range(50):
+        for j in juego.jugadores:
+            if j.fichas <= 0:
+                j.fichas = 2500
+        inicio = [j.fichas for j in juego.jugadores]
+        assert juego.jugar_mano()
+        esperadas.append((juego.numero_mano, juego.dealer_index, tuple(juego.cartas_comunitarias), inicio,
+                          [j.fichas for j in juego.jugadores], [tuple(j.mano) for j in juego.jugadores],
+                          sorted(juego.premios)))
+    juego.historial.cerrar()
+
+    manos = list(leer_historial(ruta))
+    assert len(manos) == len(esperadas)
+    for mano, (numero, boton, tablero, inicio, fin, cartas, premios) in zip(manos, esperadas):
+        assert (mano.numero, mano.boton, mano.tablero) == (numero, boton, tablero)
+        assert [a.nombre for a in mano.asientos] == nombres
+        assert [a.fichas_inicio for a in mano.asientos] == inicio
+        assert [a.fichas_fin for a in mano.asientos] == fin
+        assert [a.cartas for a in mano.asientos] == cartas
+        assert sorted(mano.ganadores) == premios
+        # Lo que se puso en las acciones (ciegas incluidas) es el bote repartido
+        assert sum(a.cantidad for a in mano.acciones) == mano.bote == sum(c for _, c in premios)
+
+
+def test_registro_a_medias_al_final_se_ignora(tmp_path, sin_monte_carlo):
+    ruta = str(tmp_path / "manos.bin")
+    juego = PokerGame(jugadores=[Jugador(f"IA {k}", es_ia=True, fichas=2500) for k in range(3)], semilla=5)
+    juego.historial = EscritorHistorial(ruta)
+    for _ in range(5):
+        juego.jugar_mano()
+    juego.historial.cerrar()
+    with open(ruta, "ab") as f:
+        f.write(b"\x40\x00\x00\x00parcial")  # Prefijo de 64 bytes con solo 7 escritos
+    assert [m.numero for m in leer_historial(ruta)] == [1, 2, 3, 4, 5]
@@ -0,0 +1,80 @@
+from cartas import codigo_carta
+from motor import EstadoJuego, Jugador, PokerGame
+
+
+def mesa(*fichas, semilla=1):
+    jugadores = [Jugador(f"J{i}", es_ia=True, fichas=f) for i, f in enumerate(fichas)]
+    juego = PokerGame(jugadores=jugadores, semilla=semilla)
+    juego.iniciar_nueva_mano()
+    return juego
+
+
+def test_all_in_corto_no_reabre_la_apuesta():
+    # Ciegas 25/50; J3 sube a 200 y J0 y J1 igualan
+    juego = mesa(1000, 1000, 250, 1000)
+    juego.subir(200)
+    juego.igualar()
+    juego.igualar()
+    assert juego.jugador_actual_index == 2
+    juego.all_in()  # 250: sube 50, menos que una subida completa (150)
+    assert juego.apuesta_minima == 250
+    for asiento in (3, 0, 1):
+        # Los que ya actuaron deben igualar o retirarse, sin poder resubir
+        assert juego.jugador_actual_index == asiento
+        assert juego.acciones_validas() == ("fold", "call")
+        juego.igualar()
+    assert juego.ronda_terminada
+
+
+def test_subida_completa_reabre_la_apuesta():
+    juego = mesa(1000, 1000, 1000, 1000)
+    juego.subir(200)
+    juego.igualar()
+    juego.igualar()
+    juego.subir(400)
+    assert juego.jugador_actual_index == 3
+    assert "raise" in juego.acciones_validas()
+
+
+def carta(texto):
+    return codigo_carta("hdcs".index(texto[1]), "23456789TJQKA".index(texto[0]) + 2)
+
+
+def showdown(aportes, manos, tablero, retirados=()):
+    """Mesa al final del river con lo aportado y las cartas de cada asiento"""
+    juego = PokerGame(jugadores=[Jugador(f"J{i}", es_ia=True, fichas=0) for i in range(len(aportes))], semilla=1)
+    for i, (jugador, aporte, mano) in enumerate(zip(juego.jugadores, aportes, manos)):
+        jugador.vaciar_mano()
+        for texto in mano.split():
+            jugador.recibir_carta(carta(texto))
+        jugador.aporte = aporte
+        jugador.en_juego = i not in retirados
+    for texto in tablero.split():
+        juego.agregar_comunitaria(carta(texto))
+    juego.bote = sum(aportes)
+    juego.estado = EstadoJuego.SHOWDOWN
+    return juego
+
+
+TABLERO = "2c 7d 9h Js 3s"
+
+
+def test_botes_laterales_con_all_ins_desiguales():
+    # J3 se retiró tras poner 200
+    juego = showdown([100, 300, 500, 200], ["Ah Ad", "Kh Kd", "4h 5d", "Qh Qd"], TABLERO, retirados={3})
+    botes = [(cantidad, [juego.jugadores.index(j) for j in elegibles]) for cantidad, elegibles in juego.calcular_botes()]
+    assert botes == [(400, [0, 1, 2]), (500, [1, 2]), (200, [2])]
+
+    juego.determinar_ganador()
+    assert [j.fichas for j in juego.jugadores] == [400, 500, 200, 0]
+    assert sorted(juego.premios) == [(0, 400), (1, 500), (2, 200)]
+    assert juego.ganador is juego.jugadores[0]
+    assert juego.estado == EstadoJuego.FINAL and juego.bote == 0
+
+
+def test_bote_principal_empatado_y_ficha_impar():
+    # Los dos ases empatan el principal (3 x 101 = 303): la ficha impar va al primero
+    juego = showdown([101, 101, 301], ["Ah Ad", "Ac As", "4h 5d"], TABLERO)
+    juego.determinar_ganador()
+    assert [j.fichas for j in juego.jugadores] == [152, 151, 200]
+    assert sum(j.fichas for j in juego.jugadores) == 503
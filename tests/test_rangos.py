@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from rangos import CalculadoraEquidad, parsear_cartas
+
+
+def mano(texto):
+    return tuple(parsear_cartas(texto))
+
+
+def test_aa_contra_kk_preflop_exacta():
+    calculadora = CalculadoraEquidad(limite_exacto=3_000_000)
+    resultado = calculadora.equidad(mano("AhAd"), [[mano("KsKc")]])
+    assert resultado.exacta
+    assert resultado.equidades[0] == pytest.approx(0.82, abs=0.01)
+    assert sum(resultado.equidades) == pytest.approx(1.0)
+
+
+def test_monte_carlo_dentro_de_su_intervalo():
+    tablero = parsear_cartas("2c7d9hJs")
+    exacta = CalculadoraEquidad().equidad("TT+,AQs+", "A2s+,KTs+,QJo", tablero)
+    estimada = CalculadoraEquidad(limite_exacto=0, rng=np.random.default_rng(3)).equidad(
+        "TT+,AQs+", "A2s+,KTs+,QJo", tablero)
+    assert exacta.exacta and not estimada.exacta
+    for real, equidad, margen in zip(exacta.equidades, estimada.equidades, estimada.margenes):
+        assert 0 < margen < 0.02
+        assert abs(equidad - real) <= margen
+
+
+def test_acierto_de_cache_devuelve_el_mismo_resultado():
+    calculadora = CalculadoraEquidad(limite_exacto=0, rng=np.random.default_rng(1))
+    tablero = parsear_cartas("Ah7d2c")
+    primero = calculadora.equidad("QQ+,AKs", ["22+,ATs+"], tablero)
+    # Mismo tablero en otro orden: misma clave canónica, sin volver a simular
+    segundo = calculadora.equidad("AKs,QQ+", ["ATs+,22+"], list(reversed(tablero)))
+    assert segundo == primero
+    assert (calculadora.aciertos, calculadora.fallos) == (1, 1)
+
+
+def test_lista_de_pares_suelta_es_ambigua():
+    with pytest.raises(ValueError):
+        CalculadoraEquidad().equidad(mano("AhAd"), [mano("KsKc"), mano("QsQc")])
@@ -0,0 +1,140 @@
+"""
+Traza de la línea de tiempo en el formato de eventos de Chrome.
+
+Opcional: mientras no se llame a activar() cada punto de traza es una
+llamada a activa() que solo compara una variable con None. Activada, los
+eventos se guardan en memoria y guardar() los escribe en JSON para abrirlos
+en chrome://tracing o en Perfetto.
+
+- tramo(nombre): bloque with con duración (evento "X")
+- completo(nombre, inicio, duracion): duración medida por quien llama
+- instante(nombre): evento puntual ("i")
+
+Los tiempos son microsegundos desde activar(). Cada hilo sale en su propia
+fila con su nombre, salvo que el evento indique otra con fila="..." (las
+mesas del servidor comparten hilo pero cada una tiene su fila). No depende
+de pygame.
+"""
+
+import json
+import os
+import threading
+import time
+
+# Eventos guardados como máximo (los siguientes se descartan y se cuentan)
+MAX_EVENTOS = 1000000
+
+_eventos = None
+_origen = 0.0
+_hilos = {}  # tid -> nombre de la fila
+_filas = {}  # nombre de fila propia -> tid
+_descartados = 0
+_pid = os.getpid()
+
+
+def activa():
+    return _eventos is not None
+
+
+def activar():
+    """Empezar a grabar (descarta lo grabado antes)"""
+    global _eventos, _origen, _descartados
+    _hilos.clear()
+    _filas.clear()
+    _descartados = 0
+    _origen = time.perf_counter()
+    _eventos = []
+
+
+def desactivar():
+    """Dejar de grabar; devuelve los eventos grabados"""
+    global _eventos
+    eventos, _eventos = _eventos, None
+    return eventos or []
+
+
+def ahora():
+    """Instante actual en segundos de perf_counter (para completo())"""
+    return time.perf_counter()
+
+
+def _anadir(evento, fila=None):
+    global _descartados
+    eventos = _eventos
+    if eventos is None:
+        return
+    if len(eventos) >= MAX_EVENTOS:
+        _descartados += 1
+        return
+    if fila is None:
+        tid = threading.get_ident()
+        if tid not in _hilos:
+            _hilos[tid] = threading.current_thread().name
+    else:
+        tid = _filas.get(fila)
+        if tid is None:
+            tid = _filas[fila] = len(_filas) + 1
+            _hilos[tid] = fila
+    evento["pid"] = _pid
+    evento["tid"] = tid
+    eventos.append(evento)
+
+
+def instante(nombre, categoria="motor", fila=None, **args):
+    if _eventos is not None:
+        _anadir({"name": nombre, "cat": categoria, "ph": "i", "s": "t",
+                 "ts": (time.perf_counter() - _origen) * 1e6, "args": args}, fila)
+
+
+def completo(nombre, inicio, duracion, categoria="motor", fila=None, **args):
+    """Evento con duración ya medida: 'inicio' de ahora() y 'duracion' en segundos"""
+    if _eventos is not None:
+        _anadir({"name": nombre, "cat": categoria, "ph": "X",
+                 "ts": (inicio - _origen) * 1e6, "dur": duracion * 1e6, "args": args}, fila)
+
+
+class Tramo:
+    """Bloque with que se graba como un evento con duración"""
+
+    def __init__(self, nombre, categoria, args):
+        self.nombre = nombre
+        self.categoria = categoria
+        self.args = args
+        self.inicio = 0.0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        completo(self.nombre, self.inicio, time.perf_counter() - self.inicio, self.categoria, **self.args)
+        return False
+
+
+class _TramoNulo:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        return False
+
+
+_TRAMO_NULO = _TramoNulo()
+
+
+def tramo(nombre, categoria="motor", **args):
+    """Bloque with con duración; sin traza activa no mide nada"""
+    if _eventos is None:
+        return _TRAMO_NULO
+    return Tramo(nombre, categoria, args)
+
+
+def guardar(ruta, eventos=None):
+    """Escribir los eventos (por defecto los grabados hasta ahora) en formato de Chrome"""
+    eventos = list(_eventos or []) if eventos is None else eventos
+    nombres = [{"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": nombre}}
+               for tid, nombre in list(_hilos.items())]
+    with open(ruta, "w") as f:
+        json.dump({"traceEvents": nombres + eventos, "displayTimeUnit": "ms",
+                   "otherData": {"eventos_descartados": _descartados}}, f)
+    return len(eventos)
@@ -0,0 +1,447 @@
+"""
+Almacenes de usuarios con escritura diferida.
+
+Los cambios solo se anotan en memoria; un hilo en segundo plano los escribe
+por lotes (al pasar 'intervalo' segundos desde el primer cambio o al acumular
+'max_pendientes' cambios). cerrar() escribe lo que quede pendiente.
+
+- AlmacenSQLite: una fila por usuario con clave primaria por nombre; login,
+  consultas y actualizaciones no leen el resto de usuarios.
+- AlmacenJSON: el archivo JSON original, cargado entero en memoria y
+  reescrito de forma atómica en cada lote. Sirve de origen para migrar.
+
+Junto a los usuarios se guardan los perfiles de juego (contadores de
+modelo_rivales.py, en bytes) con la misma escritura por lotes: en SQLite una
+fila por jugador en su propia tabla, IA incluidas; en JSON dentro del usuario,
+así que solo los de usuarios registrados.
+
+SesionUsuario guarda en memoria el perfil del usuario conectado mientras
+juega y solo lo pasa al almacén cuando ha cambiado.
+
+No depende de pygame.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import traza
+
+FICHAS_INICIALES = 5000
+
+CAMPOS = ("password", "fichas", "partidas_jugadas", "partidas_ganadas",
+          "fecha_registro", "ultima_conexion")
+
+
+def ahora():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def usuario_nuevo(password, fichas=FICHAS_INICIALES):
+    return {
+        "password": password,
+        "fichas": fichas,
+        "partidas_jugadas": 0,
+        "partidas_ganadas": 0,
+        "fecha_registro": ahora(),
+        "ultima_conexion": ahora()
+    }
+
+
+class AlmacenUsuarios:
+    """Base común: cambios en memoria y guardado a disco por lotes en un hilo"""
+
+    def __init__(self, intervalo=2.0, max_pendientes=50):
+        self.intervalo = intervalo
+        self.max_pendientes = max_pendientes
+        self.pendientes = 0
+        self.primer_cambio = None
+        self.escrituras = 0
+        self.condicion = threading.Condition()
+        self.escritura = threading.Lock()
+        self.activo = True
+        self.hilo = threading.Thread(target=self._escritor, name="escritor-usuarios", daemon=True)
+        self.hilo.start()
+        atexit.register(self.cerrar)
+
+    # ---------- A implementar por cada almacén ----------
+    def _leer_usuario(self, nombre):
+        """Datos del usuario (dict modificable), o None"""
+        raise NotImplementedError
+
+    def _anotar(self, nombre, datos):
+        """Dejar 'datos' como estado del usuario (con self.condicion tomada)"""
+        raise NotImplementedError
+
+    def _tomar_lote(self):
+        """Lo que hay que escribir (con self.condicion tomada)"""
+        raise NotImplementedError
+
+    def _escribir(self, lote):
+        """Escribir un lote a disco; puede lanzar OSError o sqlite3.Error"""
+        raise NotImplementedError
+
+    def _lote_escrito(self, lote, correcto):
+        """Después de escribir (con self.condicion tomada)"""
+
+    def _leer_perfil(self, nombre):
+        """Contadores guardados del jugador (bytes), o None"""
+        raise NotImplementedError
+
+    def _anotar_perfil(self, nombre, datos):
+        """Dejar 'datos' como perfil del jugador (con self.condicion tomada); False si no se guarda"""
+        raise NotImplementedError
+
+    # ---------- Consultas ----------
+    def abrir_sesion(self, nombre):
+        """SesionUsuario con el perfil cargado, o None si no existe"""
+        datos = self.obtener(nombre)
+        return SesionUsuario(self, nombre, datos) if datos is not None else None
+
+    def existe(self, nombre):
+        return self.obtener(nombre) is not None
+
+    def obtener(self, nombre):
+        """Copia de los datos del usuario, o None"""
+        with self.condicion, traza.tramo("leer usuario", "usuarios"):
+            datos = self._leer_usuario(nombre)
+        return dict(datos) if datos is not None else None
+
+    def obtener_perfil(self, nombre):
+        """Perfil de juego guardado (bytes), o None"""
+        with self.condicion, traza.tramo("leer perfil", "usuarios"):
+            return self._leer_perfil(nombre)
+
+    # ---------- Cambios (solo en memoria) ----------
+    def crear(self, nombre, password, fichas=FICHAS_INICIALES):
+        """Alta de usuario; False si ya existe"""
+        with self.condicion:
+            if self._leer_usuario(nombre) is not None:
+                return False
+            self._anotar(nombre, usuario_nuevo(password, fichas))
+            self._marcar()
+        return True
+
+    def actualizar(self, nombre, **campos):
+        """Cambiar campos de un usuario existente"""
+        with self.condicion:
+            datos = self._leer_usuario(nombre)
+            if datos is None:
+                return False
+            datos.update(campos)
+            self._anotar(nombre, datos)
+            self._marcar()
+        return True
+
+    def registrar_mano(self, nombre, ganada, fichas):
+        """Resultado de una mano jugada: contadores y fichas al terminarla"""
+        with self.condicion:
+            datos = self._leer_usuario(nombre)
+            if datos is None:
+                return False
+            datos["partidas_jugadas"] += 1
+            if ganada:
+                datos["partidas_ganadas"] += 1
+            datos["fichas"] = fichas
+            self._anotar(nombre, datos)
+            self._marcar()
+        return True
+
+    def guardar_perfil(self, nombre, datos):
+        """Perfil de juego de un jugador (bytes); se escribe con el siguiente lote"""
+        with self.condicion:
+            if not self._anotar_perfil(nombre, bytes(datos)):
+                return False
+            self._marcar()
+        return True
+
+    def _marcar(self):
+        """Anotar un cambio pendiente (con self.condicion tomada)"""
+        self.pendientes += 1
+        if self.primer_cambio is None:
+            self.primer_cambio = time.monotonic()
+        if self.pendientes >= self.max_pendientes:
+            self.condicion.notify()
+
+    # ---------- Escritura ----------
+    def guardar(self):
+        """Escribir ya los cambios pendientes; False si falla la escritura"""
+        with self.escritura:
+            with self.condicion:
+                if not self.pendientes:
+                    return True
+                lote = self._tomar_lote()
+                pendientes = self.pendientes
+                self.pendientes = 0
+                self.primer_cambio = None
+
+            try:
+                with traza.tramo("guardar usuarios", "usuarios", cambios=pendientes):
+                    self._escribir(lote)
+                correcto = True
+            except (OSError, sqlite3.Error) as e:
+                print(f"Error al guardar usuarios: {e}")
+                correcto = False
+
+            with self.condicion:
+                self._lote_escrito(lote, correcto)
+                if not correcto:
+                    # Se reintenta en el siguiente lote
+                    self.pendientes += pendientes
+                    if self.primer_cambio is None:
+                        self.primer_cambio = time.monotonic()
+                    return False
+            self.escrituras += 1
+            return True
+
+    def _escritor(self):
+        """Hilo que vuelca los cambios por tiempo o por cantidad"""
+        while True:
+            with self.condicion:
+                while self.activo:
+                    if self.pendientes >= self.max_pendientes:
+                        break
+                    if self.pendientes:
+                        espera = self.primer_cambio + self.intervalo - time.monotonic()
+                        if espera <= 0:
+                            break
+                    else:
+                        espera = None
+                    self.condicion.wait(espera)
+                if not self.activo:
+                    return
+            self.guardar()
+
+    def cerrar(self):
+        """Detener el hilo y escribir lo pendiente"""
+        if self.activo:
+            with self.condicion:
+                self.activo = False
+                self.condicion.notify()
+            self.hilo.join()
+        return self.guardar()
+
+
+class AlmacenJSON(AlmacenUsuarios):
+    """Todos los usuarios en memoria; cada lote reescribe el archivo JSON"""
+
+    def __init__(self, ruta, intervalo=2.0, max_pendientes=50):
+        self.ruta = ruta
+        self.usuarios = self._leer()
+        super().__init__(intervalo, max_pendientes)
+
+    def _leer(self):
+        try:
+            with open(self.ruta, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer {self.ruta}: {e}")
+            return {}
+
+    def _leer_usuario(self, nombre):
+        return self.usuarios.get(nombre)
+
+    def _anotar(self, nombre, datos):
+        self.usuarios[nombre] = datos
+
+    def _tomar_lote(self):
+        return json.dumps(self.usuarios, indent=2)
+
+    def _leer_perfil(self, nombre):
+        datos = self.usuarios.get(nombre)
+        perfil = datos.get("perfil") if datos is not None else None
+        return bytes.fromhex(perfil) if perfil else None
+
+    def _anotar_perfil(self, nombre, datos):
+        usuario = self.usuarios.get(nombre)
+        if usuario is None:
+            return False
+        usuario["perfil"] = datos.hex()
+        return True
+
+    def _escribir(self, lote):
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w") as f:
+            f.write(lote)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta)
+
+
+class AlmacenSQLite(AlmacenUsuarios):
+    """Una fila por usuario; solo los usuarios modificados se guardan en memoria"""
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            nombre TEXT PRIMARY KEY,
+            password TEXT NOT NULL,
+            fichas INTEGER NOT NULL,
+            partidas_jugadas INTEGER NOT NULL DEFAULT 0,
+            partidas_ganadas INTEGER NOT NULL DEFAULT 0,
+            fecha_registro TEXT,
+            ultima_conexion TEXT
+        ) WITHOUT ROWID
+    """
+
+    ESQUEMA_PERFILES = """
+        CREATE TABLE IF NOT EXISTS perfiles (
+            nombre TEXT PRIMARY KEY,
+            contadores BLOB NOT NULL
+        ) WITHOUT ROWID
+    """
+
+    def __init__(self, ruta, intervalo=2.0, max_pendientes=50):
+        self.ruta = ruta
+        self.lectura = self._conectar()
+        self.lectura.execute(self.ESQUEMA)
+        self.lectura.execute(self.ESQUEMA_PERFILES)
+        self.lectura.commit()
+        # La escritura se hace desde el hilo escritor o desde guardar()
+        self.conexion_escritura = self._conectar()
+        self.sucios = {}
+        self.en_escritura = {}
+        self.perfiles_sucios = {}
+        self.perfiles_en_escritura = {}
+        super().__init__(intervalo, max_pendientes)
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+        # WAL: las lecturas del juego no esperan a que termine un lote
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        return conexion
+
+    def _leer_usuario(self, nombre):
+        # Lo pendiente de escribir tiene prioridad sobre la base de datos
+        datos = self.sucios.get(nombre) or self.en_escritura.get(nombre)
+        if datos is not None:
+            return dict(datos)
+        fila = self.lectura.execute(
+            f"SELECT {', '.join(CAMPOS)} FROM usuarios WHERE nombre = ?", (nombre,)).fetchone()
+        return dict(zip(CAMPOS, fila)) if fila is not None else None
+
+    def _anotar(self, nombre, datos):
+        self.sucios[nombre] = datos
+
+    def _leer_perfil(self, nombre):
+        datos = self.perfiles_sucios.get(nombre) or self.perfiles_en_escritura.get(nombre)
+        if datos is not None:
+            return datos
+        fila = self.lectura.execute("SELECT contadores FROM perfiles WHERE nombre = ?", (nombre,)).fetchone()
+        return bytes(fila[0]) if fila is not None else None
+
+    def _anotar_perfil(self, nombre, datos):
+        self.perfiles_sucios[nombre] = datos
+        return True
+
+    def _tomar_lote(self):
+        lote = (self.sucios, self.perfiles_sucios)
+        self.sucios = {}
+        self.perfiles_sucios = {}
+        self.en_escritura, self.perfiles_en_escritura = lote
+        return lote
+
+    def _escribir(self, lote):
+        usuarios, perfiles = lote
+        if usuarios:
+            insertar_usuarios(self.conexion_escritura, usuarios.items())
+        if perfiles:
+            insertar_perfiles(self.conexion_escritura, perfiles.items())
+
+    def _lote_escrito(self, lote, correcto):
+        self.en_escritura = {}
+        self.perfiles_en_escritura = {}
+        if not correcto:
+            # Lo modificado después del lote es más reciente y se conserva
+            usuarios, perfiles = lote
+            for nombre, datos in usuarios.items():
+                self.sucios.setdefault(nombre, datos)
+            for nombre, datos in perfiles.items():
+                self.perfiles_sucios.setdefault(nombre, datos)
+
+    def cantidad(self):
+        return self.lectura.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+
+    def cerrar(self):
+        correcto = super().cerrar()
+        self.lectura.close()
+        self.conexion_escritura.close()
+        return correcto
+
+
+class SesionUsuario:
+    """Perfil del usuario conectado, leído una vez al iniciar sesión"""
+
+    def __init__(self, almacen, nombre, datos):
+        self.almacen = almacen
+        self.nombre = nombre
+        self.datos = datos
+        self.sucia = False
+
+    @property
+    def fichas(self):
+        return self.datos["fichas"]
+
+    @fichas.setter
+    def fichas(self, valor):
+        if valor != self.datos["fichas"]:
+            self.datos["fichas"] = valor
+            self.sucia = True
+
+    def actualizar(self, **campos):
+        self.datos.update(campos)
+        self.sucia = True
+
+    def registrar_mano(self, ganada):
+        """Contadores de una mano terminada (las fichas ya están al día)"""
+        self.datos["partidas_jugadas"] += 1
+        if ganada:
+            self.datos["partidas_ganadas"] += 1
+        self.sucia = True
+
+    def sincronizar(self):
+        """Pasar el perfil al almacén si cambió; se escribe en el siguiente lote"""
+        if not self.sucia:
+            return False
+        self.almacen.actualizar(self.nombre, **self.datos)
+        self.sucia = False
+        return True
+
+
+def insertar_usuarios(conexion, usuarios, reemplazar=True):
+    """Insertar o actualizar (nombre, datos) en una sola transacción"""
+    orden = "INSERT OR REPLACE" if reemplazar else "INSERT OR IGNORE"
+    with conexion:
+        conexion.executemany(
+            f"{orden} INTO usuarios (nombre, {', '.join(CAMPOS)}) VALUES (?{', ?' * len(CAMPOS)})",
+            ((nombre, *(datos.get(campo) for campo in CAMPOS)) for nombre, datos in usuarios))
+
+
+def insertar_perfiles(conexion, perfiles, reemplazar=True):
+    """Insertar o actualizar (nombre, contadores) en una sola transacción"""
+    orden = "INSERT OR REPLACE" if reemplazar else "INSERT OR IGNORE"
+    with conexion:
+        conexion.executemany(f"{orden} INTO perfiles (nombre, contadores) VALUES (?, ?)", perfiles)
+
+
+def migrar_json(ruta_json, ruta_db):
+    """Copiar los usuarios del JSON antiguo a SQLite (los ya migrados no se tocan)"""
+    with open(ruta_json, "r") as f:
+        usuarios = json.load(f)
+    conexion = sqlite3.connect(ruta_db)
+    try:
+        conexion.execute(AlmacenSQLite.ESQUEMA)
+        conexion.execute(AlmacenSQLite.ESQUEMA_PERFILES)
+        insertar_usuarios(conexion, usuarios.items(), reemplazar=False)
+        insertar_perfiles(conexion, ((nombre, bytes.fromhex(datos["perfil"]))
+                                     for nombre, datos in usuarios.items() if datos.get("perfil")),
+                          reemplazar=False)
+    finally:
+        conexion.close()
+    return len(usuarios)